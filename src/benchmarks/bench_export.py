@@ -0,0 +1,56 @@
+# benchmarks/bench_export.py
+"""
+Memory/throughput benchmark for the streaming admin exports.
+Run from the src directory:  python -m benchmarks.bench_export [--rows 1000000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.database import Database
+from services.export_service import ExportService
+
+def populate_sessions(db_path, rows):
+    """Fills the session table with synthetic rows spread over one year."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO session (requestID, instructorID, learnerID, sessionDate, status) VALUES (?, ?, ?, ?, ?)",
+            ((i, i % 500 + 1, i % 20000 + 1, f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "completed") for i in range(rows)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def run(rows, chunk_size):
+    db_path = create_scratch_db()
+    try:
+        populate_sessions(db_path, rows)
+        service = ExportService(Database(db_path), chunk_size=chunk_size)
+        out_path = db_path + ".out"
+        for fmt in ExportService.FORMATS:
+            tracemalloc.start()
+            started = time.perf_counter()
+            service.export_to_file("sessions", fmt, out_path)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            size_mb = os.path.getsize(out_path) / 1e6
+            print(f"{fmt:>6}: {rows:,} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s), "
+                  f"file {size_mb:.1f} MB, peak Python memory {peak / 1e6:.2f} MB")
+        os.remove(out_path)
+    finally:
+        os.remove(db_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.rows, args.chunk_size)
@@ -0,0 +1,52 @@
+# benchmarks/bench_login.py
+"""
+Concurrent login throughput at several password-hashing cost settings.
+Run from the src directory:  python -m benchmarks.bench_login [--users 20] [--logins 100] [--clients 16]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.database import Database
+from models.user import User
+from services.password_hasher import PasswordHasher
+
+COST_SETTINGS = [
+    ("scrypt n=2^12", dict(algorithm="scrypt", scrypt_n=2**12)),
+    ("scrypt n=2^14", dict(algorithm="scrypt", scrypt_n=2**14)),
+    ("scrypt n=2^15", dict(algorithm="scrypt", scrypt_n=2**15)),
+    ("pbkdf2 100k", dict(algorithm="pbkdf2_sha256", pbkdf2_iterations=100_000)),
+    ("pbkdf2 600k", dict(algorithm="pbkdf2_sha256", pbkdf2_iterations=600_000)),
+]
+
+def run(users, logins, clients, workers):
+    print(f"{logins} logins from {clients} concurrent clients, {workers} KDF workers, {os.cpu_count()} CPUs")
+    for label, params in COST_SETTINGS:
+        db_path = create_scratch_db()
+        try:
+            user_model = User(Database(db_path), PasswordHasher(max_workers=workers, **params))
+            for i in range(users):
+                user_model.create("learner", f"user{i}", f"password{i}", f"user{i}@example.com")
+            started = time.perf_counter()
+            # Each client thread plays a UI handler waiting on its own login.
+            login = lambda i: user_model.authenticate_async(f"user{i % users}", f"password{i % users}").result()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                ok = sum(1 for user in pool.map(login, range(logins)) if user)
+            elapsed = time.perf_counter() - started
+            print(f"{label:>14}: {logins / elapsed:8.1f} logins/s  ({ok}/{logins} succeeded)")
+        finally:
+            os.remove(db_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    run(args.users, args.logins, args.clients, args.workers)
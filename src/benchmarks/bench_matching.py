@@ -0,0 +1,81 @@
+# benchmarks/bench_matching.py
+"""
+Scaling benchmark for the region-sharded batch matcher across 1..N worker processes.
+A sample of requests is also matched with the serial matcher to check that the results agree.
+Run from the src directory:  python -m benchmarks.bench_matching [--users 20000] [--requests 20000] [--max-workers 8]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from benchmarks.synthetic_data import populate
+from models.database import Database
+from models.registry import ModelRegistry
+from services.matching_service import MatchingService
+from services.sharded_matching import ShardedMatcher
+
+def add_pending_requests(db_path, learner_ids, count, seed):
+    rng = random.Random(seed)
+    start = date.today()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("INSERT INTO request (userId, reqSkills, requestDate, fulfilled) VALUES (?, ?, ?, 'pending')", (
+            (rng.choice(learner_ids), ",".join(map(str, rng.sample(range(1, 13), rng.randint(1, 2)))),
+             (start + timedelta(days=rng.randrange(28))).isoformat())
+            for _ in range(count)
+        ))
+        conn.commit()
+    finally:
+        conn.close()
+
+def run(users, requests, max_workers, verify_sample, seed):
+    db_path = create_scratch_db()
+    try:
+        info = populate(db_path, users=users, messages=0, sessions=users, assignments=10, submissions=0, seed=seed, log=lambda message: None)
+        add_pending_requests(db_path, info['learner_ids'], requests, seed)
+        models = ModelRegistry(Database(db_path))
+        matching = MatchingService(models['user'], models['request'], models['analytics'])
+        pending = models['request'].get_pending()
+        print(f"{len(pending):,} pending requests, {len(info['instructor_ids']):,} instructors, {os.cpu_count()} CPUs")
+
+        baseline = None
+        worker_counts = sorted({1, *[2 ** i for i in range(1, max_workers.bit_length())], max_workers})
+        for workers in worker_counts:
+            started = time.perf_counter()
+            results = ShardedMatcher(matching, workers=workers).match_all(pending)
+            elapsed = time.perf_counter() - started
+            if baseline is None:
+                baseline = (elapsed, results)
+            identical = "identical" if results == baseline[1] else "DIFFERENT"
+            print(f"{workers:>3} workers: {elapsed:7.2f}s  {len(pending) / elapsed:9.0f} requests/s  "
+                  f"speedup {baseline[0] / elapsed:5.2f}x  ({identical} to 1 worker)")
+
+        sample = random.Random(seed).sample(list(pending), min(verify_sample, len(pending)))
+        started = time.perf_counter()
+        mismatches = 0
+        for request in sample:
+            best = matching.find_best_match_for_request(request)
+            if (best['userId'] if best else None) != baseline[1][request['reqId']]:
+                mismatches += 1
+        per_request = (time.perf_counter() - started) / max(1, len(sample))
+        print(f"serial matcher: {per_request * 1000:.1f} ms/request ({len(pending) * per_request:.0f}s projected for the backlog), "
+              f"{mismatches} of {len(sample)} sampled results differ")
+    finally:
+        os.remove(db_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--verify-sample", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    run(args.users, args.requests, args.max_workers, args.verify_sample, args.seed)
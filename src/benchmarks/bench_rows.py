@@ -0,0 +1,61 @@
+# benchmarks/bench_rows.py
+"""
+Per-row memory when materializing large result sets: sqlite3.Row and dict copies vs. slotted row types.
+Run from the src directory:  python -m benchmarks.bench_rows [--rows 200000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.rows import InstructorRow
+
+def materialize(db_path, row_factory, convert=None):
+    """Returns (bytes per row, seconds) to fetch every instructor with the given row factory."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = row_factory
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = conn.execute("SELECT userId, userName, userLat, userLong FROM user WHERE userRole = 'instructor'").fetchall()
+        if convert:
+            rows = [convert(row) for row in rows]
+        elapsed = time.perf_counter() - started
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current / len(rows), elapsed
+    finally:
+        conn.close()
+
+def run(rows):
+    db_path = create_scratch_db()
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.executemany(
+            "INSERT INTO user (userRole, userName, userPass, userEmail, userLat, userLong) VALUES ('instructor', ?, 'x', ?, ?, ?)",
+            ((f"instructor{i}", f"instructor{i}@example.com", 14.5 + i * 1e-6, 121.0 + i * 1e-6) for i in range(rows)),
+        )
+        conn.commit()
+        conn.close()
+
+        for label, factory, convert in (
+            ("sqlite3.Row", sqlite3.Row, None),
+            ("dict(sqlite3.Row)", sqlite3.Row, dict),
+            ("plain tuple", None, None),
+            ("InstructorRow (slots)", InstructorRow.factory, None),
+        ):
+            per_row, elapsed = materialize(db_path, factory, convert)
+            print(f"{label:>22}: {per_row:7.1f} bytes/row, {elapsed * 1000:7.1f} ms for {rows:,} rows")
+    finally:
+        os.remove(db_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,75 @@
+# benchmarks/bench_startup.py
+"""
+Startup regression benchmark.
+1. Imports the controller/model layer in a fresh interpreter and checks that no heavy
+   optional dependency (folium, matplotlib, googlemaps) is loaded at startup.
+2. Launches `main.py --profile-startup --exit-after-first-frame` and fails if the
+   reported time to first frame exceeds the budget.
+Run from the src directory:  python -m benchmarks.bench_startup [--budget-ms 2000]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("folium", "branca", "jinja2", "matplotlib", "googlemaps")
+
+IMPORT_PROBE = """
+import sys, time
+started = time.perf_counter()
+sys.path.insert(0, {src!r})
+from controllers.controller import Controller
+from models.database import Database
+from models.registry import ModelRegistry
+Controller(ModelRegistry(Database({db!r})))
+print("elapsed_ms", (time.perf_counter() - started) * 1000)
+print("heavy", ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def check_imports():
+    """Returns (elapsed_ms, heavy modules loaded) for building the controller layer."""
+    probe = IMPORT_PROBE.format(src=SRC_DIR, db=os.path.join(SRC_DIR, "db", "LetsInglesDB.db"), heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    elapsed = float(re.search(r"elapsed_ms ([\d.]+)", output).group(1))
+    heavy = [m for m in re.search(r"heavy (.*)", output).group(1).split(",") if m]
+    return elapsed, heavy
+
+def measure_first_frame(timeout):
+    """Returns the time to first frame reported by the startup profiler, or None if the app could not start."""
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.join(SRC_DIR, "main.py"), "--profile-startup", "--exit-after-first-frame"],
+            capture_output=True, text=True, timeout=timeout, cwd=os.path.dirname(SRC_DIR),
+        )
+    except subprocess.TimeoutExpired:
+        return None
+    match = re.search(r"time to first frame: ([\d.]+) ms", result.stderr)
+    return float(match.group(1)) if match else None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=2000, help="maximum allowed time to first frame")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the app window")
+    args = parser.parse_args()
+
+    failed = False
+    elapsed, heavy = check_imports()
+    print(f"controller layer ready in {elapsed:.1f} ms")
+    if heavy:
+        print(f"FAIL: heavy modules loaded at startup: {', '.join(heavy)}")
+        failed = True
+
+    first_frame = measure_first_frame(args.timeout)
+    if first_frame is None:
+        print("SKIP: could not launch the Flet app to measure time to first frame")
+    elif first_frame > args.budget_ms:
+        print(f"FAIL: time to first frame {first_frame:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    else:
+        print(f"time to first frame {first_frame:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
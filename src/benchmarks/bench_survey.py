@@ -0,0 +1,63 @@
+# benchmarks/bench_survey.py
+"""
+Survey answer distribution: SQLite JSON1 pushdown vs. decoding every response in Python.
+Run from the src directory:  python -m benchmarks.bench_survey [--responses 100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.database import Database
+from models.survey import Survey
+
+QUESTIONS = [
+    {"id": f"q{i}", "text": f"Question {i}", "options": ["Strongly agree", "Agree", "Neutral", "Disagree", "Strongly disagree"]}
+    for i in range(1, 9)
+] + [{"id": "topics", "text": "Which topics helped?", "options": ["Grammar", "Speaking", "Listening", "Writing"], "multiple": True}]
+
+def python_distribution(db, survey_id):
+    """The approach the pushdown replaces: load every response and json.loads it."""
+    counts = {}
+    with db.connect() as conn:
+        for row in conn.execute("SELECT responses FROM survey_responses WHERE surveyID = ?", (survey_id,)):
+            for question_id, answer in json.loads(row['responses']).items():
+                counter = counts.setdefault(question_id, Counter())
+                counter.update(answer if isinstance(answer, list) else [answer])
+    return {question_id: counter.most_common() for question_id, counter in sorted(counts.items())}
+
+def run(responses):
+    db_path = create_scratch_db()
+    try:
+        db = Database(db_path)
+        survey = Survey(db)
+        survey_id = survey.create(1, "Benchmark survey", QUESTIONS)
+        rng = random.Random(42)
+        survey.record_responses(survey_id, (
+            (i, {**{q["id"]: rng.choice(q["options"]) for q in QUESTIONS[:-1]}, "topics": rng.sample(QUESTIONS[-1]["options"], rng.randint(1, 3))})
+            for i in range(responses)
+        ))
+
+        timings = {}
+        for label, fn in (("json1 pushdown", lambda: survey.get_answer_distribution(survey_id)), ("python json.loads", lambda: python_distribution(db, survey_id))):
+            started = time.perf_counter()
+            result = fn()
+            timings[label] = time.perf_counter() - started
+            print(f"{label:>18}: {timings[label] * 1000:8.1f} ms for {responses:,} responses")
+        pushdown, python = survey.get_answer_distribution(survey_id), python_distribution(db, survey_id)
+        same = {q: sorted(v) for q, v in pushdown.items()} == {q: sorted(v) for q, v in python.items()}
+        print(f"results identical: {same}; speedup {timings['python json.loads'] / timings['json1 pushdown']:.2f}x")
+    finally:
+        os.remove(db_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.responses)
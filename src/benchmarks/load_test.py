@@ -0,0 +1,211 @@
+# benchmarks/load_test.py
+"""
+Headless end-to-end load test: concurrent virtual users drive Controller flows through a stub view
+against a synthetic database, and throughput plus p50/p95/p99 latency are reported per flow.
+Run from the src directory:  python -m benchmarks.load_test [--db synthetic.db] [--users 32] [--duration 30]
+Without --db a small synthetic database is generated first (see benchmarks.synthetic_data).
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from benchmarks.synthetic_data import PASSWORD, populate
+from controllers.controller import Controller
+from models.database import Database
+from models.registry import ModelRegistry
+
+# Relative weights of each flow in a virtual user's mix.
+FLOWS = {
+    "login": 1,
+    "send_message": 4,
+    "open_conversation": 4,
+    "submit_assignment": 1,
+    "load_dashboard": 2,
+}
+
+class StubPage:
+    def __init__(self, view):
+        self.view = view
+        self.route = "/"
+
+    def go(self, route):
+        self.route = route
+        self.view.settled.set()
+
+    def update(self):
+        pass
+
+class StubView:
+    """
+    Stands in for View: records the feedback the controller would show and signals when an
+    asynchronous handler (e.g. login) has finished.
+    """
+    def __init__(self):
+        self.page = StubPage(self)
+        self.settled = threading.Event()
+        self.errors = []
+
+    def show_error_dialog(self, message):
+        self.errors.append(message)
+        self.settled.set()
+
+    def show_snackbar(self, message, color="red"):
+        if color == "red":
+            self.errors.append(message)
+
+    def show_success_dialog(self, *args, **kwargs):
+        self.settled.set()
+
+    def show_loading_dialog(self, show):
+        pass
+
+    def show_map_dialog(self, *args, **kwargs):
+        pass
+
+    def _toggle_form(self, form):
+        pass
+
+class VirtualUser:
+    """One simulated learner with their own Controller and stub view, sharing the models."""
+    def __init__(self, models, username, partner_ids, rng):
+        self.view = StubView()
+        self.controller = Controller(models)
+        self.controller.set_view(self.view)
+        self.username = username
+        self.partner_ids = partner_ids
+        self.rng = rng
+
+    # Each flow returns True on success.
+    def login(self):
+        self.view.settled.clear()
+        errors = len(self.view.errors)
+        self.controller.handle_login(self.username, PASSWORD)
+        if not self.view.settled.wait(timeout=30):
+            return False
+        return len(self.view.errors) == errors and self.controller.current_user is not None
+
+    def send_message(self):
+        return self.controller.handle_send_message(self.rng.choice(self.partner_ids), "Load test message")
+
+    def open_conversation(self):
+        partners = self.controller.get_conversation_partners()
+        partner_id = partners[self.rng.randrange(len(partners))]['userId'] if partners else self.rng.choice(self.partner_ids)
+        self.controller.get_conversation(partner_id)
+        return True
+
+    def submit_assignment(self):
+        assignments = self.controller.get_learner_assignments_with_status()
+        pending = [a for a in assignments if a.status == 'Pending']
+        if not pending:
+            return True
+        errors = len(self.view.errors)
+        self.controller.handle_submit_assignment(self.rng.choice(pending).assignmentID)
+        return len(self.view.errors) == errors
+
+    def load_dashboard(self):
+        self.controller.get_user_profile()
+        self.controller.get_learner_assignments_with_status()
+        self.controller.get_week_sessions(date.today() - timedelta(days=date.today().weekday()))
+        self.controller.get_conversation_partners()
+        return True
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def _pick_learners(db_path, count, seed):
+    """Chooses learners that already have conversations, with their instructor partners."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT u.userName, m.receiverID FROM messages m JOIN user u ON u.userId = m.senderID
+            WHERE u.userRole = 'learner' GROUP BY m.senderID, m.receiverID LIMIT ?
+        """, (count * 20,)).fetchall()
+    finally:
+        conn.close()
+    partners = {}
+    for username, partner_id in rows:
+        partners.setdefault(username, []).append(partner_id)
+    names = sorted(partners)
+    random.Random(seed).shuffle(names)
+    return [(name, partners[name]) for name in names[:count]]
+
+def run(db_path, users, duration, seed):
+    models = ModelRegistry(Database(db_path))
+    # Instantiate every model up front so schema setup (triggers, backfills) isn't measured as a flow.
+    for name in models:
+        models[name]
+    learners = _pick_learners(db_path, users, seed)
+    if not learners:
+        raise SystemExit("No learners with conversations found in the database.")
+    flow_names, weights = list(FLOWS), list(FLOWS.values())
+    latencies = {name: [] for name in FLOWS}
+    failures = {name: 0 for name in FLOWS}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def virtual_user(index, username, partner_ids):
+        rng = random.Random(seed + index)
+        vu = VirtualUser(models, username, partner_ids, rng)
+        flow = "login"
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = getattr(vu, flow)()
+            except Exception as e:
+                print(f"{flow} raised: {e!r}")
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[flow].append(elapsed)
+                if not ok:
+                    failures[flow] += 1
+            if vu.controller.current_user is None:
+                flow = "login"
+            else:
+                flow = rng.choices(flow_names, weights)[0]
+
+    print(f"{len(learners)} virtual users for {duration}s against {db_path}")
+    threads = [threading.Thread(target=virtual_user, args=(i, name, partners)) for i, (name, partners) in enumerate(learners)]
+    wall_started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_started
+
+    print(f"{'flow':>18} {'count':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7}")
+    for name in FLOWS:
+        values = sorted(latencies[name])
+        print(f"{name:>18} {len(values):>7} {len(values) / wall:>8.1f} {percentile(values, 50) * 1000:>8.1f} "
+              f"{percentile(values, 95) * 1000:>8.1f} {percentile(values, 99) * 1000:>8.1f} {failures[name]:>7}")
+    total = sum(len(v) for v in latencies.values())
+    print(f"{'total':>18} {total:>7} {total / wall:>8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Synthetic database to run against; it is modified by the test.")
+    parser.add_argument("--users", type=int, default=32, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if args.db:
+        run(args.db, args.users, args.duration, args.seed)
+    else:
+        db_path = create_scratch_db()
+        try:
+            populate(db_path, users=5_000, messages=100_000, sessions=20_000, assignments=200, submissions=20_000)
+            run(db_path, args.users, args.duration, args.seed)
+        finally:
+            os.remove(db_path)
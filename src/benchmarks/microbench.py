@@ -0,0 +1,162 @@
+# benchmarks/microbench.py
+"""
+Component microbenchmarks for the hot model/matching functions, across data sizes, with JSON
+baselines and a regression check.
+Run from the src directory:
+    python -m benchmarks.microbench run [--sizes small,medium] [--save baseline.json]
+    python -m benchmarks.microbench compare baseline.json [--threshold 15]
+`compare` re-runs the benchmarks recorded in the baseline and exits with status 1 when any of
+them is slower than the baseline by more than the threshold percentage, or no longer exists.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from benchmarks.synthetic_data import PASSWORD, populate
+from models.database import Database
+from models.registry import ModelRegistry
+from services.matching_service import MatchingService
+
+# Synthetic data volumes per size preset.
+SIZES = {
+    "small": dict(users=1_000, messages=20_000, sessions=2_000, assignments=100, submissions=2_000),
+    "medium": dict(users=5_000, messages=200_000, sessions=20_000, assignments=500, submissions=20_000),
+    "large": dict(users=20_000, messages=1_000_000, sessions=100_000, assignments=2_000, submissions=100_000),
+}
+
+class Fixture:
+    """A populated scratch database plus the ids the benchmarks need."""
+    def __init__(self, size):
+        self.path = create_scratch_db()
+        self.info = populate(self.path, seed=1, log=lambda message: None, **SIZES[size])
+        self.models = ModelRegistry(Database(self.path))
+        self.matching = MatchingService(self.models['user'], self.models['request'], self.models['analytics'])
+        with self.models.db.connect() as conn:
+            # The busiest conversation, so message benchmarks measure a realistic worst case.
+            row = conn.execute("""
+                SELECT senderID, receiverID FROM messages GROUP BY senderID, receiverID ORDER BY COUNT(*) DESC LIMIT 1
+            """).fetchone()
+            self.conversation = (row['senderID'], row['receiverID'])
+            learner = conn.execute("SELECT userName, userLat, userLong FROM user WHERE userId = ?", (self.info['learner_ids'][0],)).fetchone()
+        self.learner_name = learner['userName']
+        self.request = {"reqSkills": "1", "requestDate": "2025-06-02", "userLat": learner['userLat'], "userLong": learner['userLong']}
+
+    def close(self):
+        os.remove(self.path)
+
+# name -> function(fixture) returning the zero-argument callable to time.
+BENCHMARKS = {
+    "matching.find_best_match_for_request": lambda f: lambda: f.matching.find_best_match_for_request(f.request),
+    "matching._haversine_distance": lambda f: lambda: f.matching._haversine_distance(121.0437, 14.6760, 120.9842, 14.5995),
+    "message.get_conversation": lambda f: lambda: f.models['message'].get_conversation(*f.conversation),
+    "message.get_conversation_partners": lambda f: lambda: f.models['message'].get_conversation_partners(f.conversation[0]),
+    "assignment.get_all": lambda f: lambda: f.models['assignment'].get_all(),
+    "user.authenticate": lambda f: lambda: f.models['user'].authenticate(f.learner_name, PASSWORD),
+}
+
+def measure(fn, repeat=5, min_time=0.2):
+    """
+    Times fn like timeit: the loop count is calibrated so one repetition takes at least min_time,
+    then the per-call time of each repetition is recorded. Returns (best, median) seconds per call.
+    """
+    fn()  # Warm caches and lazy imports.
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return min(timings), statistics.median(timings)
+
+def run(sizes, names=None, repeat=5):
+    """Runs the selected benchmarks at each size; returns {"name@size": {"best": s, "median": s}}."""
+    results = {}
+    for size in sizes:
+        fixture = Fixture(size)
+        try:
+            for name, build in BENCHMARKS.items():
+                key = f"{name}@{size}"
+                if names is not None and key not in names:
+                    continue
+                best, median = measure(build(fixture), repeat=repeat)
+                results[key] = {"best": best, "median": median}
+                print(f"{key:>48}: best {best * 1e3:10.4f} ms  median {median * 1e3:10.4f} ms")
+        finally:
+            fixture.close()
+    return results
+
+def compare(baseline, results, threshold):
+    """
+    Prints the change per benchmark and returns (regressed, missing): the keys that regressed by more
+    than threshold percent, and the baseline keys with no current result (removed or renamed benchmarks).
+    """
+    regressions, missing = [], []
+    for key, base in sorted(baseline.items()):
+        current = results.get(key)
+        if current is None:
+            print(f"{key:>48}: {base['best'] * 1e3:10.4f} -> {'':>10}    MISSING")
+            missing.append(key)
+            continue
+        change = (current["best"] - base["best"]) / base["best"] * 100
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"{key:>48}: {base['best'] * 1e3:10.4f} -> {current['best'] * 1e3:10.4f} ms ({change:+6.1f}%) {flag}")
+        if change > threshold:
+            regressions.append(key)
+    return regressions, missing
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and optionally save them as a baseline.")
+    run_parser.add_argument("--sizes", default="small,medium", help=f"Comma-separated presets from {', '.join(SIZES)}.")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--save", help="Write the results to this JSON baseline file.")
+    compare_parser = subparsers.add_parser("compare", help="Re-run the benchmarks in a baseline and check for regressions.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=15.0, help="Allowed slowdown in percent.")
+    compare_parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sizes = args.sizes.split(",")
+        unknown = set(sizes) - set(SIZES)
+        if unknown:
+            parser.error(f"unknown sizes: {', '.join(sorted(unknown))}")
+        results = run(sizes, repeat=args.repeat)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump({
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "results": results,
+                }, f, indent=2)
+            print(f"Baseline saved to {args.save}")
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        # Keys for sizes that no longer exist are reported as missing by compare().
+        sizes = sorted({key.rsplit("@", 1)[-1] for key in baseline} & set(SIZES), key=list(SIZES).index)
+        results = run(sizes, names=set(baseline), repeat=args.repeat)
+        regressions, missing = compare(baseline, results, args.threshold)
+        print(f"{len(regressions)} regression(s) over {args.threshold}%." if regressions else "No regressions.")
+        if missing:
+            print(f"{len(missing)} baseline benchmark(s) missing from this run; re-save the baseline if they were removed or renamed.")
+        sys.exit(1 if regressions or missing else 0)
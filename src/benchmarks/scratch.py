@@ -0,0 +1,27 @@
+# benchmarks/scratch.py
+import os
+import sqlite3
+import tempfile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_DB = os.path.join(SRC_DIR, "db", "LetsInglesDB.db")
+
+def create_scratch_db(path=None):
+    """
+    Creates an empty database with the same schema as the application database.
+    Returns the path of the new file (a temporary file when no path is given).
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="letsingles-bench-")
+        os.close(fd)
+        os.remove(path)
+    source = sqlite3.connect(SCHEMA_DB)
+    target = sqlite3.connect(path)
+    try:
+        for (sql,) in source.execute("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"):
+            target.execute(sql)
+        target.commit()
+    finally:
+        source.close()
+        target.close()
+    return path
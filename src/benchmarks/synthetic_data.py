@@ -0,0 +1,152 @@
+# benchmarks/synthetic_data.py
+"""
+Populates a scratch copy of the schema with production-like volumes.
+Run from the src directory:  python -m benchmarks.synthetic_data OUTPUT.db [--users 100000] [--messages 2000000] ...
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from services.password_hasher import PasswordHasher
+
+SKILLS = ["Grammar", "Pronunciation", "Conversation", "Business English", "IELTS Preparation", "TOEFL Preparation",
+          "Creative Writing", "Academic Writing", "Listening", "Reading Comprehension", "Vocabulary", "Public Speaking"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SESSION_STATUSES = ["completed"] * 6 + ["approved"] * 2 + ["pending_approval", "cancelled"]
+# Every synthetic account shares this password, so load tests can log in as anyone.
+PASSWORD = "password123"
+# Metro Manila bounding box.
+LAT_RANGE = (14.40, 14.78)
+LON_RANGE = (120.93, 121.13)
+BATCH = 50_000
+
+def _batched(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+def _timestamp(rng, start, span_days):
+    return (start + timedelta(seconds=rng.randrange(span_days * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+def populate(db_path, users=100_000, instructor_share=0.2, messages=2_000_000, partners_per_user=5,
+             sessions=300_000, assignments=2_000, submissions=500_000, seed=42, log=print):
+    """
+    Fills an empty database (see create_scratch_db) with synthetic data and returns a summary dict
+    with the ids a load driver needs. Generation is deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    history_start = now - timedelta(days=365)
+    password_hash = PasswordHasher.from_config().hash(PASSWORD)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    try:
+        started = time.perf_counter()
+        conn.executemany("INSERT INTO skills (skillID, skillName) VALUES (?, ?)", enumerate(SKILLS, start=1))
+        skill_ids = list(range(1, len(SKILLS) + 1))
+
+        # --- Users and profiles ---
+        n_instructors = max(1, int(users * instructor_share))
+        roles = ["admin"] + ["instructor"] * n_instructors + ["learner"] * (users - n_instructors - 1)
+        _batched(conn, "INSERT INTO user (userId, userRole, userName, userPass, userEmail, userLat, userLong) VALUES (?, ?, ?, ?, ?, ?, ?)", (
+            (uid, role, f"{role}{uid}", password_hash, f"{role}{uid}@example.com",
+             round(rng.uniform(*LAT_RANGE), 6), round(rng.uniform(*LON_RANGE), 6))
+            for uid, role in enumerate(roles, start=1)
+        ))
+        _batched(conn, "INSERT INTO user_profiles (userID, firstName, lastName, age, aboutMe) VALUES (?, ?, ?, ?, ?)", (
+            (uid, f"First{uid}", f"Last{uid}", rng.randint(16, 60), "Synthetic profile.") for uid in range(1, users + 1)
+        ))
+        instructor_ids = list(range(2, n_instructors + 2))
+        learner_ids = list(range(n_instructors + 2, users + 1))
+        log(f"users: {users:,} ({n_instructors:,} instructors)")
+
+        # --- Instructor skills and availability ---
+        _batched(conn, "INSERT INTO instructor_skills (instructorID, skillID) VALUES (?, ?)", (
+            (iid, sid) for iid in instructor_ids for sid in rng.sample(skill_ids, rng.randint(1, 3))
+        ))
+        _batched(conn, "INSERT INTO instructor_availability (instructorID, day, startTime, endTime) VALUES (?, ?, ?, ?)", (
+            (iid, day, f"{start:02d}:00", f"{start + rng.randint(2, 8):02d}:00")
+            for iid in instructor_ids for day in rng.sample(DAYS, rng.randint(2, 5)) for start in [rng.randint(7, 13)]
+        ))
+        _batched(conn, "INSERT INTO learner_stats (learnerID, skillID, proficiencyScore, sessionsCompleted) VALUES (?, ?, ?, ?)", (
+            (lid, sid, rng.randint(0, 100), rng.randint(0, 20)) for lid in learner_ids for sid in rng.sample(skill_ids, rng.randint(1, 3))
+        ))
+
+        # --- Messages: each learner talks to a handful of instructors ---
+        per_pair = max(1, messages // max(1, len(learner_ids) * partners_per_user))
+        def message_rows():
+            produced = 0
+            while produced < messages:
+                learner = rng.choice(learner_ids)
+                for instructor in rng.sample(instructor_ids, min(partners_per_user, len(instructor_ids))):
+                    for _ in range(min(per_pair, messages - produced)):
+                        sender, receiver = (learner, instructor) if rng.random() < 0.5 else (instructor, learner)
+                        yield sender, receiver, f"Synthetic message {produced}", _timestamp(rng, history_start, 365)
+                        produced += 1
+        _batched(conn, "INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, ?, ?)", message_rows())
+        log(f"messages: {messages:,}")
+
+        # --- Requests, sessions and feedback ---
+        def session_rows():
+            for req_id in range(1, sessions + 1):
+                day = history_start + timedelta(days=rng.randrange(395))
+                yield (req_id, rng.choice(learner_ids), ",".join(map(str, rng.sample(skill_ids, 2))), day.strftime("%Y-%m-%d"),
+                       rng.choice(instructor_ids), f"{day:%Y-%m-%d} {rng.randint(8, 19):02d}:00", rng.choice(SESSION_STATUSES))
+        rows = list(session_rows())
+        _batched(conn, "INSERT INTO request (reqId, userId, reqSkills, requestDate, fulfilled) VALUES (?, ?, ?, ?, 'matched')",
+                 (r[:4] for r in rows))
+        _batched(conn, "INSERT INTO session (sessionID, requestID, instructorID, learnerID, sessionDate, status) VALUES (?, ?, ?, ?, ?, ?)",
+                 ((r[0], r[0], r[4], r[1], r[5], r[6]) for r in rows))
+        _batched(conn, "INSERT INTO feedback (sessionID, learnerID, rating, comment, feedbackDate) VALUES (?, ?, ?, ?, ?)", (
+            (r[0], r[1], rng.choices([1, 2, 3, 4, 5], [1, 2, 5, 10, 12])[0], "Synthetic feedback.", r[5][:10])
+            for r in rows if r[6] == "completed" and rng.random() < 0.6
+        ))
+        del rows
+        log(f"sessions: {sessions:,}")
+
+        # --- Assignments and submissions ---
+        _batched(conn, "INSERT INTO assignments (assignmentID, instructorID, skillID, title, description, dueDate) VALUES (?, ?, ?, ?, ?, ?)", (
+            (aid, rng.choice(instructor_ids), rng.choice(skill_ids), f"Assignment {aid}", "Synthetic assignment.",
+             (history_start + timedelta(days=rng.randrange(425))).strftime("%Y-%m-%d"))
+            for aid in range(1, assignments + 1)
+        ))
+        _batched(conn, "INSERT INTO submissions (assignmentID, learnerID, submissionDate) VALUES (?, ?, ?)", (
+            (rng.randint(1, assignments), rng.choice(learner_ids), _timestamp(rng, history_start, 365)) for _ in range(submissions)
+        ))
+        log(f"assignments: {assignments:,}, submissions: {submissions:,}")
+
+        conn.commit()
+        conn.execute("ANALYZE")
+        log(f"generated in {time.perf_counter() - started:.1f}s, {os.path.getsize(db_path) / 1e6:.0f} MB")
+    finally:
+        conn.close()
+    return {"admin_id": 1, "instructor_ids": instructor_ids, "learner_ids": learner_ids, "assignments": assignments, "password": PASSWORD}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Path of the database to create (must not exist).")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=2_000_000)
+    parser.add_argument("--sessions", type=int, default=300_000)
+    parser.add_argument("--assignments", type=int, default=2_000)
+    parser.add_argument("--submissions", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if os.path.exists(args.output):
+        parser.error(f"{args.output} already exists")
+    populate(create_scratch_db(args.output), args.users, messages=args.messages, sessions=args.sessions,
+             assignments=args.assignments, submissions=args.submissions, seed=args.seed)
@@ -0,0 +1,58 @@
+# config.py
+import os
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(SRC_DIR, "db", "LetsInglesDB.db")
+
+# --- Tenants ---
+# When this directory database exists (see services/tenant_split.py), each school gets its own shard file.
+TENANT_DIRECTORY = os.environ.get("LETSINGLES_TENANT_DIRECTORY", os.path.join(SRC_DIR, "db", "tenants", "directory.db"))
+TENANT_DEFAULT = os.environ.get("LETSINGLES_TENANT_DEFAULT")  # Tenant for new registrations; defaults to the first tenant
+
+# --- Geocoding ---
+# Set GOOGLE_MAPS_API_KEY to geocode registrations with Google; otherwise the offline gazetteer is used.
+GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
+GAZETTEER_PATH = os.environ.get("LETSINGLES_GAZETTEER", os.path.join(SRC_DIR, "db", "gazetteer.csv"))
+
+# --- Password Hashing ---
+# Cost parameters are stored inside each hash; raising them upgrades existing users on their next login.
+PASSWORD_KDF = os.environ.get("LETSINGLES_PASSWORD_KDF", "scrypt")  # "scrypt" or "pbkdf2_sha256"
+SCRYPT_N = int(os.environ.get("LETSINGLES_SCRYPT_N", 2**14))
+SCRYPT_R = int(os.environ.get("LETSINGLES_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("LETSINGLES_SCRYPT_P", 1))
+PBKDF2_ITERATIONS = int(os.environ.get("LETSINGLES_PBKDF2_ITERATIONS", 600_000))
+PASSWORD_HASH_WORKERS = int(os.environ.get("LETSINGLES_PASSWORD_HASH_WORKERS", 2))
+
+# --- Uploads ---
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+MAX_PROFILE_PICTURE_BYTES = 8 * 1024 * 1024
+AVATAR_SIZE = 256  # pixels; dashboards display avatars at 150 px
+
+# --- Charts ---
+CHART_WORKERS = int(os.environ.get("LETSINGLES_CHART_WORKERS", 1))
+
+# --- Sessions ---
+SESSION_DURATION_MINUTES = 60
+
+# --- Backups ---
+BACKUP_DIR = os.environ.get("LETSINGLES_BACKUP_DIR", os.path.join(SRC_DIR, "db", "backups"))
+BACKUP_INTERVAL_HOURS = float(os.environ.get("LETSINGLES_BACKUP_INTERVAL_HOURS", 24))  # 0 disables scheduled backups
+BACKUP_KEEP = int(os.environ.get("LETSINGLES_BACKUP_KEEP", 7))
+
+# --- Tracing ---
+# Fraction of user actions recorded as tracing spans (0 disables tracing; `python main.py --trace` records all).
+TRACE_SAMPLE_RATE = float(os.environ.get("LETSINGLES_TRACE_SAMPLE_RATE", 0))
+TRACE_MAX_ACTIONS = 200
+
+# --- Message Archive ---
+# Messages older than this are moved into compressed archive segments by services/message_archiver.py.
+MESSAGE_HOT_DAYS = int(os.environ.get("LETSINGLES_MESSAGE_HOT_DAYS", 180))
+MESSAGE_ARCHIVE_SEGMENT_SIZE = 500
+MESSAGE_PAGE_SIZE = 50
+
+# --- Database Maintenance ---
+# ANALYZE / PRAGMA optimize / incremental vacuum run once the database has been idle this long.
+MAINTENANCE_ENABLED = os.environ.get("LETSINGLES_MAINTENANCE", "1") != "0"
+MAINTENANCE_IDLE_SECONDS = 120
+MAINTENANCE_INTERVAL_HOURS = 24
+MAINTENANCE_MAX_CYCLE_SECONDS = 5
@@ -1,7 +1,10 @@
 # controllers/controller.py
 from services.matching_service import MatchingService
-from services.map_service import MapService
-import time
+from services.export_service import ExportService
+from models.rows import LearnerAssignment
+from core import tracing
+from datetime import datetime
+import itertools
 
 class Controller:
     """
@@ -9,7 +12,15 @@ class Controller:
     """
     def __init__(self, models):
         self.models = models
-        self.matching_service = MatchingService(models['user'], models['request'])
+        self.matching_service = None
+        # With a tenant router, admin exports stream every school's shard.
+        self.export_service = ExportService(models.shards())
+        self.map_service = None
+        self.geocoding_service = None
+        self.upload_service = None
+        self.chart_service = None
+        self.recommendation_service = None
+        self.dashboard_snapshots = None
         self.view = None
         self.current_user = None
 
@@ -22,15 +33,32 @@ class Controller:
         if not username or not password:
             self.view.show_error_dialog("Username and password cannot be empty.")
             return
+        tenant_id = None
+        if self.models.router:
+            # Each school has its own database; the tenant directory says which one holds this account.
+            tenant_id = self.models.router.tenant_for_user(username)
+            if tenant_id is None:
+                self.view.show_error_dialog("Login failed. Please check your username and password.")
+                return
 
         self.view.show_loading_dialog(True)
-        time.sleep(1) 
-        
-        user = self.models['user'].authenticate(username, password)
-        
+        # Password verification is CPU-heavy, so it runs on the KDF pool and finishes in a callback,
+        # which is traced as part of this login action.
+        future = self.models.for_tenant(tenant_id, 'user').authenticate_async(username, password)
+        future.add_done_callback(tracing.tracer.bind(lambda future: self._finish_login(future, tenant_id), "Controller._finish_login", "controller"))
+
+    def _finish_login(self, future, tenant_id=None):
+        try:
+            user = future.result()
+        except Exception as e:
+            print(f"Login error: {e}")
+            user = None
+
         self.view.show_loading_dialog(False)
 
         if user:
+            # The session switches to the user's shard only once the password has been verified.
+            self.models.use_tenant(tenant_id)
             self.current_user = user
             if user['userRole'] == 'admin': self.view.page.go("/admin")
             elif user['userRole'] == 'instructor': self.view.page.go("/instructor")
@@ -38,12 +66,15 @@ class Controller:
         else:
             self.view.show_error_dialog("Login failed. Please check your username and password.")
     
-    def handle_register(self, role, first_name, last_name, middle_initial, username, email, password, verify_password, consent, resume_path=None):
+    def handle_register(self, role, first_name, last_name, middle_initial, username, email, password, verify_password, consent, resume_path=None, address=None):
         """Handles the complete registration flow with validation."""
         if not all([first_name, last_name, username, email, password, verify_password]):
             self.view.show_error_dialog("Please fill in all required fields.")
             return
-        if self.models['user'].check_username(username):
+        if self.models.router:
+            # New accounts are created in the default school's shard.
+            self.models.use_tenant(self.models.router.default_tenant)
+        if self._is_username_taken(username):
             self.view.show_error_dialog(f"The username '{username}' is already taken.")
             return
         if password != verify_password:
@@ -56,20 +87,62 @@ class Controller:
             self.view.show_error_dialog("A resume (PDF) is required to apply as an instructor.")
             return
         
-        user_id = self.models['user'].create(role, username, password, email, 14.6760, 121.0437)
+        location = self._get_geocoding_service().geocode(address) if address else None
+        create = lambda: self._create_account(role, first_name, last_name, middle_initial, username, email, password, resume_path, location)
+        if address and location is None:
+            # Without coordinates the account is left out of distance-based matching and the density map.
+            self.view.show_confirmation_dialog(
+                "Address Not Found",
+                f"We couldn't find '{address}' on the map, so you won't be matched with nearby instructors or learners. Create the account without a location?",
+                create,
+            )
+            return
+        create()
+
+    def _create_account(self, role, first_name, last_name, middle_initial, username, email, password, resume_path, location):
+        user_lat, user_long = location if location else (None, None)
+        # The tenant directory entry is written first: an account missing from it could never log in.
+        if self.models.router and not self.models.router.assign_user(username, self.models.tenant_id):
+            self.view.show_error_dialog("Registration failed: the school directory could not be updated. Please try again.")
+            return
+        user_id = self.models['user'].create(role, username, password, email, user_lat, user_long)
         
         if isinstance(user_id, int):
             profile_data = {"firstName": first_name, "lastName": last_name, "middleInitial": middle_initial, "resumePath": resume_path}
             self.models['profile'].create_or_update(user_id, profile_data)
+            self.models['user'].get_directory().update_profile(user_id, first_name, last_name)
             self.view.show_success_dialog("Account successfully created!")
         else:
+            if self.models.router:
+                self.models.router.unassign_user(username)
             self.view.show_error_dialog(f"Registration failed: {user_id}")
 
+    def _get_matching_service(self):
+        if self.matching_service is None:
+            self.matching_service = MatchingService(self.models['user'], self.models['request'], self.models['analytics'])
+        return self.matching_service
+
+    def _is_username_taken(self, username):
+        """User names are unique across all schools, so the tenant directory is checked as well as the local shard."""
+        if self.models.router and self.models.router.tenant_for_user(username):
+            return True
+        return self.models['user'].check_username(username)
+
+    def _get_geocoding_service(self):
+        if self.geocoding_service is None:
+            # Imported here so the geocoding backend (and googlemaps) only loads on registration.
+            import config
+            from services.geocoding_service import GeocodingService, GoogleGeocoder, GazetteerGeocoder
+            backend = GoogleGeocoder(config.GOOGLE_MAPS_API_KEY) if config.GOOGLE_MAPS_API_KEY else GazetteerGeocoder(config.GAZETTEER_PATH)
+            self.geocoding_service = GeocodingService(self.models['user'].db, backend)
+        return self.geocoding_service
+
     def check_username_availability(self, username):
         """Checks if a username is taken and provides feedback."""
         if not username: return
-        if self.models['user'].check_username(username):
-            self.view.show_snackbar(f"Username '{username}' is not available.")
+        if self._is_username_taken(username):
+            suggestions = [name for name in self.models['user'].get_directory().suggest_available(username) if not self._is_username_taken(name)]
+            self.view.show_snackbar(f"Username '{username}' is not available. Try: {', '.join(suggestions)}")
         else:
             self.view.show_snackbar(f"Username '{username}' is available!", "green")
 
@@ -79,6 +152,11 @@ class Controller:
 
     def handle_logout(self):
         self.current_user = None
+        if self.models.router:
+            self.models.use_tenant(self.models.router.default_tenant)
+            # These hold the previous school's shard and are recreated on next use.
+            self.matching_service = None
+            self.recommendation_service = None
         self.view.page.go("/")
 
     # --- Data Fetching for Views ---
@@ -88,39 +166,144 @@ class Controller:
     def get_all_skills(self):
         return self.models['skill'].get_all()
 
+    # --- Dashboard Snapshot (stale-while-revalidate) ---
+    def _get_dashboard_snapshots(self):
+        if self.dashboard_snapshots is None:
+            from services.dashboard_snapshot import DashboardSnapshotStore
+            self.dashboard_snapshots = DashboardSnapshotStore()
+        return self.dashboard_snapshots
+
+    def _dashboard_snapshot_key(self):
+        # User ids are only unique within a shard, so sharded snapshots are keyed by tenant too.
+        user_id = self.current_user['userId']
+        return f"{self.models.tenant_id}-{user_id}" if self.models.router else user_id
+
+    def get_dashboard_data(self):
+        """Fresh dashboard sections for the current user, as plain JSON-friendly values."""
+        profile = self.get_user_profile()
+        data = {
+            "profile": dict(zip(profile.keys(), profile.values())) if profile else None,
+            "partners": [{"userId": p['userId'], "userName": p['userName']} for p in self.get_conversation_partners()],
+        }
+        if self.current_user['userRole'] == 'learner':
+            data["assignments"] = [dict(zip(a.keys(), a.values())) for a in self.get_learner_assignments_with_status()]
+        return data
+
+    def get_dashboard_snapshot(self):
+        """
+        Returns (data, is_stale). The last saved snapshot is returned immediately when there is one;
+        otherwise the data is loaded now and saved for next time.
+        """
+        store = self._get_dashboard_snapshots()
+        snapshot = store.load(self._dashboard_snapshot_key())
+        if snapshot is not None:
+            return snapshot, True
+        return store.save(self._dashboard_snapshot_key(), self.get_dashboard_data()), False
+
+    def refresh_dashboard_in_background(self, snapshot, on_changes):
+        """Reloads the dashboard off the UI thread, saves it, and calls on_changes({section: data}) with only what changed."""
+        import threading
+        user = self.current_user
+        key = self._dashboard_snapshot_key()
+
+        def refresh():
+            try:
+                fresh = self.get_dashboard_data()
+            except Exception as e:
+                print(f"Dashboard refresh failed: {e}")
+                return
+            if self.current_user is not user:
+                return  # Logged out (or switched user) while refreshing.
+            fresh = self._get_dashboard_snapshots().save(key, fresh)
+            changes = self.dashboard_snapshots.diff(snapshot, fresh)
+            if changes:
+                on_changes(changes)
+
+        threading.Thread(target=refresh, daemon=True, name="dashboard-refresh").start()
+
+    def _discard_dashboard_snapshot(self):
+        """Called after the user's own writes, so the re-rendered dashboard shows them rather than the old snapshot."""
+        if self.current_user:
+            self._get_dashboard_snapshots().discard(self._dashboard_snapshot_key())
+
     # --- Learner Data ---
     def get_learner_assignments_with_status(self):
         all_assignments = self.models['assignment'].get_all()
-        submitted_ids = self.models['assignment'].get_submissions_by_learner(self.current_user['userId'])
-        
-        assignments_with_status = []
-        for assign in all_assignments:
-            assignment_dict = dict(assign)
-            assignment_dict['status'] = 'Completed' if assign['assignmentID'] in submitted_ids else 'Pending'
-            assignments_with_status.append(assignment_dict)
-        return assignments_with_status
+        submitted_ids = set(self.models['assignment'].get_submissions_by_learner(self.current_user['userId']))
+        return [LearnerAssignment(*assign.values(), 'Completed' if assign.assignmentID in submitted_ids else 'Pending') for assign in all_assignments]
+
+    def get_learner_progress_chart(self, on_ready):
+        """Returns the progress chart path (or a placeholder while it renders); on_ready(path) fires when done."""
+        stats = self.models['learner_stats'].get_stats(self.current_user['userId'])
+        data = [(row['skillName'], row['proficiencyScore'], row['sessionsCompleted']) for row in stats]
+        return self._get_chart_service().get_chart("learner_progress", data, on_ready=on_ready)
+
+    def get_recommended_materials(self):
+        """Precomputed suggestions for the current learner; stale learners are refreshed in the background."""
+        if self.recommendation_service is None:
+            from services.recommendation_service import RecommendationService
+            self.recommendation_service = RecommendationService(self.models['learner_stats'].db)
+        if self.recommendation_service.has_pending():
+            self.recommendation_service.refresh_in_background()
+        return self.recommendation_service.get_for_learner(self.current_user['userId'])
+
+    def _get_chart_service(self):
+        if self.chart_service is None:
+            # Imported here; matplotlib itself only loads inside the chart worker processes.
+            import config
+            from services.chart_service import ChartService
+            self.chart_service = ChartService(max_workers=config.CHART_WORKERS)
+        return self.chart_service
 
     # --- Instructor Data ---
-    def get_all_users_for_messaging(self):
-        """Gets all users except the current one for messaging purposes."""
-        return self.models['user'].get_all_users_except(self.current_user['userId'])
+    def search_users_for_messaging(self, query, page=0, page_size=20):
+        """Typeahead search over usernames and profile names, excluding the current user. Returns (users, has_more)."""
+        return self.models['user'].get_directory().search(query, self.current_user['userId'], page, page_size)
+
+    # --- Schedule Data ---
+    def get_week_sessions(self, week_start):
+        """Sessions for the current user in the week starting at week_start."""
+        role = 'instructor' if self.current_user['userRole'] == 'instructor' else 'learner'
+        return self.models['session'].get_week(self.current_user['userId'], week_start, role)
 
     # --- Messaging Data ---
     def get_conversation_partners(self):
         return self.models['message'].get_conversation_partners(self.current_user['userId'])
 
-    def get_conversation(self, partner_id):
-        return self.models['message'].get_conversation(self.current_user['userId'], partner_id)
+    def get_conversation(self, partner_id, limit=None, before=None):
+        """A page of the conversation with partner_id, oldest first; pass the oldest shown message as `before` for earlier pages."""
+        return self.models['message'].get_conversation(self.current_user['userId'], partner_id, limit, before)
 
     # --- Profile Actions ---
     def handle_update_profile(self, profile_data):
         user_id = self.current_user['userId']
         if self.models['profile'].create_or_update(user_id, profile_data):
+            self.models['user'].get_directory().update_profile(user_id, profile_data.get('firstName'), profile_data.get('lastName'))
+            self._discard_dashboard_snapshot()
             self.view.show_snackbar("Profile updated successfully!", "green")
             self.view.page.go(self.view.page.route)
         else:
             self.view.show_snackbar("Failed to update profile.")
 
+    # --- Upload Actions ---
+    def _get_upload_service(self):
+        if self.upload_service is None:
+            import config
+            from services.upload_service import UploadService
+            self.upload_service = UploadService(size_limits={"resumes": config.MAX_RESUME_BYTES, "avatars_original": config.MAX_PROFILE_PICTURE_BYTES})
+        return self.upload_service
+
+    def handle_resume_upload(self, source_path, on_done):
+        """Stores a resume in the background; on_done(relative_path, error) runs when it finishes."""
+        service = self._get_upload_service()
+        service.submit(service.store, source_path, "resumes", on_done=on_done)
+
+    def handle_profile_picture_upload(self, source_path, on_done):
+        """Stores a profile picture in the background and reports the path of its downscaled avatar."""
+        import config
+        service = self._get_upload_service()
+        service.submit(service.store_avatar, source_path, config.AVATAR_SIZE, on_done=on_done)
+
     # --- Assignment Actions ---
     def handle_create_assignment(self, skill_id, title, description, due_date):
         if not all([skill_id, title, description, due_date]):
@@ -137,6 +320,7 @@ class Controller:
 
     def handle_submit_assignment(self, assignment_id):
         if self.models['assignment'].submit(assignment_id, self.current_user['userId']):
+            self._discard_dashboard_snapshot()
             self.view.show_snackbar("Assignment submitted!", "green")
             self.view.page.go("/learner") # Refresh the view
         else:
@@ -155,8 +339,112 @@ class Controller:
             self.view.show_snackbar("Failed to send message.")
             return False
 
+    def _get_map_service(self):
+        if self.map_service is None:
+            # Imported here so the map stack only loads when a map is requested.
+            from services.map_service import MapService
+            self.map_service = MapService()
+        return self.map_service
+
     def show_user_location_on_map(self, lat, lon):
-        map_file = MapService.generate_map(lat, lon)
+        if lat is None or lon is None:
+            self.view.show_snackbar("No location is on file for this account.", "orange")
+            return
+        map_file = self._get_map_service().generate_map(lat, lon)
         # You can now display this HTML file in a webview or open it externally
         # For Flet, you might use ft.WebView or prompt the user to open the file
         self.view.show_map_dialog(map_file)
+
+
+    # --- Admin Data ---
+    def get_admin_dashboard_data(self):
+        """Reads the precomputed rollups for the admin dashboard, fanning out across tenant shards when sharded."""
+        if not self.models.router:
+            analytics = self.models['analytics']
+            return {
+                "summary": analytics.get_summary(),
+                "weekly_sessions": analytics.get_weekly_sessions(),
+                "instructors": analytics.get_instructor_summary(),
+                "skills": analytics.get_skill_summary(),
+            }
+        from models import analytics as rollups
+
+        def read_shard(tenant_id):
+            analytics = self.models.for_tenant(tenant_id, 'analytics')
+            return analytics.get_summary(), analytics.get_weekly_sessions(), analytics.get_instructor_summary(), analytics.get_skill_summary()
+
+        summaries, weekly, instructors, skills = zip(*self.models.router.fan_out(read_shard).values())
+        return {
+            "summary": rollups.merge_summaries(summaries),
+            "weekly_sessions": rollups.merge_weekly_sessions(weekly),
+            "instructors": rollups.merge_instructor_summaries(instructors),
+            "skills": rollups.merge_skill_summaries(skills),
+        }
+
+    def get_weekly_sessions_chart(self, weekly_sessions, on_ready):
+        data = [(row['week'], row['sessions'], row['sessionsCompleted']) for row in weekly_sessions]
+        return self._get_chart_service().get_chart("weekly_sessions", data, on_ready=on_ready)
+
+    # --- Admin Actions ---
+    def handle_export(self, dataset, fmt, start_date, end_date, output_path):
+        """Streams a reporting export to the file chosen by the admin."""
+        if not self.current_user or self.current_user['userRole'] != 'admin':
+            self.view.show_error_dialog("Only administrators can export reports.")
+            return False
+        if not all([dataset, fmt, output_path]):
+            self.view.show_error_dialog("Please choose a dataset, a format and a destination file.")
+            return False
+        for value in (start_date, end_date):
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    self.view.show_error_dialog(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+                    return False
+
+        try:
+            self.export_service.export_to_file(dataset, fmt, output_path, start_date or None, end_date or None)
+        except (ValueError, OSError) as e:
+            self.view.show_error_dialog(f"Export failed: {e}")
+            return False
+        self.view.show_snackbar(f"Export saved to {output_path}", "green")
+        return True
+
+    # --- Diagnostics ---
+    def is_tracing_enabled(self):
+        return tracing.tracer.enabled
+
+    def get_slowest_actions(self, limit=15):
+        """The slowest recently traced user actions, as (name, duration ms, span count, slowest inner span)."""
+        rows = []
+        for action in tracing.tracer.slowest(limit):
+            # The root span is matched by name and start: bound continuations can finish after it.
+            inner = max((span for span in action.spans if (span[0], span[2]) != (action.name, action.started)), key=lambda span: span[3], default=None)
+            rows.append((action.name, round(action.duration * 1000, 1), len(action.spans), f"{inner[0]} ({inner[3] * 1000:.1f} ms)" if inner else "-"))
+        return rows
+
+    def handle_export_trace(self, output_path):
+        """Writes the recent tracing spans as Chrome trace-event JSON (admin only)."""
+        if not self.current_user or self.current_user['userRole'] != 'admin':
+            self.view.show_error_dialog("Only administrators can export traces.")
+            return False
+        try:
+            tracing.tracer.export_chrome(output_path)
+        except OSError as e:
+            self.view.show_error_dialog(f"Trace export failed: {e}")
+            return False
+        self.view.show_snackbar(f"Trace saved to {output_path}", "green")
+        return True
+
+    def show_user_density_map(self):
+        """Shows where instructors and learners are concentrated (admin only)."""
+        if not self.current_user or self.current_user['userRole'] != 'admin':
+            self.view.show_error_dialog("Only administrators can view the density map.")
+            return
+        self.view.show_loading_dialog(True)
+        try:
+            locations = itertools.chain.from_iterable(self.models.for_tenant(tenant_id, 'user').iter_locations() for tenant_id in self.models.shards())
+            map_file = self._get_map_service().generate_density_map(locations)
+        finally:
+            self.view.show_loading_dialog(False)
+        self.view.show_map_dialog(map_file, "Instructor & Learner Density")
@@ -0,0 +1,71 @@
+# core/startup_profiler.py
+import builtins
+import sys
+import time
+
+class StartupProfiler:
+    """
+    Records how long each module takes to import during startup, plus the time to the first rendered frame.
+    Enabled with `python main.py --profile-startup`; the report is printed to stderr.
+    """
+    def __init__(self, started_at=None, top=25):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.top = top
+        self.timings = {}  # module name -> [inclusive seconds, self seconds]
+        self.first_frame_at = None
+        self._stack = []
+        self._original_import = None
+
+    def install(self):
+        """Wraps builtins.__import__ so every newly loaded module is timed."""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            # Relative or already-loaded imports are cheap lookups; nested loads are still timed by their own calls.
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            inclusive = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += inclusive
+            self.timings[name] = [inclusive, inclusive - children]
+
+    def mark_first_frame(self):
+        """Records the first frame; returns True only the first time it is called."""
+        if self.first_frame_at is not None:
+            return False
+        self.first_frame_at = time.perf_counter()
+        return True
+
+    @property
+    def time_to_first_frame_ms(self):
+        if self.first_frame_at is None:
+            return None
+        return (self.first_frame_at - self.started_at) * 1000
+
+    def report(self, out=None):
+        """Prints the slowest imports (by self time) and the time to first frame."""
+        out = out or sys.stderr
+        total = sum(self_time for _, self_time in self.timings.values())
+        print(f"--- Startup profile: {len(self.timings)} modules imported in {total * 1000:.1f} ms ---", file=out)
+        print(f"{'self ms':>10} {'incl. ms':>10}  module", file=out)
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (inclusive, self_time) in ranked[:self.top]:
+            print(f"{self_time * 1000:>10.1f} {inclusive * 1000:>10.1f}  {name}", file=out)
+        if self.time_to_first_frame_ms is not None:
+            print(f"time to first frame: {self.time_to_first_frame_ms:.1f} ms", file=out)
+        out.flush()
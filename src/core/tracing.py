@@ -0,0 +1,209 @@
+# core/tracing.py
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from collections import deque, namedtuple
+
+# One finished, sampled user action: the root span's name/start/duration plus every span recorded under it.
+# Each span is (name, category, start, duration, thread id, depth), in completion order (the root is last,
+# except for bound continuations, which can finish after it).
+TracedAction = namedtuple("TracedAction", ["name", "started", "duration", "spans"])
+
+class Tracer:
+    """
+    Lightweight nested timing spans. The outermost span on a thread is a user action; whether it is
+    recorded is decided once per action by sample_rate, so unsampled actions cost one random() call.
+    The most recent sampled actions are kept in memory and can be exported as Chrome trace-event JSON
+    (open in chrome://tracing or https://ui.perfetto.dev).
+    Work an action hands to another thread (e.g. a future's done-callback) joins it through bind(); the
+    action is recorded when its last continuation finishes, so its duration covers the whole interaction.
+    """
+    def __init__(self, sample_rate=0.0, max_actions=200):
+        self.sample_rate = sample_rate
+        self.epoch = time.perf_counter()
+        self._actions = deque(maxlen=max_actions)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def span(self, name, category="app"):
+        return _Span(self, name, category)
+
+    def _record(self, action):
+        with self._lock:
+            self._actions.append(action)
+
+    def _current_action(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def _finish(self, action):
+        """Records an action once its root span and every bound continuation have finished."""
+        with self._lock:
+            action.pending -= 1
+            done = action.pending == 0
+        if done:
+            name, started, _ = action.root
+            self._record(TracedAction(name, started, action.end - started, action.spans))
+
+    def bind(self, fn, name, category="app"):
+        """
+        Returns fn wrapped to run, on whatever thread calls it, as a span of the current action (a continuation).
+        Outside a sampled action fn is returned unchanged. The wrapper must be called exactly once,
+        as future callbacks are; until it runs the action is not recorded.
+        """
+        action = self._current_action()
+        if action is None:
+            return fn
+        with self._lock:
+            action.pending += 1
+
+        @functools.wraps(fn)
+        def continuation(*args, **kwargs):
+            local = self._local
+            stack = getattr(local, "stack", None)
+            if stack is None:
+                stack = local.stack = []
+            stack.append(action)
+            try:
+                with _Span(self, name, category):
+                    return fn(*args, **kwargs)
+            finally:
+                stack.pop()
+                self._finish(action)
+        return continuation
+
+    # --- Instrumentation ---
+    def wrap(self, fn, name, category):
+        if inspect.isgeneratorfunction(fn):
+            return self._wrap_generator(fn, name, category)
+
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            with _Span(self, name, category):
+                return fn(*args, **kwargs)
+        return traced
+
+    def _wrap_generator(self, fn, name, category):
+        """
+        Generators do their work while being consumed, not when called; the span covers the time spent
+        producing items (summed over resumes), recorded when the generator finishes or is closed.
+        """
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            generator = fn(*args, **kwargs)
+            action = self._current_action()
+            if action is None:
+                yield from generator
+                return
+            depth = len(self._local.stack)
+            started, active = time.perf_counter(), 0.0
+            try:
+                while True:
+                    resumed = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        active += time.perf_counter() - resumed
+                    yield item
+            finally:
+                generator.close()
+                action.spans.append((name, category, started, active, threading.get_ident(), depth))
+        return traced
+
+    def instrument(self, target, category, include):
+        """
+        Wraps the methods of a class or instance whose names satisfy include(name) in spans named
+        "<Class>.<method>". Returns the target so it can be used inline.
+        """
+        owner = target if isinstance(target, type) else type(target)
+        for attr in dir(owner):
+            if attr.startswith("__") or not include(attr):
+                continue
+            method = getattr(target, attr)
+            if callable(method) and not isinstance(method, type):
+                setattr(target, attr, self.wrap(method, f"{owner.__name__}.{attr}", category))
+        return target
+
+    # --- Reporting ---
+    def recent_actions(self):
+        with self._lock:
+            return list(self._actions)
+
+    def slowest(self, limit=20):
+        return sorted(self.recent_actions(), key=lambda action: action.duration, reverse=True)[:limit]
+
+    def chrome_trace(self):
+        """Returns the recorded spans as a Chrome trace-event document (complete 'X' events, microseconds)."""
+        pid = os.getpid()
+        events = [
+            {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+             "ts": round((start - self.epoch) * 1e6, 1), "dur": round(duration * 1e6, 1), "args": {"action": action.name}}
+            for action in self.recent_actions()
+            for name, category, start, duration, tid, _ in action.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+class _Action:
+    """Spans of one sampled action; pending counts the root span plus outstanding bound continuations."""
+    __slots__ = ("spans", "pending", "root", "end")
+
+    def __init__(self):
+        self.spans = []
+        self.pending = 1
+        self.root = None
+        self.end = 0.0
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "action", "start")
+
+    def __init__(self, tracer, name, category):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        local = self.tracer._local
+        stack = getattr(local, "stack", None)
+        if stack is None:
+            stack = local.stack = []
+        if stack:
+            self.action = stack[-1]
+        else:
+            # A new user action: decide once whether it and everything nested under it is recorded.
+            sampled = self.tracer.sample_rate > 0 and random.random() < self.tracer.sample_rate
+            self.action = _Action() if sampled else None
+        stack.append(self.action)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        stack = self.tracer._local.stack
+        stack.pop()
+        if self.action is None:
+            return False
+        self.action.spans.append((self.name, self.category, self.start, duration, threading.get_ident(), len(stack)))
+        with self.tracer._lock:
+            self.action.end = max(self.action.end, self.start + duration)
+        if not stack:
+            self.action.root = (self.name, self.start, duration)
+            self.tracer._finish(self.action)
+        return False
+
+# Process-wide tracer; disabled until main.py configures a sample rate.
+tracer = Tracer()
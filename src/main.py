@@ -1,27 +1,80 @@
 # main.py
-import flet as ft
 import os
 import sys
+import threading
+import time
+
+STARTED_AT = time.perf_counter()
 
 # --- Path Setup ---
 src_dir = os.path.dirname(os.path.abspath(__file__))
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
+# --- Startup Profiling (must be installed before the heavy imports below) ---
+from core.startup_profiler import StartupProfiler
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+EXIT_AFTER_FIRST_FRAME = "--exit-after-first-frame" in sys.argv
+profiler = StartupProfiler(started_at=STARTED_AT).install() if PROFILE_STARTUP else None
+
 # --- Component Imports ---
+# Models are imported on first use through the registry, and heavy services
+# (e.g. folium for maps) are imported inside the handlers that need them.
+import flet as ft
+import config
 from controllers.controller import Controller
 from models.database import Database
-from models.user import User
-from models.skill import Skill
-from models.request import Request
-from models.session import Session
-from models.learner_stats import LearnerStats
-from models.practice_material import PracticeMaterial
-from models.feedback import Feedback
-from models.profile import Profile
-from models.assignment import Assignment
-from models.message import Message
+from models.registry import ModelRegistry
 from views.view import View
+from core import tracing
+
+# --- Tracing ---
+TRACE_SAMPLE_RATE = 1.0 if "--trace" in sys.argv else config.TRACE_SAMPLE_RATE
+if TRACE_SAMPLE_RATE > 0:
+    tracing.tracer = tracing.Tracer(TRACE_SAMPLE_RATE, config.TRACE_MAX_ACTIONS)
+    tracing.tracer.instrument(Controller, "controller", lambda name: name.startswith(("handle_", "get_")))
+    tracing.tracer.instrument(View, "view", lambda name: name.startswith(("get_", "_build_", "show_")))
+
+# --- Process-wide State ---
+# main() runs once per page session, but the database objects and the background services exist once per
+# process: every session shares them, so last_activity (which maintenance uses to detect idle time) sees
+# the queries of all sessions.
+_process_lock = threading.Lock()
+_database = None
+_background_started = False
+
+def open_database():
+    """Returns the process-wide Database, or TenantRouter when a tenant directory exists."""
+    global _database
+    with _process_lock:
+        if _database is None:
+            if os.path.exists(config.TENANT_DIRECTORY):
+                # One shard per school (created with services/tenant_split.py); logins route to the user's shard.
+                from models.tenancy import TenantRouter
+                _database = TenantRouter(config.TENANT_DIRECTORY, config.TENANT_DEFAULT)
+            else:
+                _database = Database(db_file=os.path.join(src_dir, "db", "LetsInglesDB.db"))
+        return _database
+
+def start_background_services(models):
+    """Starts scheduled backups and idle-time maintenance for every shard file, once per process."""
+    global _background_started
+    with _process_lock:
+        if _background_started:
+            return
+        _background_started = True
+    for shard in models.shards().values():
+        if config.BACKUP_INTERVAL_HOURS > 0:
+            from services.backup_service import BackupService
+            BackupService(shard, config.BACKUP_DIR, keep=config.BACKUP_KEEP).start(config.BACKUP_INTERVAL_HOURS * 3600)
+        if config.MAINTENANCE_ENABLED:
+            from services.maintenance_service import MaintenanceScheduler
+            MaintenanceScheduler(shard, idle_seconds=config.MAINTENANCE_IDLE_SECONDS, interval_seconds=config.MAINTENANCE_INTERVAL_HOURS * 3600,
+                                 max_cycle_seconds=config.MAINTENANCE_MAX_CYCLE_SECONDS).start()
+    if models.router and config.BACKUP_INTERVAL_HOURS > 0:
+        # The user-to-tenant mapping is needed to restore the shards, so the directory is backed up with them.
+        from services.backup_service import BackupService
+        BackupService(Database(models.router.directory_file), config.BACKUP_DIR, keep=config.BACKUP_KEEP).start(config.BACKUP_INTERVAL_HOURS * 3600)
 
 def main(page: ft.Page):
     """
@@ -44,21 +97,11 @@ def main(page: ft.Page):
 
     # --- Database and Model Initialization ---
     try:
-        db_path = os.path.join(src_dir, "db", "LetsInglesDB.db")
-        db = Database(db_file=db_path)
-        
-        models = {
-            "user": User(db),
-            "skill": Skill(db),
-            "request": Request(db),
-            "session": Session(db),
-            "learner_stats": LearnerStats(db),
-            "practice_material": PracticeMaterial(db),
-            "feedback": Feedback(db),
-            "profile": Profile(db),
-            "assignment": Assignment(db),
-            "message": Message(db)
-        }
+        db = open_database()
+        instrument_model = (lambda model: tracing.tracer.instrument(model, "model", lambda name: not name.startswith("_"))) if tracing.tracer.enabled else None
+        models = ModelRegistry(db, on_create=instrument_model)
+
+        start_background_services(models)
     except FileNotFoundError as e:
         page.add(ft.Text(f"Error: {e}", color="red"))
         return
@@ -69,8 +112,20 @@ def main(page: ft.Page):
     view.page = page
     controller.set_view(view)
 
+    if tracing.tracer.enabled:
+        tracing.tracer.instrument(page, "ui", lambda name: name == "update")
+
     # --- Routing Logic ---
     def route_change(route):
+        with tracing.tracer.span(f"route {page.route}", "ui"):
+            _render_route()
+
+        if profiler and profiler.mark_first_frame():
+            profiler.report()
+            if EXIT_AFTER_FIRST_FRAME:
+                page.window_close()
+
+    def _render_route():
         page.views.clear()
         
         if page.route == "/":
@@ -0,0 +1,285 @@
+# models/analytics.py
+import argparse
+import sqlite3
+
+# --- Rollup Definitions ---
+# Each source table contributes counts to one or more rollup rows. A contribution is
+# (rollup table, key column, SELECT producing the key, {column: value expression}) written
+# against a row alias (NEW or OLD), so the same definition drives the insert/update/delete triggers.
+ROLLUP_TABLES = {
+    "rollup_daily": ("day TEXT", ["sessions", "sessionsCompleted", "feedbackCount", "ratingSum", "submissions"]),
+    "rollup_instructor": ("instructorID INTEGER", ["sessions", "sessionsCompleted", "feedbackCount", "ratingSum"]),
+    "rollup_skill": ("skillID INTEGER", ["learners", "sessionsCompleted", "proficiencySum", "submissions"]),
+}
+
+def _day(column):
+    return f"COALESCE(date({column}), 'unknown')"
+
+def _contributions(table, row):
+    if table == "session":
+        completed = f"({row}.status = 'completed')"
+        return [
+            ("rollup_daily", "day", f"SELECT {_day(row + '.sessionDate')}", {"sessions": "1", "sessionsCompleted": completed}),
+            ("rollup_instructor", "instructorID", f"SELECT {row}.instructorID", {"sessions": "1", "sessionsCompleted": completed}),
+        ]
+    if table == "feedback":
+        return [
+            ("rollup_daily", "day", f"SELECT {_day(row + '.feedbackDate')}", {"feedbackCount": "1", "ratingSum": f"{row}.rating"}),
+            ("rollup_instructor", "instructorID", f"SELECT instructorID FROM session WHERE sessionID = {row}.sessionID", {"feedbackCount": "1", "ratingSum": f"{row}.rating"}),
+        ]
+    if table == "submissions":
+        return [
+            ("rollup_daily", "day", f"SELECT {_day(row + '.submissionDate')}", {"submissions": "1"}),
+            ("rollup_skill", "skillID", f"SELECT skillID FROM assignments WHERE assignmentID = {row}.assignmentID", {"submissions": "1"}),
+        ]
+    if table == "learner_stats":
+        return [
+            ("rollup_skill", "skillID", f"SELECT {row}.skillID", {"learners": "1", "sessionsCompleted": f"{row}.sessionsCompleted", "proficiencySum": f"{row}.proficiencyScore"}),
+        ]
+    raise ValueError(table)
+
+# Some contributions take their key from a parent row (feedback is counted for its session's instructor, a
+# submission for its assignment's skill). These are the children's counts as seen from the parent row, so
+# they can be moved when the parent appears, disappears or changes its key; parents without children are skipped.
+def _dependent_contributions(table, row):
+    if table == "session":
+        feedback = f"FROM feedback WHERE sessionID = {row}.sessionID"
+        return [
+            ("rollup_instructor", "instructorID", f"SELECT {row}.instructorID WHERE EXISTS (SELECT 1 {feedback})",
+             {"feedbackCount": f"SELECT COUNT(*) {feedback}", "ratingSum": f"SELECT SUM(rating) {feedback}"}),
+        ]
+    if table == "assignments":
+        submissions = f"FROM submissions WHERE assignmentID = {row}.assignmentID"
+        return [
+            ("rollup_skill", "skillID", f"SELECT {row}.skillID WHERE EXISTS (SELECT 1 {submissions})",
+             {"submissions": f"SELECT COUNT(*) {submissions}"}),
+        ]
+    raise ValueError(table)
+
+def _bump_sql(contribution, sign):
+    rollup, key_column, key_select, deltas = contribution
+    columns = list(deltas)
+    values = ", ".join(f"{sign}({deltas[c]})" for c in columns)
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in columns)
+    # The key is a scalar subquery, so a missing parent row (e.g. feedback for an unknown session) yields NULL
+    # and is skipped. The WHERE clause also keeps SQLite from misparsing INSERT ... SELECT ... ON CONFLICT.
+    return (
+        f"INSERT INTO {rollup} ({key_column}, {', '.join(columns)}) "
+        f"SELECT rollup_key, {values} FROM (SELECT ({key_select}) AS rollup_key) WHERE rollup_key IS NOT NULL "
+        f"ON CONFLICT({key_column}) DO UPDATE SET {updates};"
+    )
+
+# Full recomputation queries, used for backfills and for verifying the incremental rollups.
+RECOMPUTE_SQL = {
+    "rollup_daily": f"""
+        SELECT day, SUM(sessions), SUM(sessionsCompleted), SUM(feedbackCount), SUM(ratingSum), SUM(submissions) FROM (
+            SELECT {_day('sessionDate')} AS day, 1 AS sessions, status = 'completed' AS sessionsCompleted,
+                   0 AS feedbackCount, 0 AS ratingSum, 0 AS submissions FROM session
+            UNION ALL SELECT {_day('feedbackDate')}, 0, 0, 1, rating, 0 FROM feedback
+            UNION ALL SELECT {_day('submissionDate')}, 0, 0, 0, 0, 1 FROM submissions
+        ) GROUP BY day
+    """,
+    "rollup_instructor": """
+        SELECT instructorID, SUM(sessions), SUM(sessionsCompleted), SUM(feedbackCount), SUM(ratingSum) FROM (
+            SELECT instructorID, 1 AS sessions, status = 'completed' AS sessionsCompleted, 0 AS feedbackCount, 0 AS ratingSum FROM session
+            UNION ALL SELECT s.instructorID, 0, 0, 1, f.rating FROM feedback f JOIN session s ON s.sessionID = f.sessionID
+        ) GROUP BY instructorID
+    """,
+    "rollup_skill": """
+        SELECT skillID, SUM(learners), SUM(sessionsCompleted), SUM(proficiencySum), SUM(submissions) FROM (
+            SELECT skillID, 1 AS learners, sessionsCompleted, proficiencyScore AS proficiencySum, 0 AS submissions FROM learner_stats
+            UNION ALL SELECT a.skillID, 0, 0, 0, 1 FROM submissions sub JOIN assignments a ON a.assignmentID = sub.assignmentID
+        ) GROUP BY skillID
+    """,
+}
+
+class Analytics:
+    """
+    Model for the admin dashboard's rollup tables (per-day, per-instructor and per-skill aggregates).
+    Triggers on session, feedback, submissions and learner_stats keep the rollups current on every write,
+    so dashboard reads never scan the source tables. Triggers on session and assignments move the feedback and
+    submission counts that depend on them (e.g. when a session is reassigned to another instructor).
+    """
+    SOURCE_TABLES = ("session", "feedback", "submissions", "learner_stats")
+    # Parent table -> the columns that decide where its children's contributions are counted.
+    PARENT_TABLES = {"session": ("sessionID", "instructorID"), "assignments": ("assignmentID", "skillID")}
+
+    def __init__(self, db):
+        self.db = db
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """Creates the rollup tables and triggers if needed, backfilling them the first time."""
+        with self.db.connect() as conn:
+            existing = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            created = not set(ROLLUP_TABLES) <= existing
+            for table, (key, columns) in ROLLUP_TABLES.items():
+                column_defs = ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in columns)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({key} PRIMARY KEY, {column_defs})")
+            for source in self.SOURCE_TABLES:
+                for event, parts in (("INSERT", [("NEW", "")]), ("DELETE", [("OLD", "-")]), ("UPDATE", [("OLD", "-"), ("NEW", "")])):
+                    body = "\n".join(_bump_sql(c, sign) for row, sign in parts for c in _contributions(source, row))
+                    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{source}_{event.lower()}_rollup AFTER {event} ON {source} BEGIN\n{body}\nEND")
+            for parent, key_columns in self.PARENT_TABLES.items():
+                changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in key_columns)
+                for event, parts in (("INSERT", [("NEW", "")]), ("DELETE", [("OLD", "-")]), (f"UPDATE OF {', '.join(key_columns)}", [("OLD", "-"), ("NEW", "")])):
+                    body = "\n".join(_bump_sql(c, sign) for row, sign in parts for c in _dependent_contributions(parent, row))
+                    when = f" WHEN {changed}" if event.startswith("UPDATE") else ""
+                    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{parent}_{event.split()[0].lower()}_dependents_rollup AFTER {event} ON {parent}{when} BEGIN\n{body}\nEND")
+            conn.commit()
+        if created:
+            self.rebuild()
+
+    def rebuild(self):
+        """Recomputes every rollup from the source tables in one transaction (for backfills and repairs)."""
+        try:
+            with self.db.connect() as conn:
+                for table, sql in RECOMPUTE_SQL.items():
+                    conn.execute(f"DELETE FROM {table}")
+                    conn.execute(f"INSERT INTO {table} {sql}")
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error rebuilding rollups: {e}")
+            return False
+
+    def verify(self):
+        """
+        Compares the incremental rollups with a full recomputation.
+        Returns a list of (table, key, rollup row, recomputed row) mismatches; empty means they agree.
+        """
+        mismatches = []
+        with self.db.connect() as conn:
+            for table, sql in RECOMPUTE_SQL.items():
+                expected = {tuple(row)[0]: tuple(row) for row in conn.execute(sql)}
+                # Rows whose counts all dropped to zero (after deletes) are equivalent to missing rows.
+                actual = {tuple(row)[0]: tuple(row) for row in conn.execute(f"SELECT * FROM {table}") if any(tuple(row)[1:])}
+                for key in expected.keys() | actual.keys():
+                    if expected.get(key) != actual.get(key):
+                        mismatches.append((table, key, actual.get(key), expected.get(key)))
+        return mismatches
+
+    # --- Dashboard Reads ---
+    def get_summary(self):
+        """Overall totals: sessions, completion rate, feedback count, average rating and submissions."""
+        sql = """
+            SELECT COALESCE(SUM(sessions), 0) AS sessions, COALESCE(SUM(sessionsCompleted), 0) AS sessionsCompleted,
+                   COALESCE(SUM(feedbackCount), 0) AS feedbackCount, COALESCE(SUM(ratingSum), 0) AS ratingSum,
+                   COALESCE(SUM(submissions), 0) AS submissions
+            FROM rollup_daily
+        """
+        with self.db.connect() as conn:
+            row = conn.execute(sql).fetchone()
+        return {
+            "sessions": row['sessions'],
+            "sessionsCompleted": row['sessionsCompleted'],
+            "completionRate": row['sessionsCompleted'] / row['sessions'] if row['sessions'] else 0.0,
+            "feedbackCount": row['feedbackCount'],
+            "ratingSum": row['ratingSum'],
+            "averageRating": row['ratingSum'] / row['feedbackCount'] if row['feedbackCount'] else None,
+            "submissions": row['submissions'],
+        }
+
+    def get_weekly_sessions(self, weeks=8):
+        """Sessions per ISO-ish week (YYYY-WW) over the last few weeks, oldest first."""
+        sql = """
+            SELECT strftime('%Y-%W', day) AS week, SUM(sessions) AS sessions, SUM(sessionsCompleted) AS sessionsCompleted
+            FROM rollup_daily
+            WHERE day != 'unknown' AND day >= date('now', ?)
+            GROUP BY week
+            ORDER BY week
+        """
+        with self.db.connect() as conn:
+            return conn.execute(sql, (f"-{weeks * 7} days",)).fetchall()
+
+    def get_instructor_summary(self, limit=10):
+        """Top instructors by average rating, with session and completion counts."""
+        sql = """
+            SELECT u.userName, r.instructorID, r.sessions, r.sessionsCompleted, r.feedbackCount,
+                   ROUND(1.0 * r.ratingSum / r.feedbackCount, 2) AS averageRating
+            FROM rollup_instructor r
+            JOIN user u ON u.userId = r.instructorID
+            WHERE r.feedbackCount > 0
+            ORDER BY averageRating DESC, r.feedbackCount DESC
+            LIMIT ?
+        """
+        with self.db.connect() as conn:
+            return conn.execute(sql, (limit,)).fetchall()
+
+    def get_instructor_ratings(self):
+        """Returns {instructorID: (ratingSum, feedbackCount)} for every rated instructor."""
+        sql = "SELECT instructorID, ratingSum, feedbackCount FROM rollup_instructor WHERE feedbackCount > 0"
+        with self.db.connect() as conn:
+            return {row['instructorID']: (row['ratingSum'], row['feedbackCount']) for row in conn.execute(sql)}
+
+    def get_skill_summary(self):
+        """Per-skill learner counts, completed sessions, average proficiency and submissions."""
+        sql = """
+            SELECT s.skillName, r.learners, r.sessionsCompleted, r.submissions, r.proficiencySum,
+                   ROUND(1.0 * r.proficiencySum / r.learners, 2) AS averageProficiency
+            FROM rollup_skill r
+            JOIN skills s ON s.skillID = r.skillID
+            ORDER BY s.skillName
+        """
+        with self.db.connect() as conn:
+            return conn.execute(sql).fetchall()
+
+# --- Cross-Shard Merging ---
+# With one database per tenant the admin dashboard reads each shard's rollups and combines them here.
+def merge_summaries(summaries):
+    totals = {key: sum(s[key] for s in summaries) for key in ("sessions", "sessionsCompleted", "feedbackCount", "ratingSum", "submissions")}
+    return {
+        "sessions": totals['sessions'],
+        "sessionsCompleted": totals['sessionsCompleted'],
+        "completionRate": totals['sessionsCompleted'] / totals['sessions'] if totals['sessions'] else 0.0,
+        "feedbackCount": totals['feedbackCount'],
+        "ratingSum": totals['ratingSum'],
+        "averageRating": totals['ratingSum'] / totals['feedbackCount'] if totals['feedbackCount'] else None,
+        "submissions": totals['submissions'],
+    }
+
+def merge_weekly_sessions(per_shard):
+    weeks = {}
+    for rows in per_shard:
+        for row in rows:
+            week = weeks.setdefault(row['week'], {"week": row['week'], "sessions": 0, "sessionsCompleted": 0})
+            week['sessions'] += row['sessions']
+            week['sessionsCompleted'] += row['sessionsCompleted']
+    return [weeks[week] for week in sorted(weeks)]
+
+def merge_instructor_summaries(per_shard, limit=10):
+    # Every instructor lives in exactly one shard, so the overall top N is within the shards' top N lists.
+    rows = [dict(row) for rows in per_shard for row in rows]
+    rows.sort(key=lambda row: (row['averageRating'], row['feedbackCount']), reverse=True)
+    return rows[:limit]
+
+def merge_skill_summaries(per_shard):
+    skills = {}
+    for rows in per_shard:
+        for row in rows:
+            skill = skills.setdefault(row['skillName'], {"skillName": row['skillName'], "learners": 0, "sessionsCompleted": 0, "submissions": 0, "proficiencySum": 0})
+            for key in ("learners", "sessionsCompleted", "submissions", "proficiencySum"):
+                skill[key] += row[key]
+    for skill in skills.values():
+        skill['averageProficiency'] = round(skill['proficiencySum'] / skill['learners'], 2) if skill['learners'] else None
+    return [skills[name] for name in sorted(skills)]
+
+if __name__ == "__main__":
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from models.database import Database
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the admin dashboard rollup tables.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "LetsInglesDB.db"))
+    args = parser.parse_args()
+
+    analytics = Analytics(Database(args.db))
+    if args.command == "rebuild":
+        sys.exit(0 if analytics.rebuild() else 1)
+    problems = analytics.verify()
+    for table, key, actual, expected in problems:
+        print(f"{table}[{key}]: rollup={actual} recomputed={expected}")
+    print("Rollups match a full recomputation." if not problems else f"{len(problems)} mismatched rollup rows.")
+    sys.exit(1 if problems else 0)
@@ -1,6 +1,7 @@
 # models/assignment.py
 import sqlite3
 from datetime import datetime
+from models.rows import AssignmentRow
 
 class Assignment:
     """Model for the 'assignments' and 'submissions' tables."""
@@ -31,6 +32,7 @@ class Assignment:
         """
         with self.db.connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = AssignmentRow.factory
             cursor.execute(sql)
             return cursor.fetchall()
 
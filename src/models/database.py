@@ -1,6 +1,7 @@
 # models/database.py
 import sqlite3
 import os
+import time
 
 class Database:
     """Handles all database connections and operations."""
@@ -10,9 +11,12 @@ class Database:
         if not os.path.exists(self.db_file):
             raise FileNotFoundError(f"Database file not found at: {self.db_file}")
         self.conn = None
+        # Monotonic time of the last connect(); background maintenance uses it to detect idle periods.
+        self.last_activity = time.monotonic()
 
     def connect(self):
         """Establishes a connection to the SQLite database."""
+        self.last_activity = time.monotonic()
         try:
             self.conn = sqlite3.connect(self.db_file)
             # This allows accessing columns by name, which is very convenient.
@@ -1,11 +1,39 @@
 # models/message.py
+import json
 import sqlite3
+import zlib
 from datetime import datetime
+from models.rows import MessageRow
 
 class Message:
-    """Model for the 'messages' table."""
+    """
+    Model for the 'messages' table. Old messages are moved by the archiver (services/message_archiver.py)
+    into compressed per-conversation segments in 'message_archive'; reads merge both transparently.
+    """
     def __init__(self, db):
         self.db = db
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        with self.db.connect() as conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_pair_time ON messages (senderID, receiverID, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_receiver ON messages (receiverID, senderID)")
+            # One row per segment: a run of consecutive messages between userA < userB, oldest segment first (seq).
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS message_archive (
+                    userA INTEGER NOT NULL,
+                    userB INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    messageCount INTEGER NOT NULL,
+                    firstTimestamp TEXT NOT NULL,
+                    lastTimestamp TEXT NOT NULL,
+                    lastMessageID INTEGER NOT NULL,
+                    payload BLOB NOT NULL, -- zlib-compressed JSON list of [messageID, senderID, receiverID, content, timestamp]
+                    PRIMARY KEY (userA, userB, seq)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_message_archive_userB ON message_archive (userB, userA)")
+            conn.commit()
 
     def create(self, sender_id, receiver_id, content):
         """Creates a new message."""
@@ -22,28 +50,77 @@ class Message:
             return None
 
     def get_conversation_partners(self, user_id):
-        """Gets a list of users someone has messaged or received messages from."""
+        """Gets a list of users someone has messaged or received messages from (including archived conversations)."""
         sql = """
-            SELECT DISTINCT u.userId, u.userName
+            SELECT u.userId, u.userName
             FROM user u
-            JOIN messages m ON u.userId = m.senderID OR u.userId = m.receiverID
-            WHERE (m.senderID = ? OR m.receiverID = ?) AND u.userId != ?
+            WHERE u.userId IN (
+                SELECT receiverID FROM messages WHERE senderID = ?
+                UNION SELECT senderID FROM messages WHERE receiverID = ?
+                UNION SELECT userB FROM message_archive WHERE userA = ?
+                UNION SELECT userA FROM message_archive WHERE userB = ?
+            ) AND u.userId != ?
         """
         with self.db.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute(sql, (user_id, user_id, user_id))
+            cursor.execute(sql, (user_id, user_id, user_id, user_id, user_id))
             return cursor.fetchall()
 
-    def get_conversation(self, user1_id, user2_id):
-        """Gets the full message history between two users."""
+    def get_conversation(self, user1_id, user2_id, limit=None, before=None):
+        """
+        Gets the message history between two users, oldest first.
+        With a limit, returns only the newest `limit` messages older than `before` (a row from a previous page),
+        so the chat can load earlier pages as the user scrolls; archived segments are read only when needed.
+        """
         sql = """
-            SELECT m.*, u_sender.userName as senderName
+            SELECT m.messageID, m.senderID, m.receiverID, m.content, m.timestamp, u_sender.userName as senderName
             FROM messages m
             JOIN user u_sender ON m.senderID = u_sender.userId
-            WHERE (senderID = ? AND receiverID = ?) OR (senderID = ? AND receiverID = ?)
-            ORDER BY timestamp ASC
+            WHERE ((senderID = ? AND receiverID = ?) OR (senderID = ? AND receiverID = ?))
         """
+        params = [user1_id, user2_id, user2_id, user1_id]
+        if before is not None:
+            sql += " AND (m.timestamp < ? OR (m.timestamp = ? AND m.messageID < ?))"
+            params += [before['timestamp'], before['timestamp'], before['messageID']]
+        sql += " ORDER BY m.timestamp DESC, m.messageID DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
         with self.db.connect() as conn:
+            # One read transaction for the hot table and the archive, so a concurrent MessageArchiver move
+            # is seen either entirely or not at all (never as the same message in both).
+            conn.execute("BEGIN")
             cursor = conn.cursor()
-            cursor.execute(sql, (user1_id, user2_id, user2_id, user1_id))
-            return cursor.fetchall()
+            cursor.row_factory = MessageRow.factory
+            cursor.execute(sql, params)
+            newest_first = cursor.fetchall()
+            if limit is None or len(newest_first) < limit:
+                # The hot table is exhausted for this page; continue into the archive (all of it precedes the hot rows).
+                oldest = newest_first[-1] if newest_first else before
+                remaining = None if limit is None else limit - len(newest_first)
+                newest_first.extend(self._read_archive(conn, user1_id, user2_id, remaining, oldest))
+        newest_first.reverse()
+        return newest_first
+
+    def _read_archive(self, conn, user1_id, user2_id, limit, before):
+        """Yields archived messages newest first, decompressing one segment at a time until `limit` are read."""
+        user_a, user_b = sorted((user1_id, user2_id))
+        sql = "SELECT payload FROM message_archive WHERE userA = ? AND userB = ?"
+        params = [user_a, user_b]
+        if before is not None:
+            # Segments that start at or after the cursor can't contain earlier messages.
+            sql += " AND firstTimestamp <= ?"
+            params.append(before['timestamp'])
+        sql += " ORDER BY seq DESC"
+        names = dict(conn.execute("SELECT userId, userName FROM user WHERE userId IN (?, ?)", (user_a, user_b)).fetchall())
+
+        read = 0
+        for (payload,) in conn.execute(sql, params):
+            for message_id, sender_id, receiver_id, content, timestamp in reversed(json.loads(zlib.decompress(payload))):
+                if before is not None and (timestamp, message_id) >= (before['timestamp'], before['messageID']):
+                    continue
+                yield MessageRow(message_id, sender_id, receiver_id, content, timestamp, names.get(sender_id))
+                read += 1
+                if limit is not None and read >= limit:
+                    return
@@ -1,5 +1,6 @@
 # models/profile.py
 import sqlite3
+from models.rows import ProfileRow
 
 class Profile:
     """Model for the 'user_profiles' table."""
@@ -8,9 +9,10 @@ class Profile:
 
     def get(self, user_id):
         """Retrieves a user's profile data by their user ID."""
-        sql = "SELECT * FROM user_profiles WHERE userID = ?"
+        sql = f"SELECT {', '.join(ProfileRow.__slots__)} FROM user_profiles WHERE userID = ?"
         with self.db.connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = ProfileRow.factory
             cursor.execute(sql, (user_id,))
             return cursor.fetchone()
 
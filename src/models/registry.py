@@ -0,0 +1,66 @@
+# models/registry.py
+import importlib
+from collections.abc import Mapping
+
+class ModelRegistry(Mapping):
+    """
+    Dictionary-like access to the application models, e.g. models['user'].
+    Each model module is imported and instantiated on first access instead of at startup.
+    With a TenantRouter (models/tenancy.py) each tenant gets its own instances, bound to its shard Database,
+    and models[...] resolves against this registry's tenant (one registry per page session, switched at login).
+    """
+    MODELS = {
+        "user": ("models.user", "User"),
+        "skill": ("models.skill", "Skill"),
+        "request": ("models.request", "Request"),
+        "session": ("models.session", "Session"),
+        "learner_stats": ("models.learner_stats", "LearnerStats"),
+        "practice_material": ("models.practice_material", "PracticeMaterial"),
+        "feedback": ("models.feedback", "Feedback"),
+        "profile": ("models.profile", "Profile"),
+        "assignment": ("models.assignment", "Assignment"),
+        "message": ("models.message", "Message"),
+        "analytics": ("models.analytics", "Analytics"),
+        "survey": ("models.survey", "Survey"),
+    }
+
+    def __init__(self, db, on_create=None):
+        self.db = db
+        # Optional hook applied to each model instance when it is first created (e.g. tracing instrumentation).
+        self.on_create = on_create
+        self.router = db if hasattr(db, "active_tenant") else None
+        self.tenant_id = self.router.default_tenant if self.router else None
+        self._instances = {}
+
+    def __getitem__(self, name):
+        return self.for_tenant(self.tenant_id, name)
+
+    def use_tenant(self, tenant_id):
+        """Points models[...] at another tenant's shard (no-op without a router)."""
+        if self.router:
+            self.router.shard(tenant_id)  # Fails early for unknown tenants.
+            self.tenant_id = tenant_id
+
+    def for_tenant(self, tenant_id, name):
+        """The model instance for a specific tenant's shard (tenant_id is ignored without a router)."""
+        key = (tenant_id, name)
+        if key not in self._instances:
+            module_name, class_name = self.MODELS[name]
+            model_class = getattr(importlib.import_module(module_name), class_name)
+            instance = model_class(self.router.shard(tenant_id) if self.router else self.db)
+            if self.on_create:
+                self.on_create(instance)
+            self._instances[key] = instance
+        return self._instances[key]
+
+    def shards(self):
+        """Returns {tenant_id: Database} for every shard ({None: db} for a single database)."""
+        if not self.router:
+            return {None: self.db}
+        return {tenant_id: self.router.shard(tenant_id) for tenant_id in self.router.tenants()}
+
+    def __iter__(self):
+        return iter(self.MODELS)
+
+    def __len__(self):
+        return len(self.MODELS)
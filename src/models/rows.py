@@ -0,0 +1,50 @@
+# models/rows.py
+class RowBase:
+    """
+    Compact result row: values live in __slots__ (no per-row dict), and rows still support
+    row['column'], row.get(), keys() and dict(row) like sqlite3.Row.
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.values() == self.values()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.__slots__)})"
+
+    @classmethod
+    def factory(cls, cursor, row):
+        """sqlite3 row_factory building this type straight from the tuple (columns must match __slots__ order)."""
+        return cls(*row)
+
+def row_type(name, fields):
+    """Creates a RowBase subclass with the given column names as slots."""
+    return type(name, (RowBase,), {"__slots__": tuple(fields)})
+
+# --- Row Types (field order matches the SELECT that produces them) ---
+AuthUser = row_type("AuthUser", ["userId", "userRole", "userName", "userPass", "userLat", "userLong"])
+SessionUser = row_type("SessionUser", ["userId", "userRole", "userName", "userLat", "userLong"])
+InstructorRow = row_type("InstructorRow", ["userId", "userName", "userLat", "userLong"])
+ProfileRow = row_type("ProfileRow", ["firstName", "lastName", "middleInitial", "age", "educationLevel", "aboutMe", "profilePicture", "school", "occupation", "specialization", "resumePath"])
+AssignmentRow = row_type("AssignmentRow", ["assignmentID", "title", "description", "dueDate", "skillName", "instructorName"])
+LearnerAssignment = row_type("LearnerAssignment", AssignmentRow.__slots__ + ("status",))
+MessageRow = row_type("MessageRow", ["messageID", "senderID", "receiverID", "content", "timestamp", "senderName"])
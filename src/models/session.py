@@ -1,24 +1,70 @@
 # models/session.py
 import sqlite3
+from datetime import date, datetime, timedelta
+import config
+from services.session_calendar import SessionCalendar
 
 class Session:
     """Model for the 'session' table."""
     def __init__(self, db):
         self.db = db
+        self.calendar = SessionCalendar(self._get_upcoming_slots, config.SESSION_DURATION_MINUTES)
+        with self.db.connect() as conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_instructor_date ON session (instructorID, sessionDate)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_learner_date ON session (learnerID, sessionDate)")
 
     def create(self, request_id, instructor_id, learner_id, session_date):
-        """Creates a new session record, linking a request to an instructor."""
+        """Creates a new session record, linking a request to an instructor. Double bookings are rejected."""
+        try:
+            conflict, reservation = self.calendar.reserve(instructor_id, learner_id, session_date)
+        except ValueError:
+            return "Error: Session date must be YYYY-MM-DD or YYYY-MM-DD HH:MM."
+        if conflict:
+            return f"Error: The {conflict} is already booked at that time."
+
+        # The slot is held while the row is written, and released again if the insert fails.
         sql = "INSERT INTO session (requestID, instructorID, learnerID, sessionDate) VALUES (?, ?, ?, ?)"
         try:
             with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, (request_id, instructor_id, learner_id, session_date))
                 conn.commit()
+                self.calendar.confirm(reservation, cursor.lastrowid)
                 return cursor.lastrowid
         except sqlite3.Error as e:
+            self.calendar.remove(reservation)
             print(f"Database error creating session: {e}")
             return None
 
+    def _get_upcoming_slots(self, role, user_id):
+        """Loads one person's non-cancelled sessions from today on, for the booking calendar."""
+        column = "instructorID" if role == "instructor" else "learnerID"
+        sql = f"SELECT sessionID, sessionDate FROM session WHERE {column} = ? AND sessionDate >= ? AND status != 'cancelled'"
+        with self.db.connect() as conn:
+            return conn.execute(sql, (user_id, date.today().isoformat())).fetchall()
+
+    def get_in_range(self, user_id, start_date, end_date, role="instructor"):
+        """Sessions for an instructor or learner with start_date <= sessionDate < end_date, using the (person, date) index."""
+        column, other = ("instructorID", "learnerID") if role == "instructor" else ("learnerID", "instructorID")
+        sql = f"""
+            SELECT s.sessionID, s.sessionDate, s.status, u.userName as partnerName, r.reqSkills
+            FROM session s
+            JOIN user u ON s.{other} = u.userId
+            JOIN request r ON s.requestID = r.reqId
+            WHERE s.{column} = ? AND s.sessionDate >= ? AND s.sessionDate < ?
+            ORDER BY s.sessionDate
+        """
+        with self.db.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, (user_id, start_date, end_date))
+            return cursor.fetchall()
+
+    def get_week(self, user_id, week_start, role="instructor"):
+        """Sessions in the 7 days starting at week_start (a date or 'YYYY-MM-DD')."""
+        if isinstance(week_start, str):
+            week_start = datetime.strptime(week_start, "%Y-%m-%d").date()
+        return self.get_in_range(user_id, week_start.isoformat(), (week_start + timedelta(days=7)).isoformat(), role)
+
     def get_by_instructor(self, instructor_id):
         """Retrieves all sessions for a specific instructor, including learner and skill info."""
         sql = """
@@ -57,6 +103,8 @@ class Session:
                 cursor = conn.cursor()
                 cursor.execute(sql, (status, session_id))
                 conn.commit()
+                if status == 'cancelled':
+                    self.calendar.remove(session_id)
                 return True
         except sqlite3.Error as e:
             print(f"Database error updating session status: {e}")
@@ -0,0 +1,108 @@
+# models/survey.py
+import json
+import re
+import sqlite3
+from datetime import datetime
+
+# Question ids are used as JSON object keys and in JSON paths ($.<id>), so they are kept to a safe alphabet.
+QUESTION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+
+class Survey:
+    """Model for the 'surveys' and 'survey_responses' tables."""
+    def __init__(self, db):
+        self.db = db
+        with self.db.connect() as conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_responses_survey ON survey_responses (surveyID)")
+
+    def create(self, creator_id, title, questions):
+        """
+        Creates a new survey. questions is a list of dicts such as
+        {"id": "q1", "text": "How was your session?", "options": ["Great", "OK", "Poor"]}.
+        Question ids may contain only letters, digits and underscores.
+        """
+        invalid = [q.get("id") for q in questions if not QUESTION_ID_PATTERN.match(str(q.get("id", "")))]
+        if invalid:
+            print(f"Invalid survey question ids: {invalid}")
+            return None
+        sql = "INSERT INTO surveys (creatorID, title, questions, creationDate) VALUES (?, ?, ?, ?)"
+        creation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self.db.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(sql, (creator_id, title, json.dumps(questions), creation_date))
+                conn.commit()
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Database error creating survey: {e}")
+            return None
+
+    def get(self, survey_id):
+        """Retrieves a survey with its questions decoded."""
+        sql = "SELECT surveyID, creatorID, title, questions, creationDate FROM surveys WHERE surveyID = ?"
+        with self.db.connect() as conn:
+            row = conn.execute(sql, (survey_id,)).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), "questions": json.loads(row['questions'])}
+
+    def record_responses(self, survey_id, responses):
+        """
+        Stores many responses in one transaction. responses is an iterable of (learner_id, answers) where
+        answers maps question ids to an answer, or to a list of answers for multi-select questions.
+        """
+        sql = "INSERT INTO survey_responses (surveyID, learnerID, responses, responseDate) VALUES (?, ?, ?, ?)"
+        response_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self.db.connect() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(sql, ((survey_id, learner_id, json.dumps(answers), response_date) for learner_id, answers in responses))
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Database error recording survey responses: {e}")
+            return 0
+
+    def submit_response(self, survey_id, learner_id, answers):
+        """Stores a single learner's answers."""
+        return self.record_responses(survey_id, [(learner_id, answers)]) == 1
+
+    def get_answer_distribution(self, survey_id):
+        """
+        Counts each answer per question, aggregated inside SQLite with json_each so responses
+        are never decoded in Python. Multi-select answers count once per selected option.
+        Returns {question_id: [(answer, count), ...]} with the most common answers first.
+        """
+        sql = """
+            SELECT q.key AS questionID, COALESCE(a.value, q.value) AS answer, COUNT(*) AS count
+            FROM survey_responses sr
+            JOIN json_each(sr.responses) q
+            LEFT JOIN json_each(CASE WHEN q.type = 'array' THEN q.value END) a
+            WHERE sr.surveyID = ? AND NOT (q.type = 'array' AND a.value IS NULL)
+            GROUP BY questionID, answer
+            ORDER BY questionID, count DESC
+        """
+        distribution = {}
+        with self.db.connect() as conn:
+            for row in conn.execute(sql, (survey_id,)):
+                distribution.setdefault(row['questionID'], []).append((row['answer'], row['count']))
+        return distribution
+
+    def get_question_distribution(self, survey_id, question_id):
+        """
+        Answer counts for a single question, most common first. Like get_answer_distribution, multi-select
+        answers are expanded with json_each and count once per selected option.
+        """
+        if not QUESTION_ID_PATTERN.match(question_id):
+            print(f"Invalid survey question id: {question_id!r}")
+            return []
+        # json_each over a path yields the array's elements, or a single row when the answer is a scalar.
+        sql = """
+            SELECT a.value AS answer, COUNT(*) AS count
+            FROM survey_responses sr
+            JOIN json_each(sr.responses, ?) a
+            WHERE sr.surveyID = ? AND a.value IS NOT NULL
+            GROUP BY answer
+            ORDER BY count DESC
+        """
+        with self.db.connect() as conn:
+            return [(row['answer'], row['count']) for row in conn.execute(sql, (f"$.{question_id}", survey_id))]
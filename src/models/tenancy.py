@@ -0,0 +1,162 @@
+# models/tenancy.py
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from models.database import Database
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+class TenantRouter:
+    """
+    Routes connect() to one SQLite file per tenant (school), so each school has its own write lock.
+    A small directory database maps user names to tenants. It exposes the same connect() / db_file /
+    last_activity interface as Database, so models stay tenant-agnostic: ModelRegistry gives each tenant its
+    own model instances bound to that tenant's shard, and each page session's registry selects its tenant
+    at login (ModelRegistry.use_tenant). connect() itself routes to the router's active tenant, which is the
+    default unless a script calls activate().
+    """
+    def __init__(self, directory_file, default_tenant=None):
+        self.directory_file = directory_file
+        if not os.path.exists(self.directory_file):
+            raise FileNotFoundError(f"Tenant directory not found at: {self.directory_file}")
+        self.ensure_schema()
+        self._shards = {}
+        self._created_at = time.monotonic()
+        tenants = self.tenants()
+        self.default_tenant = default_tenant or (tenants[0] if tenants else None)
+        self._active = self.default_tenant
+
+    def _connect_directory(self):
+        conn = sqlite3.connect(self.directory_file)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ensure_schema(self):
+        with self._connect_directory() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tenants (
+                    tenantId TEXT PRIMARY KEY,
+                    name TEXT,
+                    dbFile TEXT NOT NULL -- relative to the directory database's folder
+                );
+                CREATE TABLE IF NOT EXISTS user_tenants (
+                    userName TEXT PRIMARY KEY,
+                    tenantId TEXT NOT NULL REFERENCES tenants (tenantId)
+                );
+                CREATE INDEX IF NOT EXISTS idx_user_tenants_tenant ON user_tenants (tenantId);
+            """)
+
+    # --- Directory ---
+    def tenants(self):
+        """Returns the tenant ids, in a stable order."""
+        with self._connect_directory() as conn:
+            return [row['tenantId'] for row in conn.execute("SELECT tenantId FROM tenants ORDER BY tenantId")]
+
+    def add_tenant(self, tenant_id, db_file, name=None):
+        """Registers (or re-points) a tenant's shard file. Returns True on success."""
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            print(f"Invalid tenant id '{tenant_id}': use letters, digits, '-' and '_' only.")
+            return False
+        if os.path.abspath(db_file) == os.path.abspath(self.directory_file):
+            print(f"Tenant '{tenant_id}' cannot use the tenant directory as its shard.")
+            return False
+        relative = os.path.relpath(os.path.abspath(db_file), os.path.dirname(os.path.abspath(self.directory_file)))
+        try:
+            with self._connect_directory() as conn:
+                conn.execute("""
+                    INSERT INTO tenants (tenantId, name, dbFile) VALUES (?, ?, ?)
+                    ON CONFLICT(tenantId) DO UPDATE SET name = excluded.name, dbFile = excluded.dbFile
+                """, (tenant_id, name or tenant_id, relative))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error registering tenant '{tenant_id}': {e}")
+            return False
+        self._shards.pop(tenant_id, None)
+        if self.default_tenant is None:
+            self.default_tenant = self._active = tenant_id
+        return True
+
+    def tenant_for_user(self, user_name):
+        """Returns the tenant id a user belongs to, or None for unknown users."""
+        with self._connect_directory() as conn:
+            row = conn.execute("SELECT tenantId FROM user_tenants WHERE userName = ?", (user_name,)).fetchone()
+        return row['tenantId'] if row else None
+
+    def assign_user(self, user_name, tenant_id):
+        """Records which tenant a user belongs to. Returns True on success."""
+        try:
+            with self._connect_directory() as conn:
+                conn.execute("INSERT OR REPLACE INTO user_tenants (userName, tenantId) VALUES (?, ?)", (user_name, tenant_id))
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error assigning '{user_name}' to tenant '{tenant_id}': {e}")
+            return False
+
+    def unassign_user(self, user_name):
+        """Removes a user's directory entry (e.g. when creating the account failed). Returns True on success."""
+        try:
+            with self._connect_directory() as conn:
+                conn.execute("DELETE FROM user_tenants WHERE userName = ?", (user_name,))
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error removing '{user_name}' from the tenant directory: {e}")
+            return False
+
+    def assign_users(self, assignments):
+        """Bulk version of assign_user for an iterable of (userName, tenantId)."""
+        with self._connect_directory() as conn:
+            conn.executemany("INSERT OR REPLACE INTO user_tenants (userName, tenantId) VALUES (?, ?)", assignments)
+            conn.commit()
+
+    # --- Routing ---
+    def shard(self, tenant_id):
+        """Returns the Database for a tenant's shard file."""
+        if tenant_id not in self._shards:
+            with self._connect_directory() as conn:
+                row = conn.execute("SELECT dbFile FROM tenants WHERE tenantId = ?", (tenant_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown tenant: {tenant_id}")
+            # setdefault keeps a single Database per tenant if two threads race to open the same shard.
+            self._shards.setdefault(tenant_id, Database(os.path.join(os.path.dirname(os.path.abspath(self.directory_file)), row['dbFile'])))
+        return self._shards[tenant_id]
+
+    def activate(self, tenant_id):
+        """Makes tenant_id the tenant that connect() routes to (for scripts; the app selects tenants per registry)."""
+        self.shard(tenant_id)  # Fails early for unknown tenants.
+        self._active = tenant_id
+
+    def active_tenant(self):
+        if self._active is None:
+            raise RuntimeError("No tenants are registered in the tenant directory.")
+        return self._active
+
+    def connect(self):
+        return self.shard(self.active_tenant()).connect()
+
+    @property
+    def db_file(self):
+        return self.shard(self.active_tenant()).db_file
+
+    @property
+    def last_activity(self):
+        return max([self._created_at] + [shard.last_activity for shard in self._shards.values()])
+
+    def close(self):
+        for shard in self._shards.values():
+            shard.close()
+
+    # --- Fan-out ---
+    def fan_out(self, fn, max_workers=None):
+        """
+        Calls fn(tenant_id) for every tenant on a thread pool and returns {tenant_id: result}.
+        sqlite3 releases the GIL while a query runs, so per-shard reads overlap.
+        """
+        tenants = self.tenants()
+        if len(tenants) <= 1:
+            return {tenant_id: fn(tenant_id) for tenant_id in tenants}
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(tenants), 8), thread_name_prefix="tenant-fan-out") as pool:
+            return dict(zip(tenants, pool.map(fn, tenants)))
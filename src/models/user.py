@@ -1,20 +1,19 @@
 # models/user.py
 import sqlite3
-import hashlib
+from models.rows import AuthUser, InstructorRow, SessionUser
+from services.password_hasher import PasswordHasher
 
 class User:
     """Model for the 'user' table."""
-    def __init__(self, db):
+    def __init__(self, db, hasher=None):
         self.db = db
-
-    @staticmethod
-    def _hash_password(password):
-        """Hashes the password using SHA256 for secure storage."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        self.hasher = hasher or PasswordHasher.from_config()
+        self._directory = None
 
     def create(self, user_role, user_name, user_pass, user_email, user_lat=None, user_long=None):
         """Creates a new user in the database."""
-        hashed_pass = self._hash_password(user_pass)
+        # Hashed on the calling thread: waiting on the KDF pool here would gain nothing and could deadlock from a pool worker.
+        hashed_pass = self.hasher.hash(user_pass)
         sql = '''INSERT INTO user(userRole, userName, userPass, userEmail, userLat, userLong)
                  VALUES(?,?,?,?,?,?)'''
         try:
@@ -22,6 +21,8 @@ class User:
                 cursor = conn.cursor()
                 cursor.execute(sql, (user_role, user_name, hashed_pass, user_email, user_lat, user_long))
                 conn.commit()
+                if self._directory is not None:
+                    self._directory.add_user(cursor.lastrowid, user_name, user_role)
                 return cursor.lastrowid
         except sqlite3.IntegrityError:
             return "Error: Username or email already exists."
@@ -29,36 +30,89 @@ class User:
             return f"Database error: {e}"
 
     def authenticate(self, user_name, password):
-        """Authenticates a user by checking username and hashed password."""
+        """
+        Authenticates a user by checking username and hashed password.
+        Legacy or outdated hashes are transparently upgraded to the current KDF settings.
+        """
         user = self.get_by_username(user_name)
-        if user and user['userPass'] == self._hash_password(password):
-            return user
-        return None
+        if not user or not self.hasher.verify(password, user.userPass):
+            return None
+        if self.hasher.needs_rehash(user.userPass):
+            self._update_password_hash(user.userId, self.hasher.hash(password))
+        # The logged-in user object never carries the password hash.
+        return SessionUser(user.userId, user.userRole, user.userName, user.userLat, user.userLong)
+
+    def authenticate_async(self, user_name, password):
+        """Runs authenticate() on the KDF pool and returns a Future resolving to the user row or None."""
+        return self.hasher.submit(self.authenticate, user_name, password)
+
+    def _update_password_hash(self, user_id, hashed_pass):
+        sql = "UPDATE user SET userPass = ? WHERE userId = ?"
+        try:
+            with self.db.connect() as conn:
+                conn.execute(sql, (hashed_pass, user_id))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error upgrading password hash: {e}")
 
     def get_by_username(self, user_name):
-        """Retrieves a single user by their username."""
-        sql = "SELECT * FROM user WHERE userName = ?"
+        """Retrieves a single user by their username (including the password hash, for authentication)."""
+        sql = "SELECT userId, userRole, userName, userPass, userLat, userLong FROM user WHERE userName = ?"
         with self.db.connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = AuthUser.factory
             cursor.execute(sql, (user_name,))
             return cursor.fetchone()
 
     def check_username(self, user_name):
         """Checks if a username already exists. Returns True if it exists, False otherwise."""
-        sql = "SELECT 1 FROM user WHERE userName = ?"
-        with self.db.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (user_name,))
-            return cursor.fetchone() is not None
+        return self.get_directory().contains(user_name)
+
+    def get_directory(self):
+        """Returns the in-memory user directory, loading it from the database on first use."""
+        if self._directory is None:
+            from services.user_directory import UserDirectory
+            sql = """
+                SELECT u.userId, u.userName, u.userRole, p.firstName, p.lastName
+                FROM user u
+                LEFT JOIN user_profiles p ON p.userID = u.userId
+            """
+            conn = self.db.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql)
+                self._directory = UserDirectory(cursor)
+            finally:
+                conn.close()
+        return self._directory
 
     def get_all_instructors(self):
         """Retrieves all users with the 'instructor' role."""
-        sql = "SELECT * FROM user WHERE userRole = 'instructor'"
+        sql = "SELECT userId, userName, userLat, userLong FROM user WHERE userRole = 'instructor' ORDER BY userId"
         with self.db.connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = InstructorRow.factory
             cursor.execute(sql)
             return cursor.fetchall()
 
+    def iter_locations(self, chunk_size=5000):
+        """Yields (userRole, userLat, userLong) for learners and instructors with a known location, chunk by chunk."""
+        sql = """
+            SELECT userRole, userLat, userLong FROM user
+            WHERE userRole IN ('learner', 'instructor') AND userLat IS NOT NULL AND userLong IS NOT NULL
+        """
+        conn = self.db.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            conn.close()
+
     def get_instructor_availability(self, instructor_id):
         """Gets the weekly availability for a specific instructor."""
         sql = "SELECT day, startTime, endTime FROM instructor_availability WHERE instructorID = ?"
@@ -67,9 +121,26 @@ class User:
             cursor.execute(sql, (instructor_id,))
             return cursor.fetchall()
 
+    def get_all_instructor_skills(self):
+        """Returns {instructorID: set of skill IDs} for every instructor, in one query (for batch matching)."""
+        skills = {}
+        with self.db.connect() as conn:
+            for instructor_id, skill_id in conn.execute("SELECT instructorID, skillID FROM instructor_skills"):
+                skills.setdefault(instructor_id, set()).add(skill_id)
+        return skills
+
+    def get_all_instructor_days(self):
+        """Returns {instructorID: set of available day names} for every instructor, in one query."""
+        days = {}
+        with self.db.connect() as conn:
+            for instructor_id, day in conn.execute("SELECT instructorID, day FROM instructor_availability"):
+                days.setdefault(instructor_id, set()).add(day)
+        return days
+
     def get_instructor_skills(self, instructor_id):
         """Gets the skill IDs for a specific instructor."""
         sql = "SELECT skillID FROM instructor_skills WHERE instructorID = ?"
         with self.db.connect() as conn:
             cursor = conn.cursor()
+            cursor.execute(sql, (instructor_id,))
             return [row['skillID'] for row in cursor.fetchall()]
@@ -0,0 +1,145 @@
+# services/backup_service.py
+import contextlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# <database name>-<YYYYmmdd>-<HHMMSS>.db, as written by backup_now().
+BACKUP_FILE_PATTERN = re.compile(r"^.+-\d{8}-\d{6}\.db$")
+
+class _BackupStarved(Exception):
+    pass
+
+class BackupService:
+    """
+    Online backups of the live database with the sqlite3 backup API. Pages are copied a few at a
+    time with a pause between steps, so writers are never locked out for the whole copy.
+    Backups are rotated to keep the newest `keep` files; the same mechanism produces throwaway
+    point-in-time snapshots for reporting jobs.
+    """
+    def __init__(self, db, backup_dir, keep=7, pages_per_step=256, step_sleep=0.05, max_restarts=3):
+        self.db = db
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+    def _copy_to(self, target_path):
+        source = sqlite3.connect(self.db.db_file)
+        target = sqlite3.connect(target_path)
+        try:
+            try:
+                source.backup(target, pages=self.pages_per_step, sleep=self.step_sleep, progress=self._restart_guard())
+            except _BackupStarved:
+                # Writes kept restarting the stepped copy; finish in one pass (a single short read lock).
+                source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    def _restart_guard(self):
+        """
+        Progress callback that detects restarts. A write from another connection makes SQLite start the
+        copy over, which shows up as `remaining` going back up; a busy database could otherwise starve it forever.
+        """
+        state = {"remaining": None, "restarts": 0}
+
+        def progress(status, remaining, total):
+            if state["remaining"] is not None and remaining > state["remaining"]:
+                state["restarts"] += 1
+                if state["restarts"] > self.max_restarts:
+                    raise _BackupStarved()
+            state["remaining"] = remaining
+        return progress
+
+    def backup_now(self):
+        """Writes a new timestamped backup and rotates old ones. Returns the backup path, or None on failure."""
+        name = os.path.splitext(os.path.basename(self.db.db_file))[0]
+        final_path = os.path.join(self.backup_dir, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db")
+        tmp_path = final_path + ".part"
+        try:
+            self._copy_to(tmp_path)
+            os.replace(tmp_path, final_path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Database backup failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        self._rotate(name)
+        return final_path
+
+    def _backups_of(self, name):
+        """
+        The backup file names of one database, oldest first. The timestamp is matched exactly, because
+        several databases (e.g. tenant shards 'north' and 'north-east') share the backup directory.
+        """
+        pattern = re.compile(rf"^{re.escape(name)}-\d{{8}}-\d{{6}}\.db$")
+        return sorted(f for f in os.listdir(self.backup_dir) if pattern.match(f))
+
+    def _rotate(self, name):
+        backups = self._backups_of(name)
+        for old in backups[:-self.keep] if self.keep > 0 else []:
+            os.remove(os.path.join(self.backup_dir, old))
+
+    def list_backups(self):
+        """Every finished backup in backup_dir, newest first (in-progress .part files and snapshots are not listed)."""
+        return sorted((os.path.join(self.backup_dir, f) for f in os.listdir(self.backup_dir) if BACKUP_FILE_PATTERN.match(f)), reverse=True)
+
+    @contextlib.contextmanager
+    def snapshot(self):
+        """
+        Yields a Database bound to a private point-in-time copy, deleted afterwards.
+        Reporting queries against it never contend with the live database's locks.
+        """
+        from models.database import Database
+        fd, path = tempfile.mkstemp(suffix=".snapshot", prefix="snapshot-", dir=self.backup_dir)
+        os.close(fd)
+        try:
+            self._copy_to(path)
+            yield Database(path)
+        finally:
+            os.remove(path)
+
+    # --- Scheduling ---
+    def start(self, interval_seconds):
+        """
+        Runs backup_now() every interval_seconds on a daemon thread. The first backup is due one interval after
+        the newest existing backup, so an app restarted more often than the interval still gets backed up.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        name = os.path.splitext(os.path.basename(self.db.db_file))[0]
+        existing = [os.path.getmtime(os.path.join(self.backup_dir, f)) for f in self._backups_of(name)]
+        first_wait = max(0.0, interval_seconds - (time.time() - max(existing))) if existing else 0.0
+
+        def loop():
+            wait = first_wait
+            while not self._stop.wait(wait):
+                self.backup_now()
+                wait = interval_seconds
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="db-backups")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+    from models.database import Database
+
+    service = BackupService(Database(config.DB_PATH), config.BACKUP_DIR, keep=config.BACKUP_KEEP)
+    path = service.backup_now()
+    print(f"Backup written to {path}" if path else "Backup failed.")
+    sys.exit(0 if path else 1)
@@ -0,0 +1,91 @@
+# services/chart_service.py
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(SRC_DIR, "cache", "charts")
+
+def _render_chart(kind, data, fmt, output_path):
+    """Runs in a worker process: renders one chart with matplotlib's Agg backend and writes it atomically."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 3.5), dpi=100)
+    try:
+        if kind == "learner_progress":
+            labels = [row[0] for row in data]
+            ax.bar(labels, [row[1] for row in data], color="#4682A9", label="Proficiency")
+            ax.plot(labels, [row[2] for row in data], color="#91C8E4", marker="o", label="Sessions completed")
+            ax.set_title("My Progress by Skill")
+            ax.legend()
+        elif kind == "weekly_sessions":
+            weeks = [row[0] for row in data]
+            ax.plot(weeks, [row[1] for row in data], color="#4682A9", marker="o", label="Sessions")
+            ax.plot(weeks, [row[2] for row in data], color="#91C8E4", marker="o", label="Completed")
+            ax.set_title("Sessions per Week")
+            ax.legend()
+            ax.tick_params(axis="x", labelrotation=45)
+        else:
+            raise ValueError(f"Unknown chart kind: {kind}")
+        fig.tight_layout()
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        fig.savefig(tmp_path, format=fmt)
+        os.replace(tmp_path, output_path)
+    finally:
+        plt.close(fig)
+    return output_path
+
+class ChartService:
+    """
+    Renders charts in a separate process pool and caches the output files by a hash of the chart data.
+    get_chart() never blocks: it returns the cached file, or a placeholder while the chart is rendered,
+    and calls on_ready(path) once the real image exists. Unchanged data is never rendered twice.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, placeholder="assets/placeholder.png", max_workers=1):
+        self.cache_dir = cache_dir
+        self.placeholder = placeholder
+        self.max_workers = max_workers
+        self._pool = None
+        self._pending = {}  # output path -> list of on_ready callbacks
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _chart_path(self, kind, data, fmt):
+        digest = hashlib.sha256(json.dumps([kind, data], sort_keys=True, default=str).encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{kind}-{digest}.{fmt}")
+
+    def get_chart(self, kind, data, fmt="png", on_ready=None):
+        """Returns the path of the rendered chart if cached, otherwise the placeholder (rendering in the background)."""
+        data = [list(row) for row in data]
+        path = self._chart_path(kind, data, fmt)
+        if os.path.exists(path):
+            return path
+
+        with self._lock:
+            if path in self._pending:
+                # Already rendering: just wait for the same result.
+                if on_ready: self._pending[path].append(on_ready)
+                return self.placeholder
+            self._pending[path] = [on_ready] if on_ready else []
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self._pool.submit(_render_chart, kind, data, fmt, path)
+        future.add_done_callback(lambda f: self._on_rendered(path, f))
+        return self.placeholder
+
+    def _on_rendered(self, path, future):
+        with self._lock:
+            callbacks = self._pending.pop(path, [])
+        if future.exception():
+            print(f"Chart rendering failed: {future.exception()}")
+            return
+        for callback in callbacks:
+            callback(path)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,53 @@
+# services/dashboard_snapshot.py
+import gzip
+import json
+import os
+import tempfile
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "dashboards")
+
+class DashboardSnapshotStore:
+    """
+    Per-user snapshots of the dashboard data (profile, assignments, conversation partners) as small gzipped
+    JSON files, so the next login can paint immediately from the last known state while fresh data loads.
+    """
+    def __init__(self, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+
+    def path_for(self, user_id):
+        # A plain user id, or "<tenant>-<user id>" when the database is sharded per tenant.
+        return os.path.join(self.snapshot_dir, f"{user_id}.json.gz")
+
+    def load(self, user_id):
+        """Returns the saved dashboard data, or None when there is no usable snapshot."""
+        try:
+            with gzip.open(self.path_for(user_id), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, user_id, data):
+        """Atomically writes a snapshot. Returns the data as it will read back (JSON-normalized)."""
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(payload.encode("utf-8")))
+            os.replace(tmp_path, self.path_for(user_id))
+        except OSError as e:
+            print(f"Could not save dashboard snapshot: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return json.loads(payload)
+
+    def discard(self, user_id):
+        try:
+            os.remove(self.path_for(user_id))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def diff(old, new):
+        """Returns {section: new value} for the sections that changed between two snapshots."""
+        return {key: value for key, value in new.items() if (old or {}).get(key) != value}
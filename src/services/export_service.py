@@ -0,0 +1,118 @@
+# services/export_service.py
+import csv
+import io
+import json
+
+class ExportService:
+    """
+    Streams admin reporting exports (NDJSON or CSV) straight from the database cursor.
+    Rows are fetched in fixed-size chunks so memory use stays constant regardless of table size.
+    Given {tenant_id: Database} (ModelRegistry.shards()), shards are streamed one after another and
+    each row is prefixed with a tenantId column.
+    """
+    # Each dataset maps to its query and the column used for date-range filtering (None = no date column).
+    DATASETS = {
+        "sessions": (
+            "SELECT sessionID, requestID, instructorID, learnerID, sessionDate, status FROM session",
+            "sessionDate",
+        ),
+        "feedback": (
+            "SELECT feedbackID, sessionID, learnerID, rating, comment, feedbackDate FROM feedback",
+            "feedbackDate",
+        ),
+        "learner_stats": (
+            "SELECT learnerID, skillID, proficiencyScore, sessionsCompleted FROM learner_stats",
+            None,
+        ),
+    }
+    FORMATS = ("ndjson", "csv")
+
+    def __init__(self, db, chunk_size=1000):
+        self.shards = db if isinstance(db, dict) else {None: db}
+        self.chunk_size = chunk_size
+
+    def _build_query(self, dataset, start_date=None, end_date=None):
+        """Builds the SELECT for a dataset, applying an inclusive YYYY-MM-DD date range when supported."""
+        if dataset not in self.DATASETS:
+            raise ValueError(f"Unknown export dataset: {dataset}")
+        sql, date_column = self.DATASETS[dataset]
+        clauses, params = [], []
+        if date_column:
+            if start_date:
+                clauses.append(f"{date_column} >= ?")
+                params.append(start_date)
+            if end_date:
+                # Compare against the following day so timestamps on the end date are included.
+                clauses.append(f"{date_column} < date(?, '+1 day')")
+                params.append(end_date)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return sql, params
+
+    def iter_rows(self, dataset, start_date=None, end_date=None):
+        """
+        Yields (columns, chunk) pairs, reading the cursor chunk_size rows at a time.
+        An empty result still yields the column names once with an empty chunk.
+        """
+        sql, params = self._build_query(dataset, start_date, end_date)
+        columns = None
+        for tenant_id, db in self.shards.items():
+            for shard_columns, chunk in self._iter_shard(db, sql, params):
+                if tenant_id is not None:
+                    shard_columns = ["tenantId"] + shard_columns
+                    chunk = [(tenant_id, *tuple(row)) for row in chunk]
+                if columns is None or chunk:
+                    columns = shard_columns
+                    yield columns, chunk
+
+    def _iter_shard(self, db, sql, params):
+        conn = db.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            chunk = cursor.fetchmany(self.chunk_size)
+            yield columns, chunk
+            while chunk:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if chunk:
+                    yield columns, chunk
+        finally:
+            conn.close()
+
+    def stream_ndjson(self, dataset, start_date=None, end_date=None):
+        """Yields one JSON document per line, one chunk of lines at a time."""
+        for columns, chunk in self.iter_rows(dataset, start_date, end_date):
+            yield "".join(json.dumps(dict(zip(columns, tuple(row))), ensure_ascii=False) + "\n" for row in chunk)
+
+    def stream_csv(self, dataset, start_date=None, end_date=None):
+        """Yields CSV text with a header row first, one chunk of rows at a time."""
+        header_written = False
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for columns, chunk in self.iter_rows(dataset, start_date, end_date):
+            if not header_written:
+                writer.writerow(columns)
+                header_written = True
+            writer.writerows(chunk)
+            yield buffer.getvalue()
+            # Reuse the buffer so only one chunk of text is ever held in memory.
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    def stream(self, dataset, fmt, start_date=None, end_date=None):
+        """Dispatches to the streaming writer for the requested format."""
+        if fmt == "ndjson":
+            return self.stream_ndjson(dataset, start_date, end_date)
+        if fmt == "csv":
+            return self.stream_csv(dataset, start_date, end_date)
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    def export_to_file(self, dataset, fmt, output_path, start_date=None, end_date=None):
+        """Writes an export to disk and returns the number of characters written."""
+        written = 0
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            for piece in self.stream(dataset, fmt, start_date, end_date):
+                f.write(piece)
+                written += len(piece)
+        return written
@@ -0,0 +1,159 @@
+# services/geocoding_service.py
+import csv
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+def normalize_address(address):
+    """Canonical form used as the cache key: lowercase, single spaces, no stray punctuation."""
+    if not address:
+        return ""
+    address = re.sub(r"[^\w\s,]", " ", address.lower())
+    address = re.sub(r"\s*,\s*", ", ", address)
+    return re.sub(r"\s+", " ", address).strip(" ,")
+
+class GoogleGeocoder:
+    """Geocoding backend backed by the Google Maps Geocoding API."""
+    def __init__(self, api_key):
+        # Imported here so googlemaps is only loaded when this backend is configured.
+        import googlemaps
+        self.client = googlemaps.Client(key=api_key)
+
+    def geocode(self, address):
+        results = self.client.geocode(address)
+        if not results:
+            return None
+        location = results[0]["geometry"]["location"]
+        return location["lat"], location["lng"]
+
+class GazetteerGeocoder:
+    """Offline geocoding backend reading a CSV file of address,lat,lon rows (used for tests and local runs)."""
+    def __init__(self, path):
+        self.places = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.places[normalize_address(row["address"])] = (float(row["lat"]), float(row["lon"]))
+
+    def geocode(self, address):
+        normalized = normalize_address(address)
+        if normalized in self.places:
+            return self.places[normalized]
+        # Fall back to the most specific known place mentioned in the address, e.g. its city.
+        for part in normalized.split(", "):
+            if part in self.places:
+                return self.places[part]
+        return None
+
+class GeocodingService:
+    """
+    Resolves addresses to coordinates through a pluggable backend.
+    Results are cached persistently in the 'geocode_cache' table by normalized address, and concurrent lookups
+    of the same address share a single backend call. Misses are cached for miss_ttl_days only, so an address
+    the backend learns about later (or a gazetteer update) is retried.
+    """
+    def __init__(self, db, backend, max_workers=4, miss_ttl_days=7):
+        self.db = db
+        self.backend = backend
+        self.max_workers = max_workers
+        self.miss_ttl_days = miss_ttl_days
+        self.backend_calls = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._create_table()
+
+    def _create_table(self):
+        sql = """
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                address TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                cachedDate TEXT NOT NULL
+            )
+        """
+        with self.db.connect() as conn:
+            conn.execute(sql)
+
+    def _get_cached(self, addresses):
+        """Returns {normalized address: (lat, lon) or None} for the addresses present in the cache."""
+        if not addresses:
+            return {}
+        found = {}
+        addresses = list(addresses)
+        miss_cutoff = (datetime.now() - timedelta(days=self.miss_ttl_days)).strftime("%Y-%m-%d %H:%M:%S")
+        with self.db.connect() as conn:
+            # Stay well under SQLite's bound-parameter limit.
+            for i in range(0, len(addresses), 500):
+                batch = addresses[i:i + 500]
+                # Expired misses count as not cached and go back to the backend.
+                sql = f"SELECT address, lat, lon FROM geocode_cache WHERE address IN ({','.join('?' * len(batch))}) AND (lat IS NOT NULL OR cachedDate >= ?)"
+                for row in conn.execute(sql, batch + [miss_cutoff]):
+                    found[row['address']] = (row['lat'], row['lon']) if row['lat'] is not None else None
+        return found
+
+    def _store(self, results):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sql = "INSERT OR REPLACE INTO geocode_cache (address, lat, lon, cachedDate) VALUES (?, ?, ?, ?)"
+        try:
+            with self.db.connect() as conn:
+                conn.executemany(sql, [(address, *(coords or (None, None)), now) for address, coords in results.items()])
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error caching geocode results: {e}")
+
+    def _resolve(self, normalized):
+        """Calls the backend once per address, letting concurrent callers wait on the same lookup."""
+        with self._lock:
+            pending = self._in_flight.get(normalized)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[normalized] = {"done": threading.Event(), "result": None}
+        if not owner:
+            pending["done"].wait()
+            return pending["result"]
+
+        try:
+            # Another thread may have finished and cached this address just before we registered.
+            cached = self._get_cached([normalized])
+            if normalized in cached:
+                pending["result"] = cached[normalized]
+            else:
+                with self._lock:
+                    self.backend_calls += 1
+                try:
+                    pending["result"] = self.backend.geocode(normalized)
+                except Exception as e:  # Backend/network failures are treated as a miss but not cached.
+                    print(f"Geocoding error for '{normalized}': {e}")
+                    return None
+                self._store({normalized: pending["result"]})
+            return pending["result"]
+        finally:
+            with self._lock:
+                del self._in_flight[normalized]
+            pending["done"].set()
+
+    def geocode(self, address):
+        """Returns (lat, lon) for an address, or None if it cannot be resolved."""
+        normalized = normalize_address(address)
+        if not normalized:
+            return None
+        cached = self._get_cached([normalized])
+        if normalized in cached:
+            return cached[normalized]
+        return self._resolve(normalized)
+
+    def geocode_many(self, addresses):
+        """
+        Geocodes a batch (e.g. a bulk import). Duplicates are collapsed, the cache is checked with one query
+        per 500 addresses, and only the remaining misses are sent to the backend in parallel.
+        Returns a list of (lat, lon) or None aligned with the input.
+        """
+        normalized = [normalize_address(address) for address in addresses]
+        unique = {address for address in normalized if address}
+        results = self._get_cached(unique)
+        misses = [address for address in unique if address not in results]
+        if misses:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results.update(zip(misses, pool.map(self._resolve, misses)))
+        return [results.get(address) for address in normalized]
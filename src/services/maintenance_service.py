@@ -0,0 +1,228 @@
+# services/maintenance_service.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Representative hot queries whose plans are compared before and after maintenance.
+PLAN_QUERIES = {
+    "conversation": "SELECT messageID FROM messages WHERE (senderID = 1 AND receiverID = 2) OR (senderID = 2 AND receiverID = 1) ORDER BY timestamp",
+    "conversation_partners": "SELECT receiverID FROM messages WHERE senderID = 1 UNION SELECT senderID FROM messages WHERE receiverID = 1",
+    "assignments": "SELECT a.assignmentID FROM assignments a JOIN skills s ON a.skillID = s.skillID JOIN user u ON a.instructorID = u.userId ORDER BY a.dueDate DESC",
+    "learner_submissions": "SELECT assignmentID FROM submissions WHERE learnerID = 1",
+    "pending_requests": "SELECT r.reqId FROM request r JOIN user u ON r.userId = u.userId WHERE r.fulfilled = 'pending'",
+    "week_sessions": "SELECT sessionID FROM session WHERE learnerID = 1 AND sessionDate >= '2025-01-06' AND sessionDate < '2025-01-13'",
+}
+
+class MaintenanceScheduler:
+    """
+    Runs ANALYZE, PRAGMA optimize and incremental vacuum in small steps while the application is idle.
+    Idleness comes from Database.last_activity (updated on every connect()); a cycle stops as soon as the app
+    touches the database again or its time budget runs out, and resumes at the next idle period.
+    Each cycle is logged to 'maintenance_log' with file size, freelist pages and query-plan changes.
+    """
+    def __init__(self, db, idle_seconds=120, interval_seconds=24 * 3600, max_cycle_seconds=5.0,
+                 analysis_limit=1000, vacuum_pages_per_step=256, check_every=15):
+        self.db = db
+        self.idle_seconds = idle_seconds
+        self.interval_seconds = interval_seconds
+        self.max_cycle_seconds = max_cycle_seconds
+        self.analysis_limit = analysis_limit
+        self.vacuum_pages_per_step = vacuum_pages_per_step
+        self.check_every = check_every
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = []  # Steps left over from an interrupted cycle.
+        self._baseline = None  # (size, freelist, plans) when the current pass started.
+        self._pass_started = None
+        self._steps_done = []
+        self._last_completed = 0.0
+        self._ensure_log()
+
+    def _connect(self):
+        # Deliberately bypasses Database.connect() so maintenance doesn't count as application activity.
+        conn = sqlite3.connect(self.db.db_file, timeout=1)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_log(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS maintenance_log (
+                    runAt TEXT NOT NULL,
+                    durationMs INTEGER NOT NULL,
+                    steps TEXT NOT NULL,
+                    sizeBefore INTEGER, sizeAfter INTEGER,
+                    freelistBefore INTEGER, freelistAfter INTEGER,
+                    planChanges TEXT
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Measurements ---
+    def _measure(self, conn):
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        plans = {}
+        for name, sql in PLAN_QUERIES.items():
+            try:
+                plans[name] = [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            except sqlite3.Error:
+                pass  # Table not present in this database.
+        return os.path.getsize(self.db.db_file), freelist, page_size, plans
+
+    def _plan_steps(self, conn):
+        """The steps of one maintenance pass: ANALYZE per table, PRAGMA optimize, then incremental vacuum chunks."""
+        tables = [row['name'] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        steps = [("analyze", table) for table in tables] + [("optimize", None)]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            steps.append(("vacuum", None))
+        return steps
+
+    def _run_step(self, conn, step):
+        """Runs one step. Returns True when it is finished (vacuum repeats until the freelist is empty)."""
+        kind, target = step
+        if kind == "analyze":
+            conn.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+            conn.execute(f'ANALYZE "{target}"')
+            conn.commit()
+            return True
+        if kind == "optimize":
+            conn.execute("PRAGMA optimize")
+            conn.commit()
+            return True
+        conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages_per_step)})").fetchall()
+        conn.commit()
+        return conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+    # --- Cycles ---
+    def is_idle(self):
+        return time.monotonic() - self.db.last_activity >= self.idle_seconds
+
+    def is_due(self):
+        return bool(self._pending) or time.time() - self._last_completed >= self.interval_seconds
+
+    def run_cycle(self, force=False):
+        """
+        Runs maintenance steps until the pass is complete, the app becomes active, or the time budget is spent.
+        Returns the log entry dict when a pass completes, otherwise None.
+        """
+        cycle_started = time.monotonic()
+        activity_mark = self.db.last_activity
+        conn = self._connect()
+        try:
+            if not self._pending:
+                self._pending = self._plan_steps(conn)
+                self._baseline = self._measure(conn)
+                self._pass_started = datetime.now()
+                self._steps_done.clear()
+            while self._pending:
+                if not force and (self.db.last_activity != activity_mark or self._stop.is_set()):
+                    return None  # The app is busy again; resume at the next idle period.
+                if time.monotonic() - cycle_started >= self.max_cycle_seconds:
+                    return None
+                step = self._pending[0]
+                try:
+                    finished = self._run_step(conn, step)
+                except sqlite3.OperationalError as e:
+                    # Locked by a writer: treat it as activity and retry the step later.
+                    print(f"Maintenance step {step} deferred: {e}")
+                    return None
+                if finished:
+                    self._pending.pop(0)
+                    self._steps_done.append(f"{step[0]} {step[1]}" if step[1] else step[0])
+            return self._finish_pass(conn)
+        finally:
+            conn.close()
+
+    def _finish_pass(self, conn):
+        size_before, freelist_before, page_size, plans_before = self._baseline
+        size_after, freelist_after, _, plans_after = self._measure(conn)
+        plan_changes = {
+            name: {"before": plans_before.get(name), "after": plans_after.get(name)}
+            for name in plans_after if plans_before.get(name) != plans_after.get(name)
+        }
+        entry = {
+            "runAt": self._pass_started.strftime("%Y-%m-%d %H:%M:%S"),
+            "durationMs": int((datetime.now() - self._pass_started).total_seconds() * 1000),
+            "steps": ", ".join(self._steps_done),
+            "sizeBefore": size_before, "sizeAfter": size_after,
+            "freelistBefore": freelist_before, "freelistAfter": freelist_after,
+            "planChanges": json.dumps(plan_changes),
+        }
+        conn.execute(f"INSERT INTO maintenance_log ({', '.join(entry)}) VALUES ({', '.join('?' * len(entry))})", list(entry.values()))
+        conn.commit()
+        self._last_completed = time.time()
+        self._baseline = None
+        return entry
+
+    def get_log(self, limit=20):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT * FROM maintenance_log ORDER BY runAt DESC LIMIT ?", (limit,)).fetchall()
+        finally:
+            conn.close()
+
+    # --- Scheduling ---
+    def start(self):
+        """Checks every few seconds on a daemon thread and runs a cycle whenever maintenance is due and the app is idle."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.check_every):
+                if self.is_due() and self.is_idle():
+                    try:
+                        self.run_cycle()
+                    except sqlite3.Error as e:
+                        print(f"Database maintenance error: {e}")
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="db-maintenance")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+def enable_incremental_vacuum(db_file):
+    """
+    One-off conversion to auto_vacuum=INCREMENTAL, which needs a full VACUUM; run it while the app is stopped.
+    Afterwards the scheduler can return free pages to the filesystem in small steps.
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+    from models.database import Database
+
+    parser = argparse.ArgumentParser(description="Run a database maintenance pass now, or show recent passes.")
+    parser.add_argument("command", choices=["run", "log", "enable-incremental-vacuum"])
+    parser.add_argument("--db", default=config.DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == "enable-incremental-vacuum":
+        enable_incremental_vacuum(args.db)
+        print("auto_vacuum set to INCREMENTAL.")
+        sys.exit(0)
+    scheduler = MaintenanceScheduler(Database(args.db), max_cycle_seconds=float("inf"))
+    if args.command == "run":
+        entry = scheduler.run_cycle(force=True)
+        print(json.dumps(entry, indent=2))
+    else:
+        for row in scheduler.get_log():
+            print(dict(row))
@@ -1,9 +1,178 @@
-import folium
+# services/map_service.py
+import hashlib
+import os
+import tempfile
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "maps")
+
+class MapCache:
+    """
+    On-disk cache of rendered map HTML files, addressed by a hash of the map parameters.
+    Writes are atomic (temp file + rename) and the least recently used files are evicted past max_entries.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=256):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
 
-class MapService:
     @staticmethod
-    def generate_map(lat, lon, output_file="user_location_map.html"):
-        m = folium.Map(location=[lat, lon], zoom_start=15)
+    def make_key(*parts):
+        """Builds a content address from the parameters that fully determine the rendered map."""
+        return hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:32]
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    def get(self, key):
+        """Returns the cached file path, or None on a miss. A hit refreshes the file's LRU position."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key, html):
+        """Atomically writes the HTML for a key and evicts old entries if the cache is over its cap."""
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+        return path
+
+    def _evict(self):
+        with self._lock:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".html")]
+            excess = len(entries) - self.max_entries
+            if excess <= 0:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:excess]:
+                try:
+                    os.remove(entry.path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass  # Already evicted by another process.
+
+    def stats(self):
+        """Returns hit/miss/eviction counters for diagnostics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+class DensityGrid:
+    """
+    Streaming pre-aggregation of user locations into fixed-size lat/long cells, per role.
+    Individual points are kept only while the population is small enough to draw them one by one.
+    """
+    def __init__(self, cell_size=0.01, max_points=2000):
+        self.cell_size = cell_size
+        self.max_points = max_points
+        self.cells = {}  # (role, row, col) -> [count, lat_sum, lon_sum]
+        self.points = []
+        self.total = 0
+
+    def add(self, role, lat, lon):
+        self.total += 1
+        if self.points is not None:
+            if self.total <= self.max_points:
+                self.points.append((role, lat, lon))
+            else:
+                self.points = None  # Too many to draw individually; only the grid is kept from here on.
+        key = (role, int(lat // self.cell_size), int(lon // self.cell_size))
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = [1, lat, lon]
+        else:
+            cell[0] += 1
+            cell[1] += lat
+            cell[2] += lon
+
+    def aggregated(self):
+        """Returns sorted (role, centroid_lat, centroid_lon, count) tuples, one per occupied cell."""
+        return sorted(
+            (role, round(lat_sum / count, 5), round(lon_sum / count, 5), count)
+            for (role, _, _), (count, lat_sum, lon_sum) in self.cells.items()
+        )
+
+class MapService:
+    """Renders folium maps, serving repeat requests from the on-disk MapCache."""
+    def __init__(self, cache=None, precision=4):
+        self.cache = cache or MapCache()
+        # 4 decimal places is roughly 11 m, well below what a zoom-15 map can distinguish.
+        self.precision = precision
+
+    def generate_map(self, lat, lon, zoom=15):
+        """Returns the path of an HTML map centred on (lat, lon), rendering it only on a cache miss."""
+        lat, lon = round(lat, self.precision), round(lon, self.precision)
+        key = MapCache.make_key("point", lat, lon, zoom)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        # Imported here so folium (and its jinja2/branca chain) only loads when a map must be rendered.
+        import folium
+        m = folium.Map(location=[lat, lon], zoom_start=zoom)
         folium.Marker([lat, lon], tooltip="User Location").add_to(m)
-        m.save(output_file)
-        return output_file
\ No newline at end of file
+        return self.cache.put(key, m.get_root().render())
+
+    def generate_density_map(self, locations, cell_size=0.01, max_points=2000):
+        """
+        Builds an instructor/learner density map from an iterable of (role, lat, lon) rows.
+        Small populations are drawn as clustered markers; larger ones as a per-role heatmap of grid cells,
+        so the HTML size depends on the number of occupied cells rather than the number of users.
+        """
+        grid = DensityGrid(cell_size, max_points)
+        for role, lat, lon in locations:
+            grid.add(role, lat, lon)
+        cells = grid.aggregated()
+        key = MapCache.make_key("density", cell_size, grid.points is not None, cells)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        import folium
+        from folium.plugins import HeatMap, MarkerCluster
+        if cells:
+            total = sum(count for *_, count in cells)
+            center = [sum(lat * count for _, lat, _, count in cells) / total, sum(lon * count for _, _, lon, count in cells) / total]
+        else:
+            center = [14.6760, 121.0437]
+        m = folium.Map(location=center, zoom_start=11)
+        colors = {"instructor": "blue", "learner": "green"}
+
+        for role in ("instructor", "learner"):
+            layer = folium.FeatureGroup(name=f"{role.title()}s")
+            if grid.points is not None:
+                cluster = MarkerCluster().add_to(layer)
+                for point_role, lat, lon in grid.points:
+                    if point_role == role:
+                        folium.Marker([lat, lon], icon=folium.Icon(color=colors[role])).add_to(cluster)
+            else:
+                role_cells = [[lat, lon, count] for cell_role, lat, lon, count in cells if cell_role == role]
+                if role_cells:
+                    HeatMap(role_cells, radius=18, max_zoom=13).add_to(layer)
+            layer.add_to(m)
+        folium.LayerControl().add_to(m)
+        return self.cache.put(key, m.get_root().render())
@@ -2,32 +2,62 @@
 from math import radians, cos, sin, asin, sqrt
 from datetime import datetime
 
+EARTH_RADIUS_KM = 6371
+MAX_MATCH_DISTANCE_KM = 50  # Proximity scores fall to zero at this distance.
+
+def haversine_distance(lon1, lat1, lon2, lat2):
+    """
+    Calculates the great circle distance in kilometers between two points 
+    on the earth, given their longitudes and latitudes in degrees.
+    """
+    if None in [lon1, lat1, lon2, lat2]:
+        return float('inf')  # Return a large distance if location is not set
+
+    # Convert decimal degrees to radians 
+    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+
+    # Haversine formula 
+    dlon = lon2 - lon1 
+    dlat = lat2 - lat1 
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * asin(sqrt(a)) 
+    return c * EARTH_RADIUS_KM
+
+def proximity_score(distance):
+    """Normalize distance: 100 points for 0km, 0 points for MAX_MATCH_DISTANCE_KM or more."""
+    return max(0, 100 * (1 - (distance / MAX_MATCH_DISTANCE_KM)))
+
 class MatchingService:
     """
     Handles the logic for matching learners with instructors using a greedy algorithm.
     """
-    def __init__(self, user_model, request_model):
+    def __init__(self, user_model, request_model, analytics_model=None, rating_weight=0.3, rating_prior_weight=5):
         self.user_model = user_model
         self.request_model = request_model
+        # Per-instructor rating sums/counts are kept current by the feedback triggers (see models/analytics.py).
+        self.analytics_model = analytics_model
+        self.rating_weight = rating_weight
+        self.rating_prior_weight = rating_prior_weight
 
-    def _haversine_distance(self, lon1, lat1, lon2, lat2):
+    def _load_rating_stats(self):
+        """Loads rating sums/counts once per matching run; returns (ratings by instructor, global mean rating)."""
+        if self.analytics_model is None:
+            return {}, None
+        ratings = self.analytics_model.get_instructor_ratings()
+        total_count = sum(count for _, count in ratings.values())
+        global_mean = sum(total for total, _ in ratings.values()) / total_count if total_count else 3.0
+        return ratings, global_mean
+
+    def _smoothed_rating(self, instructor_id, ratings, global_mean):
         """
-        Calculates the great circle distance in kilometers between two points 
-        on the earth, given their longitudes and latitudes in degrees.
+        Bayesian average: the instructor's ratings blended with rating_prior_weight virtual ratings at the
+        global mean, so a single 5-star review doesn't outrank a long record of 4.8s.
         """
-        if None in [lon1, lat1, lon2, lat2]:
-            return float('inf')  # Return a large distance if location is not set
+        rating_sum, count = ratings.get(instructor_id, (0, 0))
+        return (self.rating_prior_weight * global_mean + rating_sum) / (self.rating_prior_weight + count)
 
-        # Convert decimal degrees to radians 
-        lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-
-        # Haversine formula 
-        dlon = lon2 - lon1 
-        dlat = lat2 - lat1 
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a)) 
-        r = 6371 # Radius of earth in kilometers.
-        return c * r
+    def _haversine_distance(self, lon1, lat1, lon2, lat2):
+        return haversine_distance(lon1, lat1, lon2, lat2)
 
     def find_best_match_for_request(self, request):
         """Finds the single best instructor for a given request."""
@@ -40,17 +70,19 @@ class MatchingService:
         except (ValueError, AttributeError):
             return None # Skip request if skills are malformed
 
+        rating_stats = self._load_rating_stats()
         for instructor in all_instructors:
-            score = self._calculate_match_score(request, required_skills, instructor)
+            score = self._calculate_match_score(request, required_skills, instructor, rating_stats)
             if score > best_score:
                 best_score = score
                 best_instructor = instructor
         
         return best_instructor
 
-    def _calculate_match_score(self, request, required_skills, instructor):
+    def _calculate_match_score(self, request, required_skills, instructor, rating_stats=None):
         """
         Calculates a compatibility score. Higher is better. Returns -1 if incompatible.
+        rating_stats is the (ratings, global mean) pair from _load_rating_stats(); without it only proximity counts.
         """
         # 1. Skill Check (Essential)
         instructor_skills = set(self.user_model.get_instructor_skills(instructor['userId']))
@@ -74,11 +106,27 @@ class MatchingService:
             instructor['userLong'], instructor['userLat']
         )
         
-        # Normalize distance: 100 points for 0km, 0 points for 50km or more.
-        max_dist = 50 
-        proximity_score = max(0, 100 * (1 - (distance / max_dist)))
-        
-        return proximity_score
+        proximity = proximity_score(distance)
+
+        # 4. Rating Score (Bonus): smoothed 1-5 stars mapped to 0-100 and blended with proximity.
+        if not rating_stats or rating_stats[1] is None:
+            return proximity
+        ratings, global_mean = rating_stats
+        return self._blend(proximity, self._rating_score(instructor['userId'], ratings, global_mean))
+
+    def _rating_score(self, instructor_id, ratings, global_mean):
+        return 100 * (self._smoothed_rating(instructor_id, ratings, global_mean) - 1) / 4
+
+    def _blend(self, proximity, rating_score):
+        return (1 - self.rating_weight) * proximity + self.rating_weight * rating_score
+
+    def find_best_matches(self, requests, workers=None):
+        """
+        Batch version of find_best_match_for_request for a backlog of requests, scored in parallel
+        across geographic shards. Returns {reqId: instructor userId or None}.
+        """
+        from services.sharded_matching import ShardedMatcher
+        return ShardedMatcher(self, workers=workers).match_all(requests)
 
     def find_best_match(self, req_skills, preferred_level=None):
         # Get all instructors with the required skill
@@ -0,0 +1,102 @@
+# services/message_archiver.py
+import json
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+
+class MessageArchiver:
+    """
+    Moves messages older than a cutoff out of the hot 'messages' table into compressed per-conversation
+    segments in 'message_archive' (created by the Message model), keeping the hot table and its indexes small.
+    Each conversation is archived in its own transaction, so readers always see a message in exactly one place.
+    """
+    def __init__(self, db, segment_size=500, compression_level=6):
+        self.db = db
+        self.segment_size = segment_size
+        self.compression_level = compression_level
+
+    def archive_older_than(self, cutoff):
+        """Archives every message with a timestamp before cutoff ('YYYY-MM-DD HH:MM:SS'). Returns (messages, segments)."""
+        pairs_sql = """
+            SELECT DISTINCT MIN(senderID, receiverID) AS userA, MAX(senderID, receiverID) AS userB
+            FROM messages WHERE timestamp < ?
+        """
+        with self.db.connect() as conn:
+            pairs = [(row['userA'], row['userB']) for row in conn.execute(pairs_sql, (cutoff,))]
+
+        archived = segments = 0
+        for user_a, user_b in pairs:
+            try:
+                moved, written = self._archive_pair(user_a, user_b, cutoff)
+            except sqlite3.Error as e:
+                print(f"Database error archiving messages between {user_a} and {user_b}: {e}")
+                continue
+            archived += moved
+            segments += written
+        return archived, segments
+
+    def archive_older_than_days(self, days):
+        return self.archive_older_than((datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S"))
+
+    def _archive_pair(self, user_a, user_b, cutoff):
+        where = "((senderID = ? AND receiverID = ?) OR (senderID = ? AND receiverID = ?)) AND timestamp < ?"
+        params = (user_a, user_b, user_b, user_a, cutoff)
+        conn = self.db.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = [tuple(row) for row in conn.execute(
+                f"SELECT messageID, senderID, receiverID, content, timestamp FROM messages WHERE {where} ORDER BY timestamp, messageID",
+                params,
+            )]
+            if not rows:
+                conn.rollback()
+                return 0, 0
+            next_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM message_archive WHERE userA = ? AND userB = ?", (user_a, user_b)
+            ).fetchone()[0]
+            segments = [rows[i:i + self.segment_size] for i in range(0, len(rows), self.segment_size)]
+            conn.executemany("""
+                INSERT INTO message_archive (userA, userB, seq, messageCount, firstTimestamp, lastTimestamp, lastMessageID, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (user_a, user_b, next_seq + i, len(segment), segment[0][4], segment[-1][4], segment[-1][0],
+                 zlib.compress(json.dumps(segment, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), self.compression_level))
+                for i, segment in enumerate(segments)
+            ])
+            conn.execute(f"DELETE FROM messages WHERE {where}", params)
+            conn.commit()
+            return len(rows), len(segments)
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Hot vs archived message counts and the archive's compressed size in bytes."""
+        with self.db.connect() as conn:
+            hot = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            archived, segments, size = conn.execute(
+                "SELECT COALESCE(SUM(messageCount), 0), COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM message_archive"
+            ).fetchone()
+        return {"hot": hot, "archived": archived, "segments": segments, "archive_bytes": size}
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+    from models.database import Database
+    from models.message import Message
+
+    parser = argparse.ArgumentParser(description="Move old messages into compressed archive segments.")
+    parser.add_argument("--days", type=int, default=config.MESSAGE_HOT_DAYS, help="Keep this many days of messages in the hot table.")
+    parser.add_argument("--db", default=config.DB_PATH)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    Message(db)  # Ensures the archive table exists.
+    archiver = MessageArchiver(db, segment_size=config.MESSAGE_ARCHIVE_SEGMENT_SIZE)
+    moved, written = archiver.archive_older_than_days(args.days)
+    print(f"Archived {moved:,} messages into {written:,} segments. {archiver.stats()}")
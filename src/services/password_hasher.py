@@ -0,0 +1,90 @@
+# services/password_hasher.py
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_shared = None
+_shared_lock = threading.Lock()
+
+class PasswordHasher:
+    """
+    Salted password hashing with scrypt or PBKDF2-SHA256 and tunable cost parameters.
+    Stored hashes are self-describing ('scrypt$n$r$p$salt$hash' / 'pbkdf2_sha256$iterations$salt$hash'),
+    so the cost can change per deployment and old hashes are detected by needs_rehash().
+    KDF work runs on a small bounded pool (hashlib releases the GIL), keeping it off UI handler threads
+    and capping how many CPU-heavy hashes run at once.
+    """
+    ALGORITHMS = ("scrypt", "pbkdf2_sha256")
+
+    def __init__(self, algorithm="scrypt", scrypt_n=2**14, scrypt_r=8, scrypt_p=1, pbkdf2_iterations=600_000, max_workers=2):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown password hashing algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.scrypt_n = scrypt_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-kdf")
+
+    @classmethod
+    def from_config(cls):
+        """
+        The process-wide hasher built from the cost settings in config.py. It is shared, so every User model
+        (one per tenant shard) submits to the same bounded KDF pool.
+        """
+        global _shared
+        with _shared_lock:
+            if _shared is None:
+                import config
+                _shared = cls(config.PASSWORD_KDF, config.SCRYPT_N, config.SCRYPT_R, config.SCRYPT_P, config.PBKDF2_ITERATIONS, config.PASSWORD_HASH_WORKERS)
+            return _shared
+
+    @staticmethod
+    def _b64(raw):
+        return base64.b64encode(raw).decode("ascii")
+
+    def _scrypt(self, password, salt, n, r, p):
+        # maxmem must cover the 128 * r * (n + p + 2) bytes scrypt needs, with some headroom.
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * r * (n + p + 2), dklen=32)
+
+    def hash(self, password):
+        """Returns a new salted hash of the password using the configured algorithm and cost."""
+        salt = os.urandom(16)
+        if self.algorithm == "scrypt":
+            digest = self._scrypt(password, salt, self.scrypt_n, self.scrypt_r, self.scrypt_p)
+            return f"scrypt${self.scrypt_n}${self.scrypt_r}${self.scrypt_p}${self._b64(salt)}${self._b64(digest)}"
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.pbkdf2_iterations)
+        return f"pbkdf2_sha256${self.pbkdf2_iterations}${self._b64(salt)}${self._b64(digest)}"
+
+    def verify(self, password, stored):
+        """Checks a password against any supported stored hash, including legacy unsalted SHA-256."""
+        if not stored:
+            return False
+        parts = stored.split("$")
+        try:
+            if parts[0] == "scrypt" and len(parts) == 6:
+                n, r, p = map(int, parts[1:4])
+                candidate = self._scrypt(password, base64.b64decode(parts[4]), n, r, p)
+                return hmac.compare_digest(candidate, base64.b64decode(parts[5]))
+            if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+                candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(parts[2]), int(parts[1]))
+                return hmac.compare_digest(candidate, base64.b64decode(parts[3]))
+        except (ValueError, TypeError):
+            return False
+        if len(parts) == 1:
+            # Legacy format: unsalted hex SHA-256.
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+        return False
+
+    def needs_rehash(self, stored):
+        """True when a stored hash uses a legacy format, another algorithm, or different cost parameters."""
+        if self.algorithm == "scrypt":
+            return not stored.startswith(f"scrypt${self.scrypt_n}${self.scrypt_r}${self.scrypt_p}$")
+        return not stored.startswith(f"pbkdf2_sha256${self.pbkdf2_iterations}$")
+
+    def submit(self, fn, *args):
+        """Runs fn(*args) on the bounded KDF pool and returns a Future."""
+        return self._pool.submit(fn, *args)
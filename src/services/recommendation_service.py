@@ -0,0 +1,185 @@
+# services/recommendation_service.py
+import heapq
+import sqlite3
+import threading
+
+class RecommendationService:
+    """
+    Recommends practice materials that learners with similar skill profiles were given.
+    Learners are vectors of per-skill proficiency and sessions completed (from learner_stats); cosine
+    similarities are computed with NumPy in batches and the top-N suggestions per learner are stored
+    in 'material_recommendations'. Triggers mark learners whose stats or practice materials changed, and
+    refresh() only recomputes those learners and their nearest neighbours, so dashboards read precomputed
+    rows. Learners further away whose neighbour set shifts are only picked up by refresh(full=True).
+    """
+    def __init__(self, db, top_n=10, neighbours=25, batch_size=512):
+        self.db = db
+        self.top_n = top_n
+        self.neighbours = neighbours
+        self.batch_size = batch_size
+        self._refresh_lock = threading.Lock()
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """Creates the suggestion tables and dirty-marking triggers; on first creation every learner is marked dirty."""
+        with self.db.connect() as conn:
+            created = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'material_recommendations'").fetchone() is None
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS material_recommendations (
+                    learnerID INTEGER NOT NULL,
+                    materialID INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (learnerID, materialID)
+                );
+                -- version is bumped on every change, so a refresh only clears marks it has actually seen.
+                CREATE TABLE IF NOT EXISTS recommendation_dirty (learnerID INTEGER PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0);
+            """)
+            if "version" not in {row['name'] for row in conn.execute("PRAGMA table_info(recommendation_dirty)")}:
+                # Databases from before the version column: add it and replace the old INSERT OR IGNORE triggers.
+                conn.execute("ALTER TABLE recommendation_dirty ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+                conn.execute("DROP TRIGGER IF EXISTS trg_learner_stats_insert_recommendations")
+                conn.execute("DROP TRIGGER IF EXISTS trg_learner_stats_update_recommendations")
+            for event in ("INSERT", "UPDATE"):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_learner_stats_{event.lower()}_recommendations AFTER {event} ON learner_stats BEGIN
+                        INSERT INTO recommendation_dirty (learnerID) VALUES (NEW.learnerID)
+                        ON CONFLICT(learnerID) DO UPDATE SET version = version + 1;
+                    END
+                """)
+            # A learner's materials are what their neighbours get recommended, so adding or removing one marks them too.
+            for event, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_practice_material_{event.lower()}_recommendations AFTER {event} ON practice_material BEGIN
+                        INSERT INTO recommendation_dirty (learnerID) VALUES ({row}.learnerID)
+                        ON CONFLICT(learnerID) DO UPDATE SET version = version + 1;
+                    END
+                """)
+            conn.commit()
+            if created:
+                conn.execute("INSERT OR IGNORE INTO recommendation_dirty (learnerID) SELECT DISTINCT learnerID FROM learner_stats")
+                conn.commit()
+
+    def _load_profiles(self, conn):
+        """Returns (learner ids, unit-length learner x skill feature matrix)."""
+        import numpy as np
+        rows = conn.execute("SELECT learnerID, skillID, proficiencyScore, sessionsCompleted FROM learner_stats").fetchall()
+        if not rows:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        data = np.array([tuple(row) for row in rows], dtype=np.float64)
+        learner_ids, learner_idx = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        skill_ids, skill_idx = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+        matrix = np.zeros((len(learner_ids), 2 * len(skill_ids)), dtype=np.float32)
+        matrix[learner_idx, skill_idx] = data[:, 2]
+        matrix[learner_idx, len(skill_ids) + skill_idx] = data[:, 3]
+        # Scale each column to [0, 1] so proficiency and session counts weigh equally, then normalise rows for cosine.
+        matrix /= np.maximum(matrix.max(axis=0), 1)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-9)
+        return learner_ids.tolist(), matrix
+
+    def _load_materials(self, conn):
+        """Returns {learnerID: set of materialIDs}, collapsing copies of the same link to one material."""
+        by_link, by_learner = {}, {}
+        for learner_id, material_id, link in conn.execute("SELECT learnerID, materialID, materialLink FROM practice_material ORDER BY materialID"):
+            canonical = by_link.setdefault(link, material_id)
+            by_learner.setdefault(learner_id, set()).add(canonical)
+        return by_learner
+
+    def _neighbours(self, matrix, rows):
+        """The row indexes of the nearest neighbours of the given rows (their suggestions depend on these rows)."""
+        import numpy as np
+        k = min(self.neighbours, len(matrix) - 1)
+        found = set()
+        if k <= 0:
+            return found
+        for start in range(0, len(rows), self.batch_size):
+            batch = np.asarray(rows[start:start + self.batch_size])
+            similarities = matrix[batch] @ matrix.T
+            similarities[np.arange(len(batch)), batch] = -np.inf
+            found.update(np.argpartition(-similarities, k - 1, axis=1)[:, :k].ravel().tolist())
+        return found
+
+    def _recommend(self, learner_ids, matrix, materials, targets):
+        """Yields (learnerID, [(materialID, score), ...]) for the target row indexes, one batch of similarities at a time."""
+        import numpy as np
+        k = min(self.neighbours, len(learner_ids) - 1)
+        for start in range(0, len(targets), self.batch_size):
+            batch = np.asarray(targets[start:start + self.batch_size])
+            similarities = matrix[batch] @ matrix.T
+            similarities[np.arange(len(batch)), batch] = -np.inf  # never recommend from yourself
+            if k <= 0:
+                for row in batch:
+                    yield learner_ids[row], []
+                continue
+            nearest = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            for i, row in enumerate(batch):
+                learner_id = learner_ids[row]
+                own = materials.get(learner_id, set())
+                scores = {}
+                for neighbour in nearest[i]:
+                    similarity = float(similarities[i, neighbour])
+                    if similarity <= 0:
+                        continue
+                    for material_id in materials.get(learner_ids[neighbour], ()):
+                        if material_id not in own:
+                            scores[material_id] = scores.get(material_id, 0.0) + similarity
+                yield learner_id, heapq.nlargest(self.top_n, scores.items(), key=lambda item: item[1])
+
+    def refresh(self, full=False):
+        """
+        Recomputes suggestions for learners marked dirty (or everyone when full=True).
+        Returns the number of learners refreshed.
+        """
+        with self._refresh_lock:
+            conn = self.db.connect()
+            try:
+                dirty = {row['learnerID']: row['version'] for row in conn.execute("SELECT learnerID, version FROM recommendation_dirty")}
+                if not dirty and not full:
+                    return 0
+                learner_ids, matrix = self._load_profiles(conn)
+                targets = [i for i, learner_id in enumerate(learner_ids) if full or learner_id in dirty]
+                if not full:
+                    # A changed learner also changes what their nearest neighbours are recommended.
+                    targets = sorted(set(targets) | self._neighbours(matrix, targets))
+                results = list(self._recommend(learner_ids, matrix, self._load_materials(conn), targets))
+
+                if full:
+                    conn.execute("DELETE FROM material_recommendations")
+                else:
+                    conn.executemany("DELETE FROM material_recommendations WHERE learnerID = ?", [(learner_id,) for learner_id, _ in results])
+                conn.executemany(
+                    "INSERT INTO material_recommendations (learnerID, materialID, score) VALUES (?, ?, ?)",
+                    [(learner_id, material_id, score) for learner_id, suggestions in results for material_id, score in suggestions],
+                )
+                # Only clear marks at the version we read; stats written during the refresh bumped the version and stay dirty.
+                conn.executemany("DELETE FROM recommendation_dirty WHERE learnerID = ? AND version = ?", list(dirty.items()))
+                conn.commit()
+                return len(results)
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"Database error refreshing recommendations: {e}")
+                return 0
+            finally:
+                conn.close()
+
+    def refresh_in_background(self):
+        """Starts an incremental refresh on a daemon thread unless one is already running."""
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self.refresh, daemon=True, name="recommendations-refresh").start()
+
+    def has_pending(self):
+        with self.db.connect() as conn:
+            return conn.execute("SELECT 1 FROM recommendation_dirty LIMIT 1").fetchone() is not None
+
+    def get_for_learner(self, learner_id):
+        """Reads the precomputed suggestions for a learner, best first."""
+        sql = """
+            SELECT pm.materialID, pm.materialTitle, pm.materialLink, s.skillName, mr.score
+            FROM material_recommendations mr
+            JOIN practice_material pm ON pm.materialID = mr.materialID
+            JOIN skills s ON s.skillID = pm.skillID
+            WHERE mr.learnerID = ?
+            ORDER BY mr.score DESC
+        """
+        with self.db.connect() as conn:
+            return conn.execute(sql, (learner_id,)).fetchall()
@@ -0,0 +1,131 @@
+# services/session_calendar.py
+import itertools
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+def parse_session_time(session_date, duration_minutes):
+    """
+    Returns the (start, end) interval for a sessionDate. 'YYYY-MM-DD HH:MM' books duration_minutes;
+    a bare 'YYYY-MM-DD' books the whole day. Raises ValueError for anything else.
+    """
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            start = datetime.strptime(session_date, fmt)
+            return start, start + timedelta(minutes=duration_minutes)
+        except ValueError:
+            pass
+    start = datetime.strptime(session_date, "%Y-%m-%d")
+    return start, start + timedelta(days=1)
+
+class SessionCalendar:
+    """
+    Per-person booking intervals kept in sorted lists, so a double-booking check is a binary search.
+    Alongside each list is the running maximum end time, so a long booking (e.g. a whole day) that starts
+    well before a slot is still found. Each person's upcoming sessions are loaded on first use.
+    """
+    def __init__(self, load_upcoming, duration_minutes=60):
+        # load_upcoming(role, user_id) -> iterable of (sessionID, sessionDate) for non-cancelled upcoming sessions
+        self._load_upcoming = load_upcoming
+        self.duration_minutes = duration_minutes
+        self._bookings = {}  # (role, user_id) -> sorted [(start, end, sessionID)]
+        self._max_ends = {}  # (role, user_id) -> [max end of bookings[0..i]]
+        self._owners = {}    # sessionID -> [(role, user_id), ...]
+        self._reservations = itertools.count(-1, -1)  # Placeholder ids (negative) while a booking is being written.
+        self._lock = threading.Lock()
+
+    def _intervals(self, role, user_id):
+        key = (role, user_id)
+        if key not in self._bookings:
+            intervals = []
+            for session_id, session_date in self._load_upcoming(role, user_id):
+                try:
+                    start, end = parse_session_time(session_date, self.duration_minutes)
+                except ValueError:
+                    continue
+                intervals.append((start, end, session_id))
+                self._owners.setdefault(session_id, []).append(key)
+            intervals.sort()
+            self._bookings[key] = intervals
+            self._update_max_ends(key, 0)
+        return self._bookings[key]
+
+    def _update_max_ends(self, key, i):
+        """Recomputes the running maximum end from position i on (after an insert or removal there)."""
+        intervals = self._bookings[key]
+        max_ends = self._max_ends.setdefault(key, [])
+        del max_ends[i:]
+        for _, end, _ in intervals[i:]:
+            max_ends.append(max(end, max_ends[-1]) if max_ends else end)
+
+    def _overlaps(self, key, start, end):
+        intervals = self._intervals(*key)
+        i = bisect_left(intervals, (start,))
+        # Bookings starting before `start` overlap if any of them ends after it; the latest such end is max_ends[i-1].
+        if i > 0 and self._max_ends[key][i - 1] > start:
+            return True
+        return i < len(intervals) and intervals[i][0] < end
+
+    def _conflict(self, instructor_id, learner_id, start, end):
+        if self._overlaps(("instructor", instructor_id), start, end):
+            return "instructor"
+        if self._overlaps(("learner", learner_id), start, end):
+            return "learner"
+        return None
+
+    def _insert(self, session_id, instructor_id, learner_id, start, end):
+        for key in (("instructor", instructor_id), ("learner", learner_id)):
+            intervals = self._intervals(*key)
+            interval = (start, end, session_id)
+            i = bisect_left(intervals, interval)
+            intervals.insert(i, interval)
+            self._update_max_ends(key, i)
+            self._owners.setdefault(session_id, []).append(key)
+
+    def _remove(self, session_id):
+        for key in self._owners.pop(session_id, []):
+            intervals = self._bookings.get(key, [])
+            intervals[:] = [interval for interval in intervals if interval[2] != session_id]
+            self._update_max_ends(key, 0)
+
+    def find_conflict(self, instructor_id, learner_id, session_date):
+        """Returns 'instructor' or 'learner' if either is already booked in the slot, otherwise None."""
+        start, end = parse_session_time(session_date, self.duration_minutes)
+        with self._lock:
+            return self._conflict(instructor_id, learner_id, start, end)
+
+    def reserve(self, instructor_id, learner_id, session_date):
+        """
+        Checks the slot and holds it in one locked step, so two concurrent bookings can't both pass the check.
+        Returns (conflict, reservation): conflict is 'instructor', 'learner' or None, and the reservation id
+        (None on conflict) must be passed to confirm() once the session row exists, or to remove() if it isn't written.
+        """
+        start, end = parse_session_time(session_date, self.duration_minutes)
+        with self._lock:
+            conflict = self._conflict(instructor_id, learner_id, start, end)
+            if conflict:
+                return conflict, None
+            reservation = next(self._reservations)
+            self._insert(reservation, instructor_id, learner_id, start, end)
+            return None, reservation
+
+    def confirm(self, reservation, session_id):
+        """Replaces a reservation's placeholder id with the real sessionID."""
+        with self._lock:
+            keys = self._owners.get(reservation, [])
+            if not keys:
+                return
+            start, end, _ = next(interval for interval in self._bookings[keys[0]] if interval[2] == reservation)
+            instructor_id, learner_id = (dict(keys)[role] for role in ("instructor", "learner"))
+            self._remove(reservation)
+            self._insert(session_id, instructor_id, learner_id, start, end)
+
+    def add(self, session_id, instructor_id, learner_id, session_date):
+        start, end = parse_session_time(session_date, self.duration_minutes)
+        with self._lock:
+            self._insert(session_id, instructor_id, learner_id, start, end)
+
+    def remove(self, session_id):
+        """Frees a session's slot (e.g. when it is cancelled) or an unused reservation."""
+        with self._lock:
+            self._remove(session_id)
@@ -0,0 +1,271 @@
+# services/sharded_matching.py
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from services.matching_service import EARTH_RADIUS_KM, MAX_MATCH_DISTANCE_KM, haversine_distance, proximity_score
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def geohash_encode(lat, lon, precision):
+    """Standard base-32 geohash of a point."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+def geohash_bounds(geohash):
+    """Returns the (min_lat, max_lat, min_lon, max_lon) cell of a geohash."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+def _overlap_window(bounds, radius_km=MAX_MATCH_DISTANCE_KM):
+    """
+    Expands a cell so that every point outside the window is at least radius_km from every point inside the cell.
+    Returns (min_lat, max_lat, lon_center, lon_half_width); a half width of 180 or more means all longitudes.
+    Uses hav(d) >= cos(lat1) * cos(lat2) * hav(dlon), which bounds the distance by the longitude gap alone.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounds
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM) * (1 + 1e-9)
+    min_lat, max_lat = min_lat - dlat, max_lat + dlat
+    widest = max(abs(min_lat), abs(max_lat))
+    half_width = (max_lon - min_lon) / 2
+    if widest >= 90:
+        return min_lat, max_lat, 0.0, 180.0
+    s = math.sin(radius_km / (2 * EARTH_RADIUS_KM)) / math.cos(math.radians(widest))
+    if s >= 1:
+        return min_lat, max_lat, 0.0, 180.0
+    return min_lat, max_lat, (min_lon + max_lon) / 2, half_width + math.degrees(2 * math.asin(s)) * (1 + 1e-9)
+
+# --- Shared instructor arrays ---
+def _layout(count, words):
+    """(name, dtype, shape) of each array in the shared block, in order."""
+    return [
+        ("ids", np.int64, (count,)),
+        ("lat", np.float64, (count,)),
+        ("lon", np.float64, (count,)),
+        ("rating", np.float64, (count,)),
+        ("far_order", np.int64, (count,)),
+        ("skills", np.uint64, (count, words)),
+        ("has_location", np.bool_, (count,)),
+        ("days", np.uint8, (count,)),
+    ]
+
+def _views(buffer, layout):
+    arrays, offset = {}, 0
+    for name, dtype, shape in layout:
+        array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        arrays[name] = array
+        offset += array.nbytes
+    return arrays
+
+def _block_size(layout):
+    return max(1, sum(np.dtype(dtype).itemsize * math.prod(shape) for _, dtype, shape in layout))
+
+# Per-process state: set once by _attach (worker initializer), so instructor data isn't pickled per task.
+_WORKER = {}
+
+def _attach(shm_name, count, words, rating_weight, ratings_enabled):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER.clear()
+    _WORKER.update(shm=shm, arrays=_views(shm.buf, _layout(count, words)), rating_weight=rating_weight,
+                   ratings_enabled=ratings_enabled, far_cache={})
+
+def _detach():
+    arrays = _WORKER.pop("arrays", None)
+    shm = _WORKER.pop("shm", None)
+    del arrays
+    if shm is not None:
+        shm.close()
+    _WORKER.clear()
+
+def _score(proximity, rating):
+    if not _WORKER["ratings_enabled"]:
+        return proximity
+    weight = _WORKER["rating_weight"]
+    return (1 - weight) * proximity + weight * rating
+
+def _eligible(indices, required, day_bit):
+    arrays = _WORKER["arrays"]
+    skills = arrays["skills"][indices]
+    return ((arrays["days"][indices] & day_bit) != 0) & np.all((skills & required) == required, axis=1)
+
+def _best_far(required, weekday):
+    """
+    Best candidate scored with zero proximity, as (score, -index). Every instructor's true score is at least this,
+    and instructors outside a shard's window score exactly this, so it stands in for all of them.
+    """
+    key = (required.tobytes(), weekday)
+    cache = _WORKER["far_cache"]
+    if key not in cache:
+        arrays = _WORKER["arrays"]
+        order = arrays["far_order"]
+        eligible = _eligible(order, required, np.uint8(1 << weekday))
+        first = int(np.argmax(eligible)) if len(order) else 0
+        if len(order) and eligible[first]:
+            index = int(order[first])
+            cache[key] = (_score(proximity_score(float("inf")), float(arrays["rating"][index])), -index)
+        else:
+            cache[key] = None
+    return cache[key]
+
+def _match_shard(window, requests):
+    """Scores one shard's requests against the instructors inside its overlap window. Returns [(reqId, userId or None)]."""
+    arrays = _WORKER["arrays"]
+    lat, lon = arrays["lat"], arrays["lon"]
+    if window is None:
+        local = np.empty(0, dtype=np.int64)
+    else:
+        min_lat, max_lat, lon_center, lon_half_width = window
+        mask = arrays["has_location"] & (lat >= min_lat) & (lat <= max_lat)
+        if lon_half_width < 180:
+            mask &= np.abs((lon - lon_center + 180) % 360 - 180) <= lon_half_width
+        local = np.flatnonzero(mask)
+
+    results = []
+    for req_id, req_lat, req_lon, required_words, weekday in requests:
+        required = np.array(required_words, dtype=np.uint64)
+        best = None
+        candidates = local[_eligible(local, required, np.uint8(1 << weekday))] if len(local) else local
+        for index in candidates.tolist():
+            distance = haversine_distance(req_lon, req_lat, float(lon[index]), float(lat[index]))
+            key = (_score(proximity_score(distance), float(arrays["rating"][index])), -index)
+            if best is None or key > best:
+                best = key
+        far = _best_far(required, weekday)
+        if far is not None and (best is None or far > best):
+            best = far
+        results.append((req_id, int(arrays["ids"][-best[1]]) if best else None))
+    return results
+
+class ShardedMatcher:
+    """
+    Batch matcher for a backlog of requests. Requests are grouped into geohash cells; each shard is scored
+    against the instructors within MAX_MATCH_DISTANCE_KM of its cell (the border overlap), and all
+    instructors farther away are covered by a zero-proximity fallback, so results are identical to
+    MatchingService.find_best_match_for_request (ties go to the earlier instructor).
+    Instructor data is placed in shared memory once and attached by each worker process on start-up.
+    """
+    def __init__(self, matching_service, workers=None, precision=5, max_requests_per_task=200):
+        self.matching = matching_service
+        self.workers = workers or os.cpu_count() or 1
+        self.precision = precision
+        self.max_requests_per_task = max_requests_per_task
+
+    def _load_instructors(self):
+        user_model = self.matching.user_model
+        instructors = user_model.get_all_instructors()
+        skills = user_model.get_all_instructor_skills()
+        days = user_model.get_all_instructor_days()
+        ratings, global_mean = self.matching._load_rating_stats()
+        return instructors, skills, days, ratings, global_mean
+
+    def _fill(self, arrays, instructors, skills, days, skill_bits, ratings, global_mean):
+        for i, instructor in enumerate(instructors):
+            arrays["ids"][i] = instructor['userId']
+            has_location = instructor['userLat'] is not None and instructor['userLong'] is not None
+            arrays["has_location"][i] = has_location
+            arrays["lat"][i] = instructor['userLat'] if has_location else 0.0
+            arrays["lon"][i] = instructor['userLong'] if has_location else 0.0
+            arrays["rating"][i] = self.matching._rating_score(instructor['userId'], ratings, global_mean) if global_mean is not None else 0.0
+            arrays["days"][i] = sum(1 << DAYS.index(day) for day in days.get(instructor['userId'], ()) if day in DAYS)
+            arrays["skills"][i] = self._mask(skills.get(instructor['userId'], ()), skill_bits)
+        if global_mean is not None and self.matching.rating_weight > 0:
+            # Highest rating first, earlier instructor first among equals.
+            arrays["far_order"][:] = np.lexsort((np.arange(len(instructors)), -arrays["rating"]))
+        else:
+            arrays["far_order"][:] = np.arange(len(instructors))
+
+    @staticmethod
+    def _mask(skill_ids, skill_bits):
+        words = [0] * (len(skill_bits) // 64 + 1)
+        for skill_id in skill_ids:
+            bit = skill_bits[skill_id]
+            words[bit // 64] |= 1 << (bit % 64)
+        return words
+
+    def _shard(self, requests, skill_bits):
+        """Parses requests the way the serial matcher does and groups them into (window, requests) tasks."""
+        results, cells = {}, {}
+        for request in requests:
+            results[request['reqId']] = None
+            try:
+                required = set(map(int, request['reqSkills'].split(',')))
+                weekday = datetime.strptime(request['requestDate'], "%Y-%m-%d").weekday()
+            except (ValueError, AttributeError, TypeError):
+                continue  # Malformed requests never match.
+            if not required <= skill_bits.keys():
+                continue  # No instructor teaches one of the skills.
+            lat, lon = request['userLat'], request['userLong']
+            cell = geohash_encode(lat, lon, self.precision) if lat is not None and lon is not None else None
+            cells.setdefault(cell, []).append((request['reqId'], lat, lon, tuple(self._mask(required, skill_bits)), weekday))
+
+        tasks = []
+        for cell in sorted(cells, key=lambda c: (c is None, c or "")):
+            window = _overlap_window(geohash_bounds(cell)) if cell is not None else None
+            shard = cells[cell]
+            for start in range(0, len(shard), self.max_requests_per_task):
+                tasks.append((window, shard[start:start + self.max_requests_per_task]))
+        return results, tasks
+
+    def match_all(self, requests):
+        """Returns {reqId: best instructor userId or None}, in the order the requests were given."""
+        instructors, skills, days, ratings, global_mean = self._load_instructors()
+        skill_bits = {skill_id: bit for bit, skill_id in enumerate(sorted({s for ids in skills.values() for s in ids}))}
+        words = len(skill_bits) // 64 + 1
+        layout = _layout(len(instructors), words)
+        results, tasks = self._shard(requests, skill_bits)
+
+        shm = shared_memory.SharedMemory(create=True, size=_block_size(layout))
+        try:
+            arrays = _views(shm.buf, layout)
+            self._fill(arrays, instructors, skills, days, skill_bits, ratings, global_mean)
+            del arrays
+            init_args = (shm.name, len(instructors), words, self.matching.rating_weight, global_mean is not None)
+            if self.workers == 1 or len(tasks) <= 1:
+                _attach(*init_args)
+                try:
+                    shard_results = [_match_shard(window, shard) for window, shard in tasks]
+                finally:
+                    _detach()
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_attach, initargs=init_args) as pool:
+                    shard_results = list(pool.map(_match_shard, *zip(*tasks)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        # Each request belongs to exactly one shard, so merging is a plain update in request order.
+        for shard in shard_results:
+            for req_id, instructor_id in shard:
+                results[req_id] = instructor_id
+        return results
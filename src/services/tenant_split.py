@@ -0,0 +1,171 @@
+# services/tenant_split.py
+import csv
+import os
+import sqlite3
+
+# The column that says which user (and therefore which tenant) owns each row.
+OWNER_COLUMNS = {
+    "user": "userId",
+    "user_profiles": "userID",
+    "request": "userId",
+    "session": "learnerID",
+    "instructor_skills": "instructorID",
+    "instructor_availability": "instructorID",
+    "learner_stats": "learnerID",
+    "practice_material": "learnerID",
+    "feedback": "learnerID",
+    "messages": "senderID",
+    "message_archive": "userA",
+    "assignments": "instructorID",
+    "submissions": "learnerID",
+    "surveys": "creatorID",
+    "survey_responses": "learnerID",
+    "material_recommendations": "learnerID",
+    "recommendation_dirty": "learnerID",
+}
+# Reference data every shard keeps in full.
+SHARED_TABLES = ("skills", "geocode_cache", "sqlite_sequence")
+# Rebuilt (rollups) or restarted (maintenance history) per shard.
+DERIVED_TABLES = ("rollup_daily", "rollup_instructor", "rollup_skill", "maintenance_log")
+
+class TenantSplitter:
+    """
+    Splits the single application database into one shard per tenant and fills the tenant directory.
+    Each shard starts as a consistent copy of the source (SQLite backup API) from which the rows owned by
+    other tenants' users are deleted; user ids are kept, so references inside a tenant stay valid.
+    Rows that still point at another tenant's user afterwards (e.g. a session with an instructor from
+    another school) are reported via PRAGMA foreign_key_check so the mapping can be corrected.
+    """
+    def __init__(self, source_file, out_dir):
+        self.source_file = source_file
+        self.out_dir = out_dir
+
+    def load_mapping(self, mapping_file, default_tenant=None):
+        """
+        Reads a userName,tenantId CSV and returns {userId: tenantId} for every user in the source database.
+        Users missing from the file go to default_tenant; without one they are an error.
+        """
+        with open(mapping_file, newline="", encoding="utf-8") as f:
+            by_name = {row['userName']: row['tenantId'] for row in csv.DictReader(f)}
+        conn = sqlite3.connect(self.source_file)
+        try:
+            users = conn.execute("SELECT userId, userName FROM user").fetchall()
+        finally:
+            conn.close()
+        mapping, missing = {}, []
+        for user_id, user_name in users:
+            tenant_id = by_name.get(user_name, default_tenant)
+            if tenant_id is None:
+                missing.append(user_name)
+            mapping[user_id] = tenant_id
+        if missing:
+            raise ValueError(f"{len(missing)} users have no tenant (e.g. {', '.join(missing[:5])}); add them to the mapping or pass a default tenant.")
+        return mapping
+
+    def split(self, mapping, log=print):
+        """
+        Writes <out_dir>/<tenant>.db for every tenant in mapping ({userId: tenantId}) and registers the
+        tenants and users in <out_dir>/directory.db. Returns {tenant_id: {table: rows kept}}.
+        """
+        from models.analytics import Analytics
+        from models.database import Database
+        from models.tenancy import TenantRouter, TENANT_ID_PATTERN
+
+        tenants = sorted(set(mapping.values()))
+        for tenant_id in tenants:
+            if not TENANT_ID_PATTERN.match(tenant_id):
+                raise ValueError(f"Invalid tenant id '{tenant_id}': use letters, digits, '-' and '_' only.")
+            if tenant_id == "directory":
+                # Its shard would be directory.db, the tenant directory itself.
+                raise ValueError("The tenant id 'directory' is reserved.")
+            if os.path.exists(self.shard_path(tenant_id)):
+                raise FileExistsError(f"Shard already exists: {self.shard_path(tenant_id)}")
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        report = {}
+        for tenant_id in tenants:
+            user_ids = [user_id for user_id, tenant in mapping.items() if tenant == tenant_id]
+            report[tenant_id] = self._write_shard(tenant_id, user_ids, log)
+            log(f"{tenant_id}: {len(user_ids):,} users, {sum(report[tenant_id].values()):,} rows")
+
+        directory_file = os.path.join(self.out_dir, "directory.db")
+        sqlite3.connect(directory_file).close()
+        router = TenantRouter(directory_file)
+        for tenant_id in tenants:
+            router.add_tenant(tenant_id, self.shard_path(tenant_id))
+            # Rollup tables and triggers are rebuilt from the shard's own rows.
+            Analytics(Database(self.shard_path(tenant_id))).rebuild()
+        conn = sqlite3.connect(self.source_file)
+        try:
+            names = dict(conn.execute("SELECT userId, userName FROM user").fetchall())
+        finally:
+            conn.close()
+        router.assign_users((names[user_id], tenant_id) for user_id, tenant_id in mapping.items() if user_id in names)
+        return report
+
+    def shard_path(self, tenant_id):
+        return os.path.join(self.out_dir, f"{tenant_id}.db")
+
+    def _write_shard(self, tenant_id, user_ids, log):
+        final_path = self.shard_path(tenant_id)
+        tmp_path = final_path + ".part"
+        source = sqlite3.connect(self.source_file)
+        shard = sqlite3.connect(tmp_path)
+        try:
+            source.backup(shard)
+            shard.execute("CREATE TEMP TABLE tenant_users (userId INTEGER PRIMARY KEY)")
+            shard.executemany("INSERT INTO tenant_users (userId) VALUES (?)", ((user_id,) for user_id in user_ids))
+            # The rollup triggers would otherwise fire for every deleted row; Analytics.rebuild() recreates them.
+            for (trigger,) in shard.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg\\_%\\_rollup' ESCAPE '\\'").fetchall():
+                shard.execute(f'DROP TRIGGER "{trigger}"')
+
+            kept = {}
+            tables = [row[0] for row in shard.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+            for table in tables:
+                if table in OWNER_COLUMNS:
+                    shard.execute(f'DELETE FROM "{table}" WHERE "{OWNER_COLUMNS[table]}" NOT IN (SELECT userId FROM tenant_users)')
+                    kept[table] = shard.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                elif table == "maintenance_log":
+                    shard.execute("DELETE FROM maintenance_log")
+                elif table not in SHARED_TABLES and table not in DERIVED_TABLES and not table.startswith("sqlite_"):
+                    log(f"{tenant_id}: table '{table}' has no tenant owner; copied unchanged.")
+            shard.commit()
+
+            dangling = {}
+            for table, _, _, _ in shard.execute("PRAGMA foreign_key_check").fetchall():
+                dangling[table] = dangling.get(table, 0) + 1
+            for table, count in sorted(dangling.items()):
+                log(f"{tenant_id}: {count:,} rows in '{table}' reference another tenant's rows.")
+            # Planner statistics copied from the source describe the whole database; refresh them for the shard.
+            shard.execute("PRAGMA optimize")
+            shard.execute("VACUUM")
+        except (sqlite3.Error, OSError):
+            shard.close()
+            os.remove(tmp_path)
+            raise
+        finally:
+            source.close()
+        shard.close()
+        os.replace(tmp_path, final_path)
+        return kept
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+    parser = argparse.ArgumentParser(description="Split the single database into one SQLite shard per tenant (school).")
+    parser.add_argument("mapping", help="CSV file with userName,tenantId columns.")
+    parser.add_argument("--default-tenant", help="Tenant for users not listed in the mapping.")
+    parser.add_argument("--db", default=config.DB_PATH)
+    parser.add_argument("--out-dir", default=os.path.dirname(config.TENANT_DIRECTORY))
+    args = parser.parse_args()
+
+    splitter = TenantSplitter(args.db, args.out_dir)
+    try:
+        splitter.split(splitter.load_mapping(args.mapping, args.default_tenant))
+    except (ValueError, FileExistsError, sqlite3.Error) as e:
+        print(f"Split failed: {e}")
+        sys.exit(1)
+    print(f"Tenant directory written to {os.path.join(args.out_dir, 'directory.db')}; the app uses it on next start.")
@@ -0,0 +1,116 @@
+# services/upload_service.py
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SIZE = 1024 * 1024
+
+class UploadService:
+    """
+    Content-addressed store for user uploads under assets/uploads/<kind>/.
+    Files are streamed in chunks while being hashed, so identical uploads are stored once,
+    and the work runs on a background pool instead of the UI thread.
+    """
+    def __init__(self, assets_dir=os.path.join(SRC_DIR, "assets"), size_limits=None, max_workers=2):
+        self.assets_dir = assets_dir
+        self.size_limits = size_limits or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="uploads")
+
+    def _relative(self, path):
+        """Path as stored in the database and used by the view, e.g. 'assets/uploads/resumes/ab/ab12....pdf'."""
+        return os.path.join("assets", os.path.relpath(path, self.assets_dir)).replace("\\", "/")
+
+    def _absolute(self, relative_path):
+        return os.path.join(self.assets_dir, os.path.relpath(relative_path, "assets"))
+
+    def store(self, source_path, kind):
+        """
+        Copies source_path into the store and returns its relative path.
+        Raises ValueError if the file exceeds the size limit for its kind.
+        """
+        limit = self.size_limits.get(kind)
+        if limit and os.path.getsize(source_path) > limit:
+            raise ValueError(f"File is too large (limit is {limit / (1024 * 1024):.1f} MB).")
+
+        kind_dir = os.path.join(self.assets_dir, "uploads", kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=kind_dir, suffix=".part")
+        try:
+            with open(source_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                while chunk := src.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if limit and size > limit:
+                        # The file grew after the size check; stop instead of copying it all.
+                        raise ValueError(f"File is too large (limit is {limit / (1024 * 1024):.1f} MB).")
+                    digest.update(chunk)
+                    dst.write(chunk)
+            content_hash = digest.hexdigest()
+            extension = os.path.splitext(source_path)[1].lower()
+            final_dir = os.path.join(kind_dir, content_hash[:2])
+            os.makedirs(final_dir, exist_ok=True)
+            final_path = os.path.join(final_dir, content_hash + extension)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)  # Already stored: deduplicate.
+            else:
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self._relative(final_path)
+
+    def avatar_variant(self, relative_path, size=256):
+        """
+        Returns a cached, downscaled PNG copy of a stored image, generating it on first request.
+        Falls back to the original path if Pillow is unavailable or the image cannot be read.
+        """
+        source = self._absolute(relative_path)
+        content_hash = os.path.splitext(os.path.basename(source))[0]
+        variant_dir = os.path.join(self.assets_dir, "uploads", "avatars")
+        variant_path = os.path.join(variant_dir, f"{content_hash}_{size}.png")
+        if os.path.exists(variant_path):
+            return self._relative(variant_path)
+        tmp_path = None
+        try:
+            # Imported here so it only loads when an avatar is processed.
+            from PIL import Image, ImageOps
+            os.makedirs(variant_dir, exist_ok=True)
+            with Image.open(source) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+                    # PNG can't store e.g. CMYK JPEGs.
+                    image = image.convert("RGBA" if "A" in image.mode else "RGB")
+                image.thumbnail((size, size))
+                fd, tmp_path = tempfile.mkstemp(dir=variant_dir, suffix=".part")
+                with os.fdopen(fd, "wb") as f:
+                    image.save(f, format="PNG", optimize=True)
+            os.replace(tmp_path, variant_path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Could not create avatar variant for {relative_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return relative_path
+        return self._relative(variant_path)
+
+    def store_avatar(self, source_path, size=256):
+        """Stores an uploaded profile picture and returns the path of its downscaled variant."""
+        return self.avatar_variant(self.store(source_path, "avatars_original"), size)
+
+    def submit(self, fn, *args, on_done=None):
+        """
+        Runs fn(*args) on the upload pool. on_done(result, error) is called from the worker thread
+        with either the result or the error message.
+        """
+        future = self._pool.submit(fn, *args)
+        if on_done:
+            def _callback(f):
+                try:
+                    on_done(f.result(), None)
+                except (ValueError, OSError) as e:
+                    on_done(None, str(e))
+            future.add_done_callback(_callback)
+        return future
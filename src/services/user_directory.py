@@ -0,0 +1,92 @@
+# services/user_directory.py
+import threading
+from bisect import bisect_left, insort
+
+class UserDirectory:
+    """
+    In-memory index of usernames and profile names, loaded once from the database.
+    Usernames are kept in a sorted list so availability checks and prefix lookups are binary searches;
+    a second sorted list of lowercase (username / first name / last name) keys powers typeahead search.
+    """
+    def __init__(self, entries=()):
+        self._lock = threading.Lock()
+        self._usernames = []    # sorted, exact usernames (SQLite compares them case-sensitively)
+        self._search_keys = []  # sorted (lowercase key, userId)
+        self._users = {}        # userId -> {"userId", "userName", "userRole", "firstName", "lastName"}
+        for entry in entries:
+            self._add(dict(entry))
+        self._usernames.sort()
+        self._search_keys.sort()
+
+    @staticmethod
+    def _keys_for(entry):
+        keys = {entry["userName"].lower()}
+        for field in ("firstName", "lastName"):
+            if entry.get(field):
+                keys.add(entry[field].strip().lower())
+        return keys
+
+    def _add(self, entry, keep_sorted=False):
+        self._users[entry["userId"]] = entry
+        add = insort if keep_sorted else list.append
+        add(self._usernames, entry["userName"])
+        for key in self._keys_for(entry):
+            add(self._search_keys, (key, entry["userId"]))
+
+    def _remove_search_keys(self, entry):
+        for key in self._keys_for(entry):
+            i = bisect_left(self._search_keys, (key, entry["userId"]))
+            if i < len(self._search_keys) and self._search_keys[i] == (key, entry["userId"]):
+                del self._search_keys[i]
+
+    def add_user(self, user_id, user_name, user_role, first_name=None, last_name=None):
+        """Indexes a newly created user."""
+        with self._lock:
+            if user_id in self._users:
+                return
+            self._add({"userId": user_id, "userName": user_name, "userRole": user_role, "firstName": first_name, "lastName": last_name}, keep_sorted=True)
+
+    def update_profile(self, user_id, first_name, last_name):
+        """Re-indexes a user's profile names after their profile changes."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            self._remove_search_keys(entry)
+            entry["firstName"], entry["lastName"] = first_name, last_name
+            for key in self._keys_for(entry):
+                insort(self._search_keys, (key, user_id))
+
+    def contains(self, user_name):
+        """Returns True if the exact username is taken."""
+        with self._lock:
+            i = bisect_left(self._usernames, user_name)
+            return i < len(self._usernames) and self._usernames[i] == user_name
+
+    def suggest_available(self, user_name, count=3):
+        """Suggests free usernames built from a taken one, e.g. 'maria' -> 'maria1', 'maria2'."""
+        suggestions, n = [], 1
+        while len(suggestions) < count:
+            candidate = f"{user_name}{n}"
+            if not self.contains(candidate):
+                suggestions.append(candidate)
+            n += 1
+        return suggestions
+
+    def search(self, query, exclude_user_id=None, page=0, page_size=20):
+        """
+        Returns one page of users whose username, first name or last name starts with the query
+        (case-insensitive), ordered by username, plus whether more results exist.
+        """
+        query = (query or "").strip().lower()
+        with self._lock:
+            seen = set()
+            i = bisect_left(self._search_keys, (query,))
+            while i < len(self._search_keys) and self._search_keys[i][0].startswith(query):
+                user_id = self._search_keys[i][1]
+                if user_id != exclude_user_id:
+                    seen.add(user_id)
+                i += 1
+            matches = sorted((self._users[user_id] for user_id in seen), key=lambda entry: entry["userName"])
+        start = page * page_size
+        return [dict(entry) for entry in matches[start:start + page_size]], len(matches) > start + page_size
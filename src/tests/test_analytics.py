@@ -0,0 +1,60 @@
+# tests/test_analytics.py
+"""Incremental rollup triggers agree with a full recomputation. Run from the src directory: python -m pytest tests"""
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.analytics import Analytics
+from models.database import Database
+
+class RollupDependentsTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = create_scratch_db()
+        self.analytics = Analytics(Database(self.db_path))
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("INSERT INTO skills (skillID, skillName) VALUES (1, 'Speaking'), (2, 'Writing')")
+        for session in (1, 2):
+            self.conn.execute("INSERT INTO session (sessionID, requestID, instructorID, learnerID, sessionDate, status) "
+                              "VALUES (?, 0, 1, 3, '2025-01-06', 'completed')", (session,))
+        self.conn.executemany("INSERT INTO feedback (sessionID, learnerID, rating, feedbackDate) VALUES (?, 3, ?, '2025-01-07')",
+                              [(1, 5), (1, 4), (2, 3)])
+        self.conn.execute("INSERT INTO assignments (assignmentID, instructorID, skillID, title) VALUES (1, 1, 1, 'Essay')")
+        self.conn.executemany("INSERT INTO submissions (assignmentID, learnerID, submissionDate) VALUES (1, ?, '2025-01-08')", [(3,), (4,)])
+        self.conn.commit()
+        self.assertEqual(self.analytics.verify(), [])
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.db_path)
+
+    def _write(self, sql, params=()):
+        self.conn.execute(sql, params)
+        self.conn.commit()
+        self.assertEqual(self.analytics.verify(), [])
+
+    def test_reassigning_a_session_moves_its_feedback(self):
+        self._write("UPDATE session SET instructorID = 2 WHERE sessionID = 1")
+
+    def test_renumbering_a_session_moves_its_feedback(self):
+        self._write("UPDATE session SET sessionID = 9 WHERE sessionID = 1")
+        self._write("UPDATE session SET sessionID = 1 WHERE sessionID = 9")
+
+    def test_deleting_a_session_drops_its_feedback(self):
+        self._write("DELETE FROM session WHERE sessionID = 2")
+        # Feedback for the now unknown session is not counted for any instructor, nor when it is removed.
+        self._write("DELETE FROM feedback WHERE sessionID = 2")
+
+    def test_session_inserted_after_its_feedback(self):
+        self._write("INSERT INTO feedback (sessionID, learnerID, rating, feedbackDate) VALUES (7, 3, 2, '2025-01-09')")
+        self._write("INSERT INTO session (sessionID, requestID, instructorID, learnerID, sessionDate) VALUES (7, 0, 2, 3, '2025-01-09')")
+
+    def test_changing_an_assignments_skill_moves_its_submissions(self):
+        self._write("UPDATE assignments SET skillID = 2 WHERE assignmentID = 1")
+        self._write("DELETE FROM assignments WHERE assignmentID = 1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# tests/test_matching_service.py
+"""Ranking tests for MatchingService's proximity/rating blend. Run from the src directory: python -m pytest tests"""
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.database import Database
+from models.registry import ModelRegistry
+from services.matching_service import MatchingService
+
+MONDAY = "2025-01-06"
+HOME = (40.0, -74.0)
+
+class MatchingRankingTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = create_scratch_db()
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("INSERT INTO skills (skillID, skillName) VALUES (1, 'Speaking')")
+        self.learner = self._add_user("learner", *HOME)
+
+    def tearDown(self):
+        self.conn.close()
+        os.remove(self.db_path)
+
+    def _add_user(self, role, lat=None, lon=None):
+        cursor = self.conn.execute(
+            "INSERT INTO user (userRole, userName, userPass, userEmail, userLat, userLong) VALUES (?, ?, 'x', ?, ?, ?)",
+            (role, f"{role}{self.conn.total_changes}", f"{role}{self.conn.total_changes}@example.com", lat, lon),
+        )
+        return cursor.lastrowid
+
+    def _add_instructor(self, km_north=0.0, ratings=()):
+        """An instructor teaching skill 1 on Mondays, km_north of the learner, with the given feedback ratings."""
+        instructor = self._add_user("instructor", HOME[0] + km_north / 111.2, HOME[1])
+        self.conn.execute("INSERT INTO instructor_skills (instructorID, skillID) VALUES (?, 1)", (instructor,))
+        self.conn.execute("INSERT INTO instructor_availability (instructorID, day) VALUES (?, 'Monday')", (instructor,))
+        for rating in ratings:
+            session = self.conn.execute(
+                "INSERT INTO session (requestID, instructorID, learnerID, sessionDate, status) VALUES (0, ?, ?, ?, 'completed')",
+                (instructor, self.learner, MONDAY),
+            ).lastrowid
+            self.conn.execute(
+                "INSERT INTO feedback (sessionID, learnerID, rating, feedbackDate) VALUES (?, ?, ?, ?)",
+                (session, self.learner, rating, MONDAY),
+            )
+        return instructor
+
+    def _matcher(self, **kwargs):
+        self.conn.commit()
+        models = ModelRegistry(Database(self.db_path))
+        return MatchingService(models['user'], models['request'], models['analytics'], **kwargs)
+
+    def _best(self, matcher):
+        request = {"reqId": 1, "reqSkills": "1", "requestDate": MONDAY, "userLat": HOME[0], "userLong": HOME[1]}
+        best = matcher.find_best_match_for_request(request)
+        return best['userId'] if best else None
+
+    def test_better_rated_instructor_wins_at_equal_distance(self):
+        self._add_instructor(ratings=[2] * 10)
+        well_rated = self._add_instructor(ratings=[5] * 10)
+        self.assertEqual(self._best(self._matcher()), well_rated)
+
+    def test_rating_outweighs_small_distance_difference(self):
+        self._add_instructor(km_north=0.0, ratings=[1] * 20)
+        farther = self._add_instructor(km_north=5.0, ratings=[5] * 20)
+        self.assertEqual(self._best(self._matcher()), farther)
+        # With ratings switched off, proximity alone decides.
+        self.assertNotEqual(self._best(self._matcher(rating_weight=0.0)), farther)
+
+    def test_single_review_does_not_beat_long_record(self):
+        self._add_instructor(km_north=40.0, ratings=[3] * 30)  # Pulls the global mean (the prior) down to about 4.
+        long_record = self._add_instructor(ratings=[5] * 30 + [4] * 2)
+        self._add_instructor(ratings=[5])
+        self.assertEqual(self._best(self._matcher()), long_record)
+
+    def test_unrated_instructor_scores_at_global_mean(self):
+        self._add_instructor(ratings=[4, 4, 4, 4])
+        unrated = self._add_instructor()
+        matcher = self._matcher()
+        ratings, global_mean = matcher._load_rating_stats()
+        self.assertNotIn(unrated, ratings)
+        self.assertAlmostEqual(matcher._smoothed_rating(unrated, ratings, global_mean), global_mean)
+
+    def test_no_feedback_falls_back_to_proximity(self):
+        nearest = self._add_instructor(km_north=1.0)
+        self._add_instructor(km_north=3.0)
+        matcher = self._matcher()
+        self.assertEqual(matcher._load_rating_stats(), ({}, 3.0))
+        self.assertEqual(self._best(matcher), nearest)
+
+    def test_ties_go_to_the_lowest_user_id(self):
+        first = self._add_instructor(ratings=[4, 4])
+        self._add_instructor(ratings=[4, 4])
+        self.assertEqual(self._best(self._matcher()), first)
+
+    def test_unqualified_instructor_is_never_matched(self):
+        instructor = self._add_user("instructor", *HOME)
+        self.conn.execute("INSERT INTO instructor_availability (instructorID, day) VALUES (?, 'Monday')", (instructor,))
+        self.assertIsNone(self._best(self._matcher()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_message.py
+"""Hot/archive read consistency for Message.get_conversation. Run from the src directory: python -m pytest tests"""
+import os
+import sqlite3
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.database import Database
+from models.message import Message
+from services.message_archiver import MessageArchiver
+
+class ConversationArchiveRaceTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = create_scratch_db()
+        conn = sqlite3.connect(self.db_path)
+        for user in (1, 2):
+            conn.execute("INSERT INTO user (userId, userRole, userName, userPass, userEmail) VALUES (?, 'learner', ?, 'x', ?)",
+                         (user, f"user{user}", f"user{user}@example.com"))
+        conn.executemany("INSERT INTO messages (senderID, receiverID, content, timestamp) VALUES (?, ?, ?, ?)",
+                         [(1 + i % 2, 2 - i % 2, f"message {i}", f"2020-01-01 10:00:{i:02d}") for i in range(10)])
+        conn.commit()
+        conn.close()
+        self.db = Database(self.db_path)
+        self.messages = Message(self.db)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_archiving_between_hot_and_archive_reads_does_not_duplicate(self):
+        read_archive = self.messages._read_archive
+        archiver = threading.Thread(target=MessageArchiver(self.db).archive_older_than, args=("2021-01-01 00:00:00",))
+
+        def archive_then_read(*args):
+            # The archiver moves the conversation after the hot table has been read.
+            archiver.start()
+            time.sleep(0.1)
+            return read_archive(*args)
+
+        self.messages._read_archive = archive_then_read
+        conversation = self.messages.get_conversation(1, 2)
+        archiver.join()
+        self.assertEqual([row['messageID'] for row in conversation], list(range(1, 11)))
+        # After the move, the same conversation is read entirely from the archive.
+        self.messages._read_archive = read_archive
+        self.assertEqual([row['messageID'] for row in self.messages.get_conversation(1, 2)], list(range(1, 11)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_recommendation_service.py
+"""Dirty-marking tests for RecommendationService. Run from the src directory: python -m pytest tests"""
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scratch import create_scratch_db
+from models.database import Database
+from services.recommendation_service import RecommendationService
+
+class RecommendationDirtyMarkTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = create_scratch_db()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO skills (skillID, skillName) VALUES (1, 'Speaking'), (2, 'Writing')")
+        for learner in range(1, 7):
+            conn.execute("INSERT INTO user (userId, userRole, userName, userPass, userEmail) VALUES (?, 'learner', ?, 'x', ?)",
+                         (learner, f"learner{learner}", f"learner{learner}@example.com"))
+            conn.execute("INSERT INTO learner_stats (learnerID, skillID, proficiencyScore, sessionsCompleted) VALUES (?, 1, ?, ?)",
+                         (learner, 10 * learner, learner))
+            conn.execute("INSERT INTO practice_material (learnerID, instructorID, skillID, materialTitle, materialLink, submittedDate) "
+                         "VALUES (?, 1, 1, ?, ?, '2025-01-01')", (learner, f"Material {learner}", f"https://example.com/{learner}"))
+        conn.commit()
+        conn.close()
+        self.service = RecommendationService(Database(self.db_path), neighbours=2)
+        self.service.refresh()
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def _update_stats(self, learner, score):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE learner_stats SET proficiencyScore = ? WHERE learnerID = ? AND skillID = 1", (score, learner))
+        conn.commit()
+        conn.close()
+
+    def test_refresh_clears_marks(self):
+        self.assertFalse(self.service.has_pending())
+
+    def test_update_during_refresh_stays_dirty(self):
+        self._update_stats(3, 99)
+        load_materials = self.service._load_materials
+
+        def load_materials_then_write(conn):
+            # Learner 3 changes again after the refresh has read the dirty marks.
+            self._update_stats(3, 5)
+            return load_materials(conn)
+
+        self.service._load_materials = load_materials_then_write
+        self.service.refresh()
+        self.service._load_materials = load_materials
+        self.assertTrue(self.service.has_pending())
+        self.service.refresh()
+        self.assertFalse(self.service.has_pending())
+
+    def test_neighbours_of_changed_learner_are_refreshed(self):
+        refreshed = self.service.refresh(full=True)
+        self.assertEqual(refreshed, 6)
+        self._update_stats(3, 31)
+        # Learner 3 plus its two nearest neighbours.
+        self.assertEqual(self.service.refresh(), 3)
+
+    def test_new_material_reaches_neighbours(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO practice_material (learnerID, instructorID, skillID, materialTitle, materialLink, submittedDate) "
+                     "VALUES (3, 1, 1, 'New material', 'https://example.com/new', '2025-02-01')")
+        material = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        conn.commit()
+        conn.close()
+        self.assertTrue(self.service.has_pending())
+        self.service.refresh()
+        conn = sqlite3.connect(self.db_path)
+        recommended_to = {row[0] for row in conn.execute("SELECT learnerID FROM material_recommendations WHERE materialID = ?", (material,))}
+        conn.close()
+        # Learner 3 and its two nearest neighbours were refreshed; the neighbours now get the new material.
+        self.assertEqual(len(recommended_to), 2)
+        self.assertNotIn(3, recommended_to)
+
+if __name__ == "__main__":
+    unittest.main()
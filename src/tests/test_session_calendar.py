@@ -0,0 +1,63 @@
+# tests/test_session_calendar.py
+"""Double-booking checks for SessionCalendar. Run from the src directory: python -m pytest tests"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.session_calendar import SessionCalendar
+
+INSTRUCTOR, LEARNER = 1, 2
+
+class SessionCalendarTest(unittest.TestCase):
+    def _calendar(self, instructor_slots=()):
+        slots = {("instructor", INSTRUCTOR): list(instructor_slots)}
+        return SessionCalendar(lambda role, user_id: slots.get((role, user_id), []), duration_minutes=60)
+
+    def test_whole_day_booking_before_several_slots_is_found(self):
+        # Existing rows can overlap each other: a whole-day session plus hourly slots on the same day.
+        calendar = self._calendar([(1, "2030-01-07"), (2, "2030-01-07 09:00"), (3, "2030-01-07 10:00")])
+        self.assertEqual(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-07 15:00"), "instructor")
+        self.assertIsNone(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-08 09:00"))
+
+    def test_adjacent_slots_do_not_conflict(self):
+        calendar = self._calendar([(1, "2030-01-07 09:00")])
+        self.assertIsNone(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-07 10:00"))
+        self.assertEqual(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-07 09:30"), "instructor")
+
+    def test_removing_the_long_booking_frees_the_day(self):
+        calendar = self._calendar([(1, "2030-01-07"), (2, "2030-01-07 09:00")])
+        self.assertEqual(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-07 15:00"), "instructor")
+        calendar.remove(1)
+        self.assertIsNone(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-07 15:00"))
+
+    def test_concurrent_reservations_book_the_slot_once(self):
+        calendar = self._calendar()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def book():
+            barrier.wait()
+            results.append(calendar.reserve(INSTRUCTOR, LEARNER, "2030-01-07 09:00"))
+
+        threads = [threading.Thread(target=book) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(1 for conflict, _ in results if conflict is None), 1)
+
+    def test_released_reservation_frees_the_slot(self):
+        calendar = self._calendar()
+        _, reservation = calendar.reserve(INSTRUCTOR, LEARNER, "2030-01-07 09:00")
+        calendar.remove(reservation)
+        conflict, reservation = calendar.reserve(INSTRUCTOR, LEARNER, "2030-01-07 09:00")
+        self.assertIsNone(conflict)
+        calendar.confirm(reservation, 42)
+        calendar.remove(42)
+        self.assertIsNone(calendar.find_conflict(INSTRUCTOR, LEARNER, "2030-01-07 09:00"))
+
+if __name__ == "__main__":
+    unittest.main()
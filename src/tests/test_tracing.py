@@ -0,0 +1,49 @@
+# tests/test_tracing.py
+"""Span bookkeeping tests for Tracer. Run from the src directory: python -m pytest tests"""
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tracing import Tracer
+
+class TracerContinuationTest(unittest.TestCase):
+    def setUp(self):
+        self.tracer = Tracer(sample_rate=1.0)
+
+    def test_bound_callback_joins_the_action(self):
+        def finish_login():
+            with self.tracer.span("route /learner"):
+                pass
+
+        with self.tracer.span("handle_login"):
+            callback = self.tracer.bind(finish_login, "finish_login")
+        # The root span has ended, but the action waits for its continuation.
+        self.assertEqual(self.tracer.recent_actions(), [])
+        thread = threading.Thread(target=callback)
+        thread.start()
+        thread.join()
+        (action,) = self.tracer.recent_actions()
+        self.assertEqual(action.name, "handle_login")
+        self.assertEqual({span[0] for span in action.spans}, {"handle_login", "finish_login", "route /learner"})
+        self.assertGreaterEqual(action.duration, max(start + duration for _, _, start, duration, _, _ in action.spans) - action.started)
+
+    def test_bind_outside_an_action_returns_the_function(self):
+        fn = lambda: None
+        self.assertIs(self.tracer.bind(fn, "callback"), fn)
+
+    def test_generator_is_timed_while_consumed(self):
+        def rows():
+            yield from range(3)
+
+        traced = self.tracer.wrap(rows, "Model.rows", "model")
+        with self.tracer.span("action"):
+            self.assertEqual(list(traced()), [0, 1, 2])
+        (action,) = self.tracer.recent_actions()
+        self.assertEqual([span[0] for span in action.spans], ["Model.rows", "action"])
+        self.assertEqual(action.spans[0][5], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 # views/view.py
 import flet as ft
-import shutil
 import os
+import threading
+import config
+from datetime import date, timedelta
 
 # --- App Theme & Style (Dark Theme) ---
 C_BACKGROUND = "#1A202C"
@@ -19,6 +21,8 @@ class View:
         self.controller = controller
         self.page = None
         self.controls = {}
+        # Section name -> function applying fresh dashboard data to the current dashboard's controls in place.
+        self._dashboard_updaters = {}
         self.dialog = ft.AlertDialog(modal=True, bgcolor=C_CONTAINER)
 
     def _setup_page(self):
@@ -72,10 +76,10 @@ class View:
         self.dialog.open = True
         self.page.update()
 
-    def show_map_dialog(self, map_file):
+    def show_map_dialog(self, map_file, title="User Location Map"):
         # This assumes Flet supports WebView (if not, you can open the file externally)
         webview = ft.WebView(src=map_file, width=800, height=600)
-        self.dialog.title = ft.Text("User Location Map")
+        self.dialog.title = ft.Text(title)
         self.dialog.content = webview
         self.dialog.actions = [ft.TextButton("Close", on_click=lambda _: self._close_dialog())]
         self.dialog.open = True
@@ -104,6 +108,7 @@ class View:
         self.controls['learner_reg_mi'] = ft.TextField(label="M.I.", width=70, border_color=C_SECONDARY)
         self.controls['learner_reg_username'] = ft.TextField(label="Username", width=380, border_color=C_SECONDARY, on_blur=lambda e: self.controller.check_username_availability(e.control.value))
         self.controls['learner_reg_email'] = ft.TextField(label="Email", width=380, border_color=C_SECONDARY)
+        self.controls['learner_reg_address'] = ft.TextField(label="City / Address", hint_text="e.g. Diliman, Quezon City", width=380, border_color=C_SECONDARY)
         self.controls['learner_reg_password'] = ft.TextField(label="Password", password=True, can_reveal_password=True, width=380, border_color=C_SECONDARY)
         self.controls['learner_reg_verify_password'] = ft.TextField(label="Verify Password", password=True, can_reveal_password=True, width=380, border_color=C_SECONDARY)
         self.controls['learner_reg_consent'] = ft.Checkbox(label="I agree to the terms and conditions regarding data privacy and account creation.")
@@ -114,6 +119,7 @@ class View:
         self.controls['inst_reg_mi'] = ft.TextField(label="M.I.", width=70, border_color=C_SECONDARY)
         self.controls['inst_reg_username'] = ft.TextField(label="Username", width=380, border_color=C_SECONDARY, on_blur=lambda e: self.controller.check_username_availability(e.control.value))
         self.controls['inst_reg_email'] = ft.TextField(label="Email", width=380, border_color=C_SECONDARY)
+        self.controls['inst_reg_address'] = ft.TextField(label="City / Address", hint_text="e.g. Diliman, Quezon City", width=380, border_color=C_SECONDARY)
         self.controls['inst_reg_password'] = ft.TextField(label="Password", password=True, can_reveal_password=True, width=380, border_color=C_SECONDARY)
         self.controls['inst_reg_verify_password'] = ft.TextField(label="Verify Password", password=True, can_reveal_password=True, width=380, border_color=C_SECONDARY)
         self.controls['inst_reg_consent_teach'] = ft.Checkbox(label="I consent to be a responsible instructor and provide a safe learning environment.")
@@ -124,16 +130,20 @@ class View:
         def on_resume_picked(e: ft.FilePickerResultEvent):
             if not e.files: return
             source_file = e.files[0].path
-            resumes_dir = os.path.join("assets", "resumes")
-            os.makedirs(resumes_dir, exist_ok=True)
-            unique_filename = f"{int(ft.time.time_ns())}-{os.path.basename(source_file)}"
-            destination_file = os.path.join(resumes_dir, unique_filename)
-            shutil.copy(source_file, destination_file)
-            relative_path = os.path.join("assets", "resumes", unique_filename).replace("\\", "/")
-            self.controls['resume_path'].value = relative_path
-            self.controls['resume_filename'].value = os.path.basename(source_file)
+            self.controls['resume_filename'].value = f"Uploading {os.path.basename(source_file)}..."
             self.page.update()
 
+            def on_stored(relative_path, error):
+                if error:
+                    self.controls['resume_filename'].value = "No file selected."
+                    self.show_snackbar(f"Upload failed: {error}")
+                    return
+                self.controls['resume_path'].value = relative_path
+                self.controls['resume_filename'].value = os.path.basename(source_file)
+                self.page.update()
+
+            self.controller.handle_resume_upload(source_file, on_stored)
+
         resume_picker = ft.FilePicker(on_result=on_resume_picked)
         self.page.overlay.append(resume_picker)
 
@@ -146,8 +156,8 @@ class View:
 
         # --- Form Containers (initially hidden) ---
         self.controls['login_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("User Login", font_family="Oskari G2", size=32, color=C_ACCENT), self.controls['login_username'], self.controls['login_password'], ft.ElevatedButton("Login", on_click=lambda _: self.controller.handle_login(self.controls['login_username'].value, self.controls['login_password'].value), width=300, bgcolor=C_PRIMARY, color="white"), ft.TextButton("<- Back", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
-        self.controls['learner_register_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("Create Learner Account", font_family="Oskari G2", size=32, color=C_ACCENT), ft.Row([self.controls['learner_reg_firstname'], self.controls['learner_reg_lastname'], self.controls['learner_reg_mi']], alignment=ft.MainAxisAlignment.CENTER), self.controls['learner_reg_username'], self.controls['learner_reg_email'], self.controls['learner_reg_password'], self.controls['learner_reg_verify_password'], ft.Container(self.controls['learner_reg_consent'], alignment=ft.alignment.center), ft.ElevatedButton("Register", on_click=self._handle_learner_register_click, width=300, bgcolor=C_PRIMARY, color="white"), ft.TextButton("Return to Splash Screen", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
-        self.controls['instructor_register_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("Apply as Instructor", font_family="Oskari G2", size=32, color=C_ACCENT), ft.Row([self.controls['inst_reg_firstname'], self.controls['inst_reg_lastname'], self.controls['inst_reg_mi']], alignment=ft.MainAxisAlignment.CENTER), self.controls['inst_reg_username'], self.controls['inst_reg_email'], self.controls['inst_reg_password'], self.controls['inst_reg_verify_password'], ft.Row([ft.ElevatedButton("Upload Resume (PDF)", icon=ft.Icons.UPLOAD_FILE, on_click=lambda _: resume_picker.pick_files(allow_multiple=False, allowed_extensions=["pdf"])), self.controls['resume_filename']], alignment=ft.MainAxisAlignment.CENTER), ft.Container(self.controls['inst_reg_consent_teach'], alignment=ft.alignment.center), ft.Container(self.controls['inst_reg_consent_location'], alignment=ft.alignment.center), ft.ElevatedButton("Apply", on_click=self._handle_instructor_register_click, width=300, bgcolor=C_PRIMARY, color="white"), ft.TextButton("Return to Splash Screen", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
+        self.controls['learner_register_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("Create Learner Account", font_family="Oskari G2", size=32, color=C_ACCENT), ft.Row([self.controls['learner_reg_firstname'], self.controls['learner_reg_lastname'], self.controls['learner_reg_mi']], alignment=ft.MainAxisAlignment.CENTER), self.controls['learner_reg_username'], self.controls['learner_reg_email'], self.controls['learner_reg_address'], self.controls['learner_reg_password'], self.controls['learner_reg_verify_password'], ft.Container(self.controls['learner_reg_consent'], alignment=ft.alignment.center), ft.ElevatedButton("Register", on_click=self._handle_learner_register_click, width=300, bgcolor=C_PRIMARY, color="white"), ft.TextButton("Return to Splash Screen", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
+        self.controls['instructor_register_form'] = ft.Container(visible=False, content=ft.Column([ft.Text("Apply as Instructor", font_family="Oskari G2", size=32, color=C_ACCENT), ft.Row([self.controls['inst_reg_firstname'], self.controls['inst_reg_lastname'], self.controls['inst_reg_mi']], alignment=ft.MainAxisAlignment.CENTER), self.controls['inst_reg_username'], self.controls['inst_reg_email'], self.controls['inst_reg_address'], self.controls['inst_reg_password'], self.controls['inst_reg_verify_password'], ft.Row([ft.ElevatedButton("Upload Resume (PDF)", icon=ft.Icons.UPLOAD_FILE, on_click=lambda _: resume_picker.pick_files(allow_multiple=False, allowed_extensions=["pdf"])), self.controls['resume_filename']], alignment=ft.MainAxisAlignment.CENTER), ft.Container(self.controls['inst_reg_consent_teach'], alignment=ft.alignment.center), ft.Container(self.controls['inst_reg_consent_location'], alignment=ft.alignment.center), ft.ElevatedButton("Apply", on_click=self._handle_instructor_register_click, width=300, bgcolor=C_PRIMARY, color="white"), ft.TextButton("Return to Splash Screen", on_click=lambda _: self._toggle_form('initial'))], spacing=15, horizontal_alignment=ft.CrossAxisAlignment.CENTER))
 
         return ft.View("/", [ft.Column([ft.Text("Let's Ingles", font_family="Oskari G2", size=50, color=C_ACCENT), ft.Text("Your Community English Proficiency Program", size=16, color=C_SECONDARY), ft.Container(height=30), ft.Container(padding=40, border_radius=10, bgcolor=C_CONTAINER, content=ft.Column([self.controls['initial_buttons'], self.controls['login_form'], self.controls['learner_register_form'], self.controls['instructor_register_form']]))], horizontal_alignment=ft.CrossAxisAlignment.CENTER)], vertical_alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER)
 
@@ -175,7 +185,7 @@ class View:
         self.page.update()
         if not is_valid: return
         def on_confirm_action():
-            self.controller.handle_register(role='learner', first_name=self.controls['learner_reg_firstname'].value, last_name=self.controls['learner_reg_lastname'].value, middle_initial=self.controls['learner_reg_mi'].value, username=self.controls['learner_reg_username'].value, email=self.controls['learner_reg_email'].value, password=self.controls['learner_reg_password'].value, verify_password=self.controls['learner_reg_verify_password'].value, consent=self.controls['learner_reg_consent'].value)
+            self.controller.handle_register(role='learner', first_name=self.controls['learner_reg_firstname'].value, last_name=self.controls['learner_reg_lastname'].value, middle_initial=self.controls['learner_reg_mi'].value, username=self.controls['learner_reg_username'].value, email=self.controls['learner_reg_email'].value, password=self.controls['learner_reg_password'].value, verify_password=self.controls['learner_reg_verify_password'].value, consent=self.controls['learner_reg_consent'].value, address=self.controls['learner_reg_address'].value)
         self.show_confirmation_dialog("Confirm Registration", "Are you sure you want to create this account?", on_confirm_action)
     
     def _handle_instructor_register_click(self, e):
@@ -188,7 +198,7 @@ class View:
         if not is_valid: return
         def on_confirm_action():
             all_consents = self.controls['inst_reg_consent_teach'].value and self.controls['inst_reg_consent_location'].value
-            self.controller.handle_register(role='instructor', first_name=self.controls['inst_reg_firstname'].value, last_name=self.controls['inst_reg_lastname'].value, middle_initial=self.controls['inst_reg_mi'].value, username=self.controls['inst_reg_username'].value, email=self.controls['inst_reg_email'].value, password=self.controls['inst_reg_password'].value, verify_password=self.controls['inst_reg_verify_password'].value, consent=all_consents, resume_path=self.controls['resume_path'].value)
+            self.controller.handle_register(role='instructor', first_name=self.controls['inst_reg_firstname'].value, last_name=self.controls['inst_reg_lastname'].value, middle_initial=self.controls['inst_reg_mi'].value, username=self.controls['inst_reg_username'].value, email=self.controls['inst_reg_email'].value, password=self.controls['inst_reg_password'].value, verify_password=self.controls['inst_reg_verify_password'].value, consent=all_consents, resume_path=self.controls['resume_path'].value, address=self.controls['inst_reg_address'].value)
         self.show_confirmation_dialog("Confirm Application", "Are you sure you want to apply as an instructor?", on_confirm_action)
     
     # --- DASHBOARD VIEWS ---
@@ -202,45 +212,81 @@ class View:
 
     def get_admin_view(self):
         self._setup_page()
-        return ft.View("/admin", [self._build_header("Admin Dashboard")])
+        density_map_btn = ft.ElevatedButton("Instructor & Learner Density Map", icon=ft.Icons.MAP, on_click=lambda _: self.controller.show_user_density_map(), bgcolor=C_PRIMARY, color="white")
+        panels = [self._build_admin_metrics_panel(), self._build_admin_export_panel(), density_map_btn]
+        if self.controller.is_tracing_enabled():
+            panels.append(self._build_admin_diagnostics_panel())
+        return ft.View("/admin", [self._build_header("Admin Dashboard"), ft.ListView(controls=panels, spacing=20, expand=True)])
 
     def _build_header(self, title):
         return ft.Container(content=ft.Row([ft.Text(title, font_family="Oskari G2", size=28, weight=ft.FontWeight.BOLD, color=C_ACCENT), ft.Row([ft.Text(f"Logged in as: {self.controller.current_user['userName']}"), ft.IconButton(icon=ft.Icons.LOGOUT, on_click=lambda _: self.controller.handle_logout(), tooltip="Logout", icon_color="white")])], alignment=ft.MainAxisAlignment.SPACE_BETWEEN, vertical_alignment=ft.CrossAxisAlignment.CENTER), padding=ft.padding.only(bottom=20))
 
     def _build_learner_dashboard_tabs(self):
-        profile_tab = self._build_profile_tab('learner')
-        assignments_tab = self._build_assignments_tab_learner()
-        messages_tab = self._build_messages_tab()
-        return ft.Tabs(tabs=[profile_tab, assignments_tab, messages_tab], expand=True)
+        data, is_stale = self.controller.get_dashboard_snapshot()
+        self._dashboard_updaters = {}
+        profile_tab = self._build_profile_tab('learner', data['profile'] or {})
+        assignments_tab = self._build_assignments_tab_learner(data['assignments'])
+        progress_tab = self._build_progress_tab()
+        schedule_tab = self._build_schedule_tab()
+        messages_tab = self._build_messages_tab(data['partners'])
+        tabs = ft.Tabs(tabs=[profile_tab, assignments_tab, progress_tab, schedule_tab, messages_tab], expand=True)
+        if is_stale:
+            self._revalidate_dashboard(data)
+        return tabs
 
     def _build_instructor_dashboard_tabs(self):
-        profile_tab = self._build_profile_tab('instructor')
+        data, is_stale = self.controller.get_dashboard_snapshot()
+        self._dashboard_updaters = {}
+        profile_tab = self._build_profile_tab('instructor', data['profile'] or {})
         assignments_tab = self._build_assignments_tab_instructor()
-        messages_tab = self._build_messages_tab()
-        return ft.Tabs(tabs=[profile_tab, assignments_tab, messages_tab], expand=True)
+        schedule_tab = self._build_schedule_tab()
+        messages_tab = self._build_messages_tab(data['partners'])
+        tabs = ft.Tabs(tabs=[profile_tab, assignments_tab, schedule_tab, messages_tab], expand=True)
+        if is_stale:
+            self._revalidate_dashboard(data)
+        return tabs
+
+    def _revalidate_dashboard(self, snapshot):
+        """
+        The dashboard was drawn from the saved snapshot; once fresh data arrives, the sections that changed are
+        updated in place (an open chat and anything the user is typing are kept).
+        """
+        updaters = self._dashboard_updaters
+
+        def on_changes(changes):
+            for section, value in changes.items():
+                if section in updaters:
+                    updaters[section](value)
+            self.page.update()
+
+        self.controller.refresh_dashboard_in_background(snapshot, on_changes)
 
-    def _build_profile_tab(self, role):
-        profile_data_row = self.controller.get_user_profile()
-        profile_data = dict(profile_data_row) if profile_data_row else {}
+    def _build_profile_tab(self, role, profile_data=None):
+        if profile_data is None:
+            profile_data_row = self.controller.get_user_profile()
+            profile_data = dict(profile_data_row) if profile_data_row else {}
         
         pic_path = profile_data.get('profilePicture') or "assets/placeholder.png"
         profile_image = ft.Image(src=pic_path, width=150, height=150, fit=ft.ImageFit.COVER, border_radius=100)
         
         def on_file_picked(e: ft.FilePickerResultEvent):
             if not e.files: return
-            source_file = e.files[0].path
-            base_assets_dir = os.path.join(os.getcwd(), "src", "assets")
-            os.makedirs(base_assets_dir, exist_ok=True)
-            user_assets_dir = os.path.join(base_assets_dir, str(self.controller.current_user['userId']))
-            os.makedirs(user_assets_dir, exist_ok=True)
-            destination_file = os.path.join(user_assets_dir, os.path.basename(source_file))
-            shutil.copy(source_file, destination_file)
-            relative_path = os.path.join("assets", str(self.controller.current_user['userId']), os.path.basename(source_file)).replace("\\", "/")
-            profile_image.src = relative_path
-            self.controls['profile_pic_path'].value = relative_path
-            self.page.update()
+
+            def on_stored(relative_path, error):
+                if error:
+                    self.show_snackbar(f"Upload failed: {error}")
+                    return
+                profile_image.src = relative_path
+                self.controls['profile_pic_path'].value = relative_path
+                self.page.update()
+
+            self.controller.handle_profile_picture_upload(e.files[0].path, on_stored)
 
         file_picker = ft.FilePicker(on_result=on_file_picked)
+        # Replaces the picker of a previously built profile tab instead of piling up overlays.
+        if self.controls.get('profile_picker') in self.page.overlay:
+            self.page.overlay.remove(self.controls['profile_picker'])
+        self.controls['profile_picker'] = file_picker
         self.page.overlay.append(file_picker)
         
         self.controls['profile_pic_path'] = ft.TextField(value=pic_path, visible=False)
@@ -260,6 +306,23 @@ class View:
             specialization = ft.TextField(label="Specializes In", value=profile_data.get('specialization', ''), border_color=C_SECONDARY)
             role_specific_fields.extend([occupation, specialization])
 
+        fields = {"firstName": first_name, "lastName": last_name, "middleInitial": middle_initial, "age": age, "educationLevel": education_level, "aboutMe": about_me}
+        fields.update(zip(["school"] if role == 'learner' else ["occupation", "specialization"], role_specific_fields))
+        shown = {key: control.value for key, control in fields.items()}
+
+        def update_profile(fresh):
+            """Shows fresh profile data, leaving fields the user has already edited alone."""
+            fresh = fresh or {}
+            for key, control in fields.items():
+                if control.value != shown[key]:
+                    continue
+                value = str(fresh.get(key, '')) if key == "age" else fresh.get(key) if key == "educationLevel" else fresh.get(key, '')
+                control.value = shown[key] = value
+            if self.controls['profile_pic_path'].value == pic_path and fresh.get('profilePicture'):
+                profile_image.src = self.controls['profile_pic_path'].value = fresh['profilePicture']
+
+        self._dashboard_updaters["profile"] = update_profile
+
         def save_profile(e):
             data = {"firstName": first_name.value, "lastName": last_name.value, "middleInitial": middle_initial.value, "age": int(age.value) if age.value.isdigit() else None, "educationLevel": education_level.value, "aboutMe": about_me.value, "profilePicture": self.controls['profile_pic_path'].value}
             if role == 'learner':
@@ -280,26 +343,131 @@ class View:
 
         return ft.Tab(text="My Profile", icon=ft.Icons.PERSON, content=ft.ListView(controls=[ft.Row([profile_image, ft.ElevatedButton("Change Picture", icon=ft.Icons.UPLOAD_FILE, on_click=lambda _: file_picker.pick_files(allow_multiple=False, allowed_extensions=["png", "jpg", "jpeg"]))], alignment=ft.MainAxisAlignment.CENTER), ft.Row([first_name, last_name, middle_initial], alignment=ft.MainAxisAlignment.SPACE_BETWEEN), ft.Row([age, education_level], alignment=ft.MainAxisAlignment.SPACE_BETWEEN), *role_specific_fields, about_me, ft.ElevatedButton("Save Profile", icon=ft.Icons.SAVE, on_click=save_profile, bgcolor=C_PRIMARY, color="white"), show_map_btn], spacing=15, padding=20, expand=True))
 
+    # --- Admin Reports ---
+    def _build_admin_metrics_panel(self):
+        data = self.controller.get_admin_dashboard_data()
+        summary = data['summary']
+
+        def stat_card(label, value):
+            return ft.Container(ft.Column([ft.Text(value, size=26, color=C_ACCENT, font_family="Oskari G2"), ft.Text(label, size=12)], horizontal_alignment=ft.CrossAxisAlignment.CENTER), padding=15, bgcolor=C_BACKGROUND, border_radius=10, width=180)
+
+        def table(columns, rows):
+            return ft.DataTable(columns=[ft.DataColumn(ft.Text(col, font_family="Oskari G2")) for col in columns], rows=[ft.DataRow(cells=[ft.DataCell(ft.Text(str(value))) for value in row]) for row in rows])
+
+        average_rating = f"{summary['averageRating']:.2f}" if summary['averageRating'] is not None else "-"
+        cards = ft.Row([stat_card("Sessions", str(summary['sessions'])), stat_card("Completion Rate", f"{summary['completionRate']:.0%}"), stat_card("Average Rating", average_rating), stat_card("Submissions", str(summary['submissions']))], wrap=True)
+        weekly_chart = self._chart_image(lambda on_ready: self.controller.get_weekly_sessions_chart(data['weekly_sessions'], on_ready))
+        weekly_table = table(["Week", "Sessions", "Completed"], [(w['week'], w['sessions'], w['sessionsCompleted']) for w in data['weekly_sessions']])
+        instructor_table = table(["Instructor", "Sessions", "Completed", "Ratings", "Avg. Rating"], [(i['userName'], i['sessions'], i['sessionsCompleted'], i['feedbackCount'], i['averageRating']) for i in data['instructors']])
+        skill_table = table(["Skill", "Learners", "Sessions Completed", "Submissions", "Avg. Proficiency"], [(s['skillName'], s['learners'], s['sessionsCompleted'], s['submissions'], s['averageProficiency']) for s in data['skills']])
+        return ft.Container(ft.Column([ft.Text("Program Overview", font_family="Oskari G2", size=22, color=C_ACCENT), cards, ft.Text("Sessions per Week", font_family="Oskari G2", size=18), weekly_chart, weekly_table, ft.Text("Top Instructors", font_family="Oskari G2", size=18), instructor_table, ft.Text("Skills", font_family="Oskari G2", size=18), skill_table]), padding=20, bgcolor=C_CONTAINER, border_radius=10)
+
+    def _build_admin_export_panel(self):
+        dataset_dd = ft.Dropdown(label="Dataset", value="sessions", options=[ft.dropdown.Option(key=key, text=key.replace("_", " ").title()) for key in ["sessions", "feedback", "learner_stats"]], border_color=C_SECONDARY, width=200)
+        format_dd = ft.Dropdown(label="Format", value="csv", options=[ft.dropdown.Option(key="csv", text="CSV"), ft.dropdown.Option(key="ndjson", text="NDJSON")], border_color=C_SECONDARY, width=150)
+        start_tf = ft.TextField(label="From (YYYY-MM-DD)", width=180, border_color=C_SECONDARY)
+        end_tf = ft.TextField(label="To (YYYY-MM-DD)", width=180, border_color=C_SECONDARY)
+
+        def on_save_path_picked(e: ft.FilePickerResultEvent):
+            if not e.path: return
+            self.controller.handle_export(dataset_dd.value, format_dd.value, start_tf.value, end_tf.value, e.path)
+
+        save_picker = ft.FilePicker(on_result=on_save_path_picked)
+        self.page.overlay.append(save_picker)
+
+        export_button = ft.ElevatedButton("Export", icon=ft.Icons.DOWNLOAD, on_click=lambda _: save_picker.save_file(file_name=f"{dataset_dd.value}.{format_dd.value}", allowed_extensions=[format_dd.value]), bgcolor=C_PRIMARY, color="white")
+        return ft.Container(ft.Column([ft.Text("Export Reports", font_family="Oskari G2", size=22, color=C_ACCENT), ft.Row([dataset_dd, format_dd, start_tf, end_tf, export_button], wrap=True)]), padding=20, bgcolor=C_CONTAINER, border_radius=10)
+
+    def _build_admin_diagnostics_panel(self):
+        """Slowest recently traced actions, with an export of the raw spans as Chrome trace-event JSON."""
+        actions_table = ft.DataTable(columns=[ft.DataColumn(ft.Text(col, font_family="Oskari G2")) for col in ["Action", "Duration (ms)", "Spans", "Slowest Step"]], rows=[])
+
+        def refresh(_=None):
+            actions_table.rows = [ft.DataRow(cells=[ft.DataCell(ft.Text(str(value))) for value in row]) for row in self.controller.get_slowest_actions()]
+            if _ is not None:
+                self.page.update()
+
+        def on_save_path_picked(e: ft.FilePickerResultEvent):
+            if not e.path: return
+            self.controller.handle_export_trace(e.path)
+
+        save_picker = ft.FilePicker(on_result=on_save_path_picked)
+        self.page.overlay.append(save_picker)
+
+        refresh()
+        refresh_button = ft.IconButton(icon=ft.Icons.REFRESH, on_click=refresh, tooltip="Refresh", icon_color=C_ACCENT)
+        export_button = ft.ElevatedButton("Export Trace", icon=ft.Icons.DOWNLOAD, on_click=lambda _: save_picker.save_file(file_name="trace.json", allowed_extensions=["json"]), bgcolor=C_PRIMARY, color="white")
+        return ft.Container(ft.Column([ft.Row([ft.Text("Diagnostics: Slowest Recent Actions", font_family="Oskari G2", size=22, color=C_ACCENT), refresh_button]), actions_table, export_button]), padding=20, bgcolor=C_CONTAINER, border_radius=10)
+
+    def _chart_image(self, get_chart):
+        """Image that shows a placeholder until the chart service finishes rendering in the background."""
+        chart_image = ft.Image(width=600, height=350, fit=ft.ImageFit.CONTAIN)
+        # on_ready can fire before get_chart returns (a fast render, or a render another caller started);
+        # the returned placeholder must not overwrite the finished chart. Reentrant: the callback may run inline.
+        lock = threading.RLock()
+
+        def on_ready(path):
+            with lock:
+                chart_image.src = path
+            self.page.update()
+
+        with lock:
+            src = get_chart(on_ready)
+            if chart_image.src is None:
+                chart_image.src = src
+        return chart_image
+
+    # --- Progress Tab ---
+    def _build_progress_tab(self):
+        chart = self._chart_image(self.controller.get_learner_progress_chart)
+        recommendations = self.controller.get_recommended_materials()
+        recommended_list = [ft.ListTile(leading=ft.Icon(ft.Icons.LIGHTBULB, color=C_ACCENT), title=ft.Text(m['materialTitle']), subtitle=ft.Text(m['skillName']), on_click=lambda e, link=m['materialLink']: self.page.launch_url(link)) for m in recommendations]
+        if not recommended_list:
+            recommended_list = [ft.Text("No recommendations yet. Complete a few sessions to get suggestions.", italic=True)]
+        return ft.Tab(text="Progress", icon=ft.Icons.INSIGHTS, content=ft.ListView(controls=[ft.Text("My Progress", font_family="Oskari G2", size=22, color=C_ACCENT), chart, ft.Text("Recommended Practice", font_family="Oskari G2", size=18, color=C_ACCENT), *recommended_list], spacing=10, padding=20, expand=True))
+
+    # --- Schedule Tab ---
+    def _build_schedule_tab(self):
+        today = date.today()
+        state = {"week_start": today - timedelta(days=today.weekday())}
+        week_label = ft.Text(font_family="Oskari G2", size=18)
+        sessions_table = ft.DataTable(columns=[ft.DataColumn(ft.Text(col, font_family="Oskari G2")) for col in ["Date", "With", "Skills", "Status"]], rows=[])
+
+        def load_week():
+            week_start = state["week_start"]
+            week_label.value = f"Week of {week_start.strftime('%B %d, %Y')}"
+            sessions_table.rows = [ft.DataRow(cells=[ft.DataCell(ft.Text(s['sessionDate'])), ft.DataCell(ft.Text(s['partnerName'])), ft.DataCell(ft.Text(s['reqSkills'])), ft.DataCell(ft.Text(s['status']))]) for s in self.controller.get_week_sessions(week_start)]
+
+        def change_week(days):
+            state["week_start"] += timedelta(days=days)
+            load_week()
+            self.page.update()
+
+        load_week()
+        navigation = ft.Row([ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, on_click=lambda _: change_week(-7), icon_color=C_ACCENT), week_label, ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, on_click=lambda _: change_week(7), icon_color=C_ACCENT)])
+        return ft.Tab(text="Schedule", icon=ft.Icons.CALENDAR_MONTH, content=ft.Container(ft.Column([ft.Text("My Sessions", font_family="Oskari G2", size=22, color=C_ACCENT), navigation, sessions_table]), padding=20))
+
     # --- Assignments Tabs ---
-    def _build_assignments_tab_learner(self):
-        assignments_data = self.controller.get_learner_assignments_with_status()
+    def _build_assignments_tab_learner(self, assignments_data=None):
+        if assignments_data is None:
+            assignments_data = self.controller.get_learner_assignments_with_status()
         
         def on_submit_click(e):
             assignment_id = e.control.data
             self.show_confirmation_dialog("Confirm Submission", "Are you sure you want to mark this assignment as complete?", lambda: self.controller.handle_submit_assignment(assignment_id))
 
-        rows = []
-        for assign in assignments_data:
-            rows.append(ft.DataRow(cells=[
+        def assignment_rows(assignments):
+            return [ft.DataRow(cells=[
                 ft.DataCell(ft.Text(assign['title'])),
                 ft.DataCell(ft.Text(assign['skillName'])),
                 ft.DataCell(ft.Text(assign['instructorName'])),
                 ft.DataCell(ft.Text(assign['dueDate'])),
                 ft.DataCell(ft.Text(assign['status'], color=ft.Colors.GREEN_400 if assign['status'] == 'Completed' else ft.Colors.YELLOW_400)),
                 ft.DataCell(ft.IconButton(icon=ft.Icons.CHECK, icon_color=ft.Colors.GREEN_400, on_click=on_submit_click, data=assign['assignmentID']) if assign['status'] == 'Pending' else ft.Container())
-            ]))
+            ]) for assign in assignments]
 
-        assignments_table = ft.DataTable(columns=[ft.DataColumn(ft.Text(col, font_family="Oskari G2")) for col in ["Title", "Skill", "Instructor", "Due Date", "Status", "Submit"]], rows=rows, expand=True)
+        assignments_table = ft.DataTable(columns=[ft.DataColumn(ft.Text(col, font_family="Oskari G2")) for col in ["Title", "Skill", "Instructor", "Due Date", "Status", "Submit"]], rows=assignment_rows(assignments_data), expand=True)
+        self._dashboard_updaters["assignments"] = lambda fresh: setattr(assignments_table, "rows", assignment_rows(fresh))
         return ft.Tab(text="Assignments", icon=ft.Icons.ASSIGNMENT, content=ft.Container(ft.Column([ft.Text("My Assignments", font_family="Oskari G2", size=22, color=C_ACCENT), assignments_table]), padding=20))
 
     def _build_assignments_tab_instructor(self):
@@ -325,8 +493,9 @@ class View:
         return ft.Tab(text="Assignments", icon=ft.Icons.ASSIGNMENT, content=ft.Container(ft.Column([create_button]), padding=20))
 
     # --- Messages Tab ---
-    def _build_messages_tab(self):
-        partners = self.controller.get_conversation_partners()
+    def _build_messages_tab(self, partners=None):
+        if partners is None:
+            partners = self.controller.get_conversation_partners()
         chat_history = ft.ListView(expand=True, auto_scroll=True, spacing=10)
         message_input = ft.TextField(label="Type a message...", expand=True, border_color=C_SECONDARY)
         chat_view = ft.Column([ft.Text("Select a conversation", italic=True)], expand=True)
@@ -335,23 +504,76 @@ class View:
             receiver_id = chat_view.data
             content = message_input.value
             if self.controller.handle_send_message(receiver_id, content):
+                chat_history.auto_scroll = True
                 chat_history.controls.append(ft.Row([ft.Container(ft.Text(f"Me: {content}"), bgcolor=C_PRIMARY, padding=10, border_radius=10)], alignment=ft.MainAxisAlignment.END))
                 message_input.value = ""
                 self.page.update()
 
+        chat_state = {"oldest": None}
+
+        def message_row(msg):
+            is_me = msg['senderID'] == self.controller.current_user['userId']
+            return ft.Row([ft.Container(ft.Text(f"{msg['senderName']}: {msg['content']}"), bgcolor=C_PRIMARY if is_me else C_CONTAINER, padding=10, border_radius=10)], alignment=ft.MainAxisAlignment.END if is_me else ft.MainAxisAlignment.START)
+
+        def load_page(partner_id, before):
+            """Loads one page of history above what is shown; older pages may come from the message archive."""
+            page_size = config.MESSAGE_PAGE_SIZE
+            conversation = self.controller.get_conversation(partner_id, page_size, before)
+            if conversation: chat_state["oldest"] = conversation[0]
+            if chat_history.controls and isinstance(chat_history.controls[0], ft.TextButton): chat_history.controls.pop(0)
+            rows = [message_row(msg) for msg in conversation]
+            if len(conversation) == page_size: rows.insert(0, ft.TextButton("Load earlier messages", on_click=lambda _: load_earlier(partner_id)))
+            chat_history.controls[0:0] = rows
+
+        def load_earlier(partner_id):
+            chat_history.auto_scroll = False
+            load_page(partner_id, chat_state["oldest"])
+            self.page.update()
+
         def on_partner_click(e):
             partner_id = e.control.data
-            conversation = self.controller.get_conversation(partner_id)
             chat_history.controls.clear()
-            for msg in conversation:
-                is_me = msg['senderID'] == self.controller.current_user['userId']
-                chat_history.controls.append(ft.Row([ft.Container(ft.Text(f"{msg['senderName']}: {msg['content']}"), bgcolor=C_PRIMARY if is_me else C_CONTAINER, padding=10, border_radius=10)], alignment=ft.MainAxisAlignment.END if is_me else ft.MainAxisAlignment.START))
+            chat_history.auto_scroll = True
+            chat_state["oldest"] = None
+            load_page(partner_id, None)
             chat_view.data = partner_id
             chat_view.controls[0] = chat_history # Replace placeholder text
             self.page.update()
 
-        partner_list = ft.ListView(controls=[ft.ListTile(title=ft.Text(p['userName']), data=p['userId'], on_click=on_partner_click) for p in partners], expand=True)
+        def partner_tiles(partners):
+            return [ft.ListTile(title=ft.Text(p['userName']), data=p['userId'], on_click=on_partner_click) for p in partners]
+
+        partner_list = ft.ListView(controls=partner_tiles(partners), expand=True)
+        self._dashboard_updaters["partners"] = lambda fresh: setattr(partner_list, "controls", partner_tiles(fresh))
+
+        # --- New conversation: paginated typeahead over the in-memory user directory ---
+        search_results = ft.ListView(spacing=0, height=200, visible=False)
+        search_state = {"query": "", "page": 0}
+
+        def show_search_page(append):
+            users, has_more = self.controller.search_users_for_messaging(search_state["query"], search_state["page"])
+            if not append: search_results.controls.clear()
+            elif search_results.controls and isinstance(search_results.controls[-1], ft.TextButton): search_results.controls.pop()
+            for u in users:
+                full_name = " ".join(filter(None, [u['firstName'], u['lastName']]))
+                search_results.controls.append(ft.ListTile(title=ft.Text(u['userName']), subtitle=ft.Text(full_name) if full_name else None, data=u['userId'], on_click=on_partner_click, dense=True))
+            if has_more: search_results.controls.append(ft.TextButton("Load more", on_click=on_load_more))
+            search_results.visible = bool(search_results.controls)
+            self.page.update()
+
+        def on_search_change(e):
+            search_state["query"] = e.control.value
+            search_state["page"] = 0
+            if not search_state["query"].strip():
+                search_results.controls.clear(); search_results.visible = False; self.page.update(); return
+            show_search_page(append=False)
+
+        def on_load_more(e):
+            search_state["page"] += 1
+            show_search_page(append=True)
+
+        search_tf = ft.TextField(label="Find someone to message", prefix_icon=ft.Icons.SEARCH, on_change=on_search_change, border_color=C_SECONDARY, dense=True)
         
         chat_view.controls.append(ft.Row([message_input, ft.IconButton(icon=ft.Icons.SEND, on_click=send_message_click, icon_color=C_ACCENT)]))
         
-        return ft.Tab(text="Messages", icon=ft.Icons.MESSAGE, content=ft.Row([ft.Container(partner_list, width=250, border=ft.border.only(right=ft.BorderSide(1, C_SECONDARY))), chat_view], expand=True))
+        return ft.Tab(text="Messages", icon=ft.Icons.MESSAGE, content=ft.Row([ft.Container(ft.Column([search_tf, search_results, partner_list]), width=250, border=ft.border.only(right=ft.BorderSide(1, C_SECONDARY))), chat_view], expand=True))